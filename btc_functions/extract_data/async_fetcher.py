@@ -0,0 +1,262 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .binance_daylies import (
+    DEFAULT_SYMBOL,
+    SUPPORTED_ENDPOINTS,
+    backfill_klines,
+    build_endpoint_config,
+    request_data,
+    save_raw_data,
+)
+
+logger = getLogger(__name__)
+
+MAX_CONCURRENCY = 8
+
+# Seuls les klines acceptent une fenêtre temporelle, les tickers sont "live"
+DATED_ENDPOINTS = ("klines",)
+
+
+def build_jobs(
+    endpoints: Iterable[str], symbols: Iterable[str], days: Iterable[int]
+) -> List[Tuple[str, str, int]]:
+    """
+    Expand endpoints x symbols x days into individual fetch jobs.
+
+    Endpoints without a time window (tickers) are fetched once per symbol,
+    for the most recent requested day.
+
+    Args:
+        endpoints (Iterable[str]): API endpoints to call.
+        symbols (Iterable[str]): trading pairs.
+        days (Iterable[int]): number of days to go back for each job.
+
+    Returns:
+        List[Tuple[str, str, int]]: (endpoint, symbol, r_days) tuples.
+    """
+    days = sorted(set(days))
+    jobs = []
+    for endpoint in endpoints:
+        if endpoint not in SUPPORTED_ENDPOINTS:
+            raise ValueError(
+                f"Supported endpoints are : {', '.join(SUPPORTED_ENDPOINTS)}"
+            )
+        endpoint_days = days if endpoint in DATED_ENDPOINTS else days[:1]
+        for symbol in symbols:
+            for r_days in endpoint_days:
+                jobs.append((endpoint, symbol, r_days))
+    return jobs
+
+
+async def _fetch_job(
+    loop: asyncio.AbstractEventLoop,
+    executor: ThreadPoolExecutor,
+    semaphore: asyncio.Semaphore,
+    job: Tuple[str, str, int],
+    now: datetime,
+    use_today_for_filename: bool,
+) -> bool:
+    """Fetch one (endpoint, symbol, day) job and save it like get_data_from_binance."""
+    endpoint, symbol, r_days = job
+    day = now - timedelta(days=r_days)
+    config = build_endpoint_config(endpoint, symbol, day)
+
+    async with semaphore:
+        data = await loop.run_in_executor(
+            executor, request_data, endpoint, config["params"]
+        )
+
+    if not data:
+        logger.warning(f"No data for {endpoint} {symbol} (D-{r_days})")
+        return False
+
+    file_date = now if use_today_for_filename else day
+    await loop.run_in_executor(
+        executor, save_raw_data, data, config["file"], file_date
+    )
+    return True
+
+
+async def fetch_all_async(
+    endpoints: Iterable[str],
+    symbols: Iterable[str] = (DEFAULT_SYMBOL,),
+    days: Iterable[int] = (1,),
+    max_concurrency: int = MAX_CONCURRENCY,
+    use_today_for_filename: bool = False,
+    now: Optional[datetime] = None,
+) -> Dict[Tuple[str, str, int], bool]:
+    """
+    Fetch every endpoint x symbol x day combination concurrently.
+
+    The blocking HTTP calls run in a thread pool over the shared pooled
+    session; a semaphore bounds the number of requests in flight.
+
+    Args:
+        endpoints (Iterable[str]): API endpoints to call.
+        symbols (Iterable[str]): trading pairs (default: BTCUSDT).
+        days (Iterable[int]): days to go back, 1 being yesterday.
+        max_concurrency (int): maximum number of requests in flight.
+        use_today_for_filename (bool): if True, date files with today's date.
+        now (Optional[datetime]): reference time (default: datetime.now()).
+
+    Returns:
+        Dict[Tuple[str, str, int], bool]: success flag for each job.
+    """
+    jobs = build_jobs(endpoints, symbols, days)
+    if use_today_for_filename and len({r_days for _, _, r_days in jobs}) > 1:
+        raise ValueError("use_today_for_filename would overwrite files of other days")
+
+    now = now or datetime.now()
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    logger.info(f"Fetching {len(jobs)} jobs with concurrency {max_concurrency}")
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        results = await asyncio.gather(
+            *(
+                _fetch_job(
+                    loop, executor, semaphore, job, now, use_today_for_filename
+                )
+                for job in jobs
+            ),
+            return_exceptions=True,
+        )
+
+    outcome = {}
+    for job, result in zip(jobs, results):
+        if isinstance(result, Exception):
+            logger.error(f"Job {job} failed: {result}")
+            result = False
+        outcome[job] = result
+
+    logger.info(f"{sum(outcome.values())} out of {len(jobs)} jobs succeeded")
+    return outcome
+
+
+def fetch_all(
+    endpoints: Iterable[str],
+    symbols: Iterable[str] = (DEFAULT_SYMBOL,),
+    days: Iterable[int] = (1,),
+    max_concurrency: int = MAX_CONCURRENCY,
+    use_today_for_filename: bool = False,
+) -> Dict[Tuple[str, str, int], bool]:
+    """
+    Synchronous entry point for fetch_all_async.
+
+    Args:
+        endpoints (Iterable[str]): API endpoints to call.
+        symbols (Iterable[str]): trading pairs (default: BTCUSDT).
+        days (Iterable[int]): days to go back, 1 being yesterday.
+        max_concurrency (int): maximum number of requests in flight.
+        use_today_for_filename (bool): if True, date files with today's date.
+
+    Returns:
+        Dict[Tuple[str, str, int], bool]: success flag for each job.
+    """
+    return asyncio.run(
+        fetch_all_async(
+            endpoints,
+            symbols=symbols,
+            days=days,
+            max_concurrency=max_concurrency,
+            use_today_for_filename=use_today_for_filename,
+        )
+    )
+
+
+async def backfill_all_async(
+    start_date: date,
+    end_date: date,
+    symbols: Iterable[str] = (DEFAULT_SYMBOL,),
+    interval: str = "5m",
+    group_by: str = "day",
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> Dict[str, Optional[int]]:
+    """
+    Backfill the klines of several symbols concurrently.
+
+    The pages of one symbol are fetched one after another by backfill_klines
+    (each page starts after the last kline received); the symbols run side
+    by side in the thread pool, over the shared session and rate limiter.
+
+    Args:
+        start_date (date): first day to fetch.
+        end_date (date): last day to fetch.
+        symbols (Iterable[str]): trading pairs (default: BTCUSDT).
+        interval (str): kline interval (default: 5m).
+        group_by (str): "day" or "chunk", see backfill_klines.
+        max_concurrency (int): maximum number of symbols in flight.
+
+    Returns:
+        Dict[str, Optional[int]]: files written per symbol, None if its
+            backfill failed.
+    """
+    symbols = list(symbols)
+    loop = asyncio.get_running_loop()
+    logger.info(
+        f"Backfilling {len(symbols)} symbols with concurrency {max_concurrency}"
+    )
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor,
+                    backfill_klines,
+                    start_date,
+                    end_date,
+                    symbol,
+                    interval,
+                    group_by,
+                )
+                for symbol in symbols
+            ),
+            return_exceptions=True,
+        )
+
+    outcome = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"Backfill {symbol} failed: {result}")
+            result = None
+        outcome[symbol] = result
+    return outcome
+
+
+def backfill_all(
+    start_date: date,
+    end_date: date,
+    symbols: Iterable[str] = (DEFAULT_SYMBOL,),
+    interval: str = "5m",
+    group_by: str = "day",
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> Dict[str, Optional[int]]:
+    """
+    Synchronous entry point for backfill_all_async.
+
+    Args:
+        start_date (date): first day to fetch.
+        end_date (date): last day to fetch.
+        symbols (Iterable[str]): trading pairs (default: BTCUSDT).
+        interval (str): kline interval (default: 5m).
+        group_by (str): "day" or "chunk", see backfill_klines.
+        max_concurrency (int): maximum number of symbols in flight.
+
+    Returns:
+        Dict[str, Optional[int]]: files written per symbol, None if its
+            backfill failed.
+    """
+    return asyncio.run(
+        backfill_all_async(
+            start_date,
+            end_date,
+            symbols=symbols,
+            interval=interval,
+            group_by=group_by,
+            max_concurrency=max_concurrency,
+        )
+    )
@@ -0,0 +1,178 @@
+import os
+import json
+from datetime import date, datetime, timedelta
+from logging import getLogger
+from typing import Any, Dict, Optional
+
+from .binance_daylies import BASE_DIR, DEFAULT_SYMBOL, request_data
+
+logger = getLogger(__name__)
+
+AGGTRADES_LIMIT = 1000  # Nombre max de trades renvoyés par requête Binance
+CHUNK_ROWS = 100_000  # Nombre de trades par fichier avant rotation
+HOUR_MS = 60 * 60 * 1000  # startTime/endTime ne peuvent couvrir plus d'une heure
+
+
+def aggtrades_directory() -> str:
+    """Return the default directory of aggTrades chunks."""
+    return os.path.join(BASE_DIR, "aggTrades")
+
+
+def _checkpoint_path(directory: str, symbol: str, day_str: str) -> str:
+    return os.path.join(directory, f"aggTrades_{symbol}_{day_str}.checkpoint.json")
+
+
+def _part_path(directory: str, symbol: str, day_str: str, part: int) -> str:
+    return os.path.join(directory, f"aggTrades_{symbol}_{day_str}_part{part:04d}.jsonl")
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load an aggTrades checkpoint.
+
+    Args:
+        path (str): checkpoint file path.
+
+    Returns:
+        Optional[Dict[str, Any]]: saved state or None if there is none.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        logger.error(f"Unreadable checkpoint {path}: {e}")
+        return None
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """
+    Atomically write an aggTrades checkpoint.
+
+    Args:
+        path (str): checkpoint file path.
+        state (Dict[str, Any]): state to save.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def stream_agg_trades(
+    day: date,
+    symbol: str = DEFAULT_SYMBOL,
+    directory: Optional[str] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    limit: int = AGGTRADES_LIMIT,
+) -> int:
+    """
+    Stream every aggregated trade of a day to append-only JSON Lines chunks.
+
+    Pages are written to disk as soon as they are received, so memory stays
+    bounded by one page. After each page a checkpoint records the next
+    `fromId` and the size of the current chunk; a later call resumes from
+    there, truncating any bytes written after the last checkpoint.
+
+    Args:
+        day (date): day to fetch.
+        symbol (str): trading pair (default: BTCUSDT).
+        directory (Optional[str]): output directory (default: BASE_DIR/aggTrades).
+        chunk_rows (int): trades per chunk file before rotating.
+        limit (int): trades per request (max 1000 on Binance).
+
+    Returns:
+        int: number of trades written during this call.
+
+    Raises:
+        RuntimeError: if a request fails. The pages written before the
+            failure are kept with their checkpoint; the next call resumes.
+    """
+    directory = directory or aggtrades_directory()
+    os.makedirs(directory, exist_ok=True)
+
+    day_str = day.strftime("%Y%m%d")
+    start_of_day = datetime(day.year, day.month, day.day)
+    start_timestamp = int(start_of_day.timestamp() * 1000)
+    end_timestamp = int((start_of_day + timedelta(days=1)).timestamp() * 1000) - 1
+
+    checkpoint_path = _checkpoint_path(directory, symbol, day_str)
+    state = load_checkpoint(checkpoint_path) or {
+        "next_from_id": None,
+        "window_start": start_timestamp,
+        "part": 1,
+        "rows_in_part": 0,
+        "part_size": 0,
+        "done": False,
+    }
+    if state["done"]:
+        logger.info(f"aggTrades {symbol} {day_str} already complete")
+        return 0
+
+    # Supprimer ce qui a pu être écrit après le dernier checkpoint
+    part_path = _part_path(directory, symbol, day_str, state["part"])
+    if os.path.exists(part_path):
+        with open(part_path, "r+b") as f:
+            f.truncate(state["part_size"])
+
+    rows_written = 0
+    while True:
+        if state["next_from_id"] is None:
+            # Premier trade du jour: recherche par fenêtres d'une heure
+            if state["window_start"] > end_timestamp:
+                state["done"] = True
+                save_checkpoint(checkpoint_path, state)
+                break
+            params = {
+                "symbol": symbol,
+                "startTime": state["window_start"],
+                "endTime": min(state["window_start"] + HOUR_MS - 1, end_timestamp),
+                "limit": limit,
+            }
+        else:
+            params = {"symbol": symbol, "fromId": state["next_from_id"], "limit": limit}
+
+        page = request_data("aggTrades", params=params)
+        if page is None:
+            # Le checkpoint couvre toutes les pages écrites: reprise sûre
+            logger.error(
+                f"aggTrades {symbol} {day_str} interrupted after {rows_written} "
+                f"trades, resume from {state}"
+            )
+            raise RuntimeError(f"aggTrades request failed ({symbol} {day_str})")
+
+        if not page:
+            if state["next_from_id"] is None:
+                state["window_start"] += HOUR_MS
+                save_checkpoint(checkpoint_path, state)
+                continue
+            logger.info(f"No more aggTrades after id {state['next_from_id']}")
+            break
+
+        trades = [trade for trade in page if trade["T"] <= end_timestamp]
+        if trades:
+            part_path = _part_path(directory, symbol, day_str, state["part"])
+            with open(part_path, "a") as f:
+                for trade in trades:
+                    f.write(json.dumps(trade, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+                state["part_size"] = f.tell()
+            state["rows_in_part"] += len(trades)
+            rows_written += len(trades)
+
+        state["next_from_id"] = page[-1]["a"] + 1
+        state["done"] = len(trades) < len(page)
+
+        if state["rows_in_part"] >= chunk_rows:
+            state["part"] += 1
+            state["rows_in_part"] = 0
+            state["part_size"] = 0
+
+        save_checkpoint(checkpoint_path, state)
+        if state["done"]:
+            break
+
+    logger.info(f"{rows_written} aggTrades written for {symbol} {day_str}")
+    return rows_written
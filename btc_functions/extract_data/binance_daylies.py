@@ -1,14 +1,43 @@
 import os
 import json
 import requests
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from logging import getLogger
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+from ..load_database.schema import PARQUET_AVAILABLE, raw_to_dataframe
+from urllib3.exceptions import MaxRetryError
+
+from .http_session import REQUEST_TIMEOUT, get_retry_policy, get_session
+from .rate_limiter import endpoint_weight, get_rate_limiter
 
 logger = getLogger(__name__)
 
 BASE_DIR = os.path.expanduser(os.getenv("BTC_APP_BASE_DIR", "~/BTC_app/data/1_raw"))
 BINANCE_URL = "https://api.binance.com/api/v3/"
+RAW_FORMAT = os.getenv("BTC_APP_RAW_FORMAT", "json")
+PARQUET_COMPRESSION = os.getenv("BTC_APP_PARQUET_COMPRESSION", "zstd")
+
+DEFAULT_SYMBOL = "BTCUSDT"
+SUPPORTED_ENDPOINTS = ("klines", "ticker/24hr", "ticker/tradingDay")
+QUOTE_ASSETS = ("USDT", "USDC", "FDUSD", "BUSD", "EUR", "BTC", "ETH", "BNB")
+KLINES_LIMIT = 1000  # Nombre max de bougies renvoyées par requête Binance
+# Nouvelles tentatives après un 429/418, une fois la pause Retry-After écoulée
+RATE_LIMIT_RETRIES = int(os.getenv("BTC_APP_RATE_LIMIT_RETRIES", "3"))
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 60 * 60_000,
+    "2h": 2 * 60 * 60_000,
+    "4h": 4 * 60 * 60_000,
+    "6h": 6 * 60 * 60_000,
+    "8h": 8 * 60 * 60_000,
+    "12h": 12 * 60 * 60_000,
+    "1d": 24 * 60 * 60_000,
+}
 
 
 def ensure_parent_directory_exists(path: str) -> None:
@@ -16,6 +45,31 @@ def ensure_parent_directory_exists(path: str) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
 
+def build_file_path(filename: str, date: datetime, extension: str = "json") -> str:
+    """
+    Build the dated path of a raw data file inside BASE_DIR.
+
+    Args:
+        filename (str): file name (without directory)
+        date (datetime): date to use in the filename
+        extension (str): file extension, without the dot
+
+    Returns:
+        str: full path such as BASE_DIR/prices_BTC_KLINES_20240101.json
+    """
+    date_str = date.strftime("%Y%m%d")
+
+    # Supprimer l'extension si elle existe déjà
+    base_name = filename
+    for known_extension in (".json", ".parquet"):
+        if base_name.lower().endswith(known_extension):
+            base_name = base_name[: -len(known_extension)]
+
+    # Construire le chemin complet avec la date
+    final_filename = f"{base_name}_{date_str}.{extension}"
+    return os.path.join(BASE_DIR, final_filename)
+
+
 def data_to_json(data: Any, filename: str, date: datetime) -> None:
     """
     Save JSON data to a file in the specified directory.
@@ -26,21 +80,10 @@ def data_to_json(data: Any, filename: str, date: datetime) -> None:
         date (datetime): date to use in the filename
     """
     if data:
-        date_str = date.strftime("%Y%m%d")
-
-        # Supprimer l'extension .json si elle existe déjà
-        if filename.lower().endswith(".json"):
-            base_name = filename[:-5]
-        else:
-            base_name = filename
-
-        # Construire le chemin complet avec la date
-        final_filename = f"{base_name}_{date_str}.json"
-        file_path = os.path.join(BASE_DIR, final_filename)
+        file_path = build_file_path(filename, date, "json")
 
         logger.debug(f"Attempting to save file with path: {file_path}")
         logger.debug(f"BASE_DIR is: {BASE_DIR}")
-        logger.debug(f"Final filename is: {final_filename}")
 
         ensure_parent_directory_exists(file_path)
 
@@ -55,12 +98,72 @@ def data_to_json(data: Any, filename: str, date: datetime) -> None:
     return
 
 
+def data_to_parquet(data: Any, filename: str, date: datetime) -> None:
+    """
+    Save data as a typed, compressed Parquet file in the specified directory.
+
+    Falls back to JSON when pyarrow is not installed.
+
+    Args:
+        data (Any): raw API payload to save
+        filename (str): file name (without directory)
+        date (datetime): date to use in the filename
+    """
+    if not data:
+        logger.warning("No data to save")
+        return
+    if not PARQUET_AVAILABLE:
+        logger.warning("pyarrow is not installed, saving as JSON instead")
+        data_to_json(data, filename, date)
+        return
+
+    file_path = build_file_path(filename, date, "parquet")
+    ensure_parent_directory_exists(file_path)
+
+    try:
+        df = raw_to_dataframe(data)
+        df.to_parquet(file_path, index=False, compression=PARQUET_COMPRESSION)
+        logger.info(f"Data saved to {file_path}")
+    except (IOError, OSError, ValueError) as e:
+        logger.error(f"Error saving data to {file_path}: {e}")
+
+
+def save_raw_data(
+    data: Any, filename: str, date: datetime, raw_format: Optional[str] = None
+) -> None:
+    """
+    Save raw API data in the configured format (BTC_APP_RAW_FORMAT).
+
+    Args:
+        data (Any): raw API payload to save
+        filename (str): file name (without directory)
+        date (datetime): date to use in the filename
+        raw_format (Optional[str]): "json" or "parquet" (default: RAW_FORMAT)
+    """
+    raw_format = raw_format or RAW_FORMAT
+    if raw_format == "parquet":
+        data_to_parquet(data, filename, date)
+    elif raw_format == "json":
+        data_to_json(data, filename, date)
+    else:
+        raise ValueError(f"Unsupported raw format: {raw_format}")
+
+
 def request_data(
     endpoint: str, params: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict]:
     """
     Make a GET request to the Binance API.
 
+    The request goes through the shared pooled session. The shared rate
+    limiter paces calls on the endpoint weight and is resynchronised with
+    the used weight Binance reports in the response headers; every attempt,
+    retries included, is charged to it. 5xx responses and connection errors
+    are retried here with the backoff of the shared retry policy (see
+    http_session.build_retry). On 429/418 the limiter pauses every caller
+    for Retry-After, then the request is sent again (up to
+    RATE_LIMIT_RETRIES times).
+
     Args:
         endpoint (str): API endpoint to call.
         params (Optional[Dict[str, Any]], optional): Query parameters for the API call.
@@ -70,58 +173,128 @@ def request_data(
         Optional[Dict]: JSON response or None if the request fails.
     """
     url = BINANCE_URL + endpoint
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.error(f"Http request error : {e}")
-        return None
+    limiter = get_rate_limiter()
+    retry = get_retry_policy()
+    rate_limited = 0
+    while True:
+        # Chaque tentative paie son poids et attend la fin d'une pause en cours
+        limiter.acquire(endpoint_weight(endpoint))
+        try:
+            response = get_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+            limiter.update_from_headers(response.headers)
+            if response.status_code in (418, 429):
+                # 429 = limite atteinte, 418 = IP bannie: tout le monde attend
+                retry_after = response.headers.get("Retry-After", "60")
+                limiter.block_for(
+                    float(retry_after) if retry_after.isdigit() else 60.0
+                )
+                if rate_limited < RATE_LIMIT_RETRIES:
+                    rate_limited += 1
+                    logger.warning(
+                        f"HTTP {response.status_code} on {endpoint}, retrying "
+                        f"after the pause ({rate_limited}/{RATE_LIMIT_RETRIES})"
+                    )
+                    continue
+            elif retry.is_retry(
+                "GET", response.status_code, "Retry-After" in response.headers
+            ):
+                retry = retry.increment("GET", url, response=response.raw)
+                logger.warning(f"HTTP {response.status_code} on {endpoint}, retrying")
+                retry.sleep(response.raw)
+                continue
+            response.raise_for_status()
+            return response.json()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            try:
+                retry = retry.increment("GET", url, error=e)
+            except MaxRetryError:
+                logger.error(f"Http request error : {e}")
+                return None
+            logger.warning(f"Http request error on {endpoint}, retrying: {e}")
+            retry.sleep()
+        except MaxRetryError as e:
+            logger.error(f"Http request error : {e.reason or e}")
+            return None
+        except requests.RequestException as e:
+            logger.error(f"Http request error : {e}")
+            return None
 
 
-def get_data_from_binance(
-    endpoint: str, r_days: int = 1, use_today_for_filename: bool = True
-) -> None:
+def symbol_file_prefix(symbol: str) -> str:
     """
-    Fetch data from the Binance API and save it to a JSON file.
+    Build the file name prefix used for a trading pair.
 
     Args:
-        endpoint (str): API endpoint to fetch data from.
-        r_days (int): number of days to go back (default: 1 for yesterday)
-        use_today_for_filename (bool): if True, use today's date for the filename
+        symbol (str): trading pair, e.g. BTCUSDT.
+
+    Returns:
+        str: prefix such as "prices_BTC" (quote asset stripped).
     """
-    now = datetime.now()
-    yesterday = now - timedelta(days=r_days)
-    logger.debug(f"Yesterday's date is :{yesterday}")
+    base_asset = symbol.upper()
+    for quote in QUOTE_ASSETS:
+        if base_asset.endswith(quote) and base_asset != quote:
+            base_asset = base_asset[: -len(quote)]
+            break
+    return f"prices_{base_asset}"
+
+
+def day_bounds(day: datetime) -> Tuple[int, int]:
+    """
+    Return the first and last timestamps (ms) of the given day.
 
-    start_yesterday = datetime(yesterday.year, yesterday.month, yesterday.day, 0, 0, 0)
-    end_yesterday = datetime(yesterday.year, yesterday.month, yesterday.day, 23, 59, 59)
+    Args:
+        day (datetime): any moment of the target day.
+
+    Returns:
+        Tuple[int, int]: (start_timestamp, end_timestamp) in milliseconds.
+    """
+    start_day = datetime(day.year, day.month, day.day, 0, 0, 0)
+    end_day = datetime(day.year, day.month, day.day, 23, 59, 59)
+    return int(start_day.timestamp() * 1000), int(end_day.timestamp() * 1000)
 
-    start_timestamp = int(start_yesterday.timestamp() * 1000)
-    end_timestamp = int(end_yesterday.timestamp() * 1000)
+
+def build_endpoint_config(
+    endpoint: str, symbol: str = DEFAULT_SYMBOL, day: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Return the query parameters and file name for an endpoint and symbol.
+
+    Args:
+        endpoint (str): API endpoint, one of SUPPORTED_ENDPOINTS.
+        symbol (str): trading pair (default: BTCUSDT).
+        day (Optional[datetime]): day covered by the klines request
+            (default: yesterday).
+
+    Returns:
+        Dict[str, Any]: {"params": ..., "file": ...}
+    """
+    if day is None:
+        day = datetime.now() - timedelta(days=1)
+    start_timestamp, end_timestamp = day_bounds(day)
+    prefix = symbol_file_prefix(symbol)
 
     endpoint_mapping = {
         "klines": {
             "params": {
-                "symbol": "BTCUSDT",
+                "symbol": symbol,
                 "interval": "5m",
                 "startTime": start_timestamp,
                 "endTime": end_timestamp,
-                "limit": 1000,
+                "limit": KLINES_LIMIT,
             },
-            "file": "prices_BTC_KLINES",
+            "file": f"{prefix}_KLINES",
         },
         "ticker/24hr": {
             "params": {
-                "symbol": "BTCUSDT",
+                "symbol": symbol,
             },
-            "file": "prices_BTC_24h",
+            "file": f"{prefix}_24h",
         },
         "ticker/tradingDay": {
             "params": {
-                "symbol": "BTCUSDT",
+                "symbol": symbol,
             },
-            "file": "prices_BTC_daily",
+            "file": f"{prefix}_daily",
         },
     }
 
@@ -130,8 +303,29 @@ def get_data_from_binance(
         raise ValueError(
             f"Supported endpoints are : {', '.join(endpoint_mapping.keys())}"
         )
+    return endpoint_mapping[endpoint]
+
 
-    config = endpoint_mapping[endpoint]
+def get_data_from_binance(
+    endpoint: str,
+    r_days: int = 1,
+    use_today_for_filename: bool = True,
+    symbol: str = DEFAULT_SYMBOL,
+) -> None:
+    """
+    Fetch data from the Binance API and save it to a JSON file.
+
+    Args:
+        endpoint (str): API endpoint to fetch data from.
+        r_days (int): number of days to go back (default: 1 for yesterday)
+        use_today_for_filename (bool): if True, use today's date for the filename
+        symbol (str): trading pair (default: BTCUSDT)
+    """
+    now = datetime.now()
+    yesterday = now - timedelta(days=r_days)
+    logger.debug(f"Yesterday's date is :{yesterday}")
+
+    config = build_endpoint_config(endpoint, symbol, yesterday)
     logger.debug(f"Using configuration : {config}")
     data = request_data(endpoint, params=config["params"])
 
@@ -139,4 +333,143 @@ def get_data_from_binance(
         # Utilisez now ou yesterday selon le paramètre
         file_date = now if use_today_for_filename else yesterday
         logger.debug(f"Using date {file_date} for filename")
-        data_to_json(data, config["file"], file_date)
+        save_raw_data(data, config["file"], file_date)
+
+
+def iter_klines(
+    start_timestamp: int,
+    end_timestamp: int,
+    symbol: str = DEFAULT_SYMBOL,
+    interval: str = "5m",
+    limit: int = KLINES_LIMIT,
+) -> Iterator[List[list]]:
+    """
+    Yield pages of klines covering [start_timestamp, end_timestamp].
+
+    The range is split into startTime/endTime windows of at most `limit`
+    candles. After each page the cursor moves to the close time of the last
+    candle returned, so gaps or partial pages never skip data.
+
+    Args:
+        start_timestamp (int): first open time to fetch, in milliseconds.
+        end_timestamp (int): last open time to fetch, in milliseconds.
+        symbol (str): trading pair (default: BTCUSDT).
+        interval (str): kline interval, one of INTERVAL_MS keys.
+        limit (int): candles per request (max 1000 on Binance).
+
+    Yields:
+        List[list]: a non-empty page of raw klines.
+
+    Raises:
+        RuntimeError: if a page request fails, so a gap is never mistaken for
+            the end of the range.
+    """
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Supported intervals are : {', '.join(INTERVAL_MS.keys())}")
+
+    window_ms = INTERVAL_MS[interval] * limit
+    cursor = start_timestamp
+
+    while cursor <= end_timestamp:
+        window_end = min(cursor + window_ms - 1, end_timestamp)
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "startTime": cursor,
+            "endTime": window_end,
+            "limit": limit,
+        }
+        page = request_data("klines", params=params)
+
+        if page is None:
+            raise RuntimeError(
+                f"Klines request failed at {cursor} ({symbol} {interval})"
+            )
+
+        if not page:
+            logger.debug(f"No klines between {cursor} and {window_end}")
+            cursor = window_end + 1
+            continue
+
+        yield page
+        # Reprendre juste après la clôture de la dernière bougie reçue
+        cursor = int(page[-1][6]) + 1
+
+
+def backfill_klines(
+    start_date: date,
+    end_date: date,
+    symbol: str = DEFAULT_SYMBOL,
+    interval: str = "5m",
+    group_by: str = "day",
+) -> int:
+    """
+    Fetch all klines between two dates (inclusive) and save them as JSON.
+
+    Args:
+        start_date (date): first day to fetch.
+        end_date (date): last day to fetch.
+        symbol (str): trading pair (default: BTCUSDT).
+        interval (str): kline interval (default: 5m).
+        group_by (str): "day" writes one file per day, "chunk" writes one
+            file per API page.
+
+    Returns:
+        int: number of files written.
+
+    Raises:
+        RuntimeError: if a request fails. Days (or pages) completed before
+            the failure are kept; the partial day is not written.
+    """
+    if group_by not in ("day", "chunk"):
+        raise ValueError("group_by must be 'day' or 'chunk'")
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+
+    start_timestamp = int(
+        datetime(start_date.year, start_date.month, start_date.day).timestamp() * 1000
+    )
+    end_of_range = datetime(end_date.year, end_date.month, end_date.day) + timedelta(
+        days=1
+    )
+    end_timestamp = int(end_of_range.timestamp() * 1000) - 1
+    logger.info(
+        f"Backfilling {symbol} {interval} klines from {start_date} to {end_date}"
+    )
+
+    klines_file = f"{symbol_file_prefix(symbol)}_KLINES"
+    files_written = 0
+    current_day = None
+    day_rows: List[list] = []
+
+    try:
+        for page in iter_klines(start_timestamp, end_timestamp, symbol, interval):
+            if group_by == "chunk":
+                chunk_date = datetime.fromtimestamp(page[0][0] / 1000)
+                save_raw_data(page, f"{klines_file}_{page[0][0]}", chunk_date)
+                files_written += 1
+                continue
+
+            # Regrouper les bougies par jour, en n'en gardant qu'un en mémoire
+            for row in page:
+                row_day = datetime.fromtimestamp(row[0] / 1000).date()
+                if current_day is not None and row_day != current_day:
+                    save_raw_data(day_rows, klines_file, current_day)
+                    files_written += 1
+                    day_rows = []
+                current_day = row_day
+                day_rows.append(row)
+    except RuntimeError:
+        # Le jour en cours est incomplet: pas de fichier, il sera repris
+        logger.error(
+            f"Backfill incomplete: {files_written} files written, "
+            f"partial day {current_day} discarded"
+        )
+        raise
+
+    if day_rows:
+        save_raw_data(day_rows, klines_file, current_day)
+        files_written += 1
+
+    logger.info(f"Backfill completed: {files_written} files written")
+    return files_written
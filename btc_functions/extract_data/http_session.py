@@ -0,0 +1,143 @@
+import os
+import threading
+import requests
+from logging import getLogger
+from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("BTC_APP_HTTP_POOL_SIZE", "10"))
+MAX_RETRIES = int(os.getenv("BTC_APP_HTTP_MAX_RETRIES", "5"))
+BACKOFF_FACTOR = float(os.getenv("BTC_APP_HTTP_BACKOFF_FACTOR", "0.5"))
+BACKOFF_JITTER = float(os.getenv("BTC_APP_HTTP_BACKOFF_JITTER", "0.5"))
+BACKOFF_MAX = float(os.getenv("BTC_APP_HTTP_BACKOFF_MAX", "60"))
+REQUEST_TIMEOUT = float(os.getenv("BTC_APP_HTTP_TIMEOUT", "10"))
+
+# Statuts rejoués par request_data. Pas par urllib3: ses rejeux, faits dans
+# session.get, ne passent pas par le limiteur et consomment un poids qu'il ne
+# décompte pas. 429 et 418 sont traités à part: request_data met en pause
+# tous les appelants via le limiteur partagé avant de réessayer
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_retry_policy: Optional[Retry] = None
+_session_lock = threading.Lock()
+
+
+def build_retry(
+    max_retries: int = MAX_RETRIES,
+    backoff_factor: float = BACKOFF_FACTOR,
+    backoff_jitter: float = BACKOFF_JITTER,
+) -> Retry:
+    """
+    Build the retry policy applied by request_data.
+
+    5xx responses and connection errors are retried with exponential backoff
+    and jitter, honouring the Retry-After header sent with 503 responses.
+    Rate limit responses (429/418) are not covered, see
+    binance_daylies.request_data.
+
+    Args:
+        max_retries (int): maximum number of retries per request.
+        backoff_factor (float): base delay of the exponential backoff, in seconds.
+        backoff_jitter (float): random delay added to each backoff, in seconds.
+
+    Returns:
+        Retry: urllib3 retry policy, used through is_retry/increment/sleep.
+    """
+    return Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        backoff_max=BACKOFF_MAX,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def build_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """
+    Build a requests session with connection pooling.
+
+    The adapter does not retry anything (requests' default Retry(0)): every
+    attempt goes through request_data, which charges the rate limiter for it
+    and applies the build_retry policy.
+
+    Args:
+        pool_size (int): number of keep-alive connections kept per host.
+
+    Returns:
+        requests.Session: configured session.
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    logger.debug(f"HTTP session created (pool={pool_size})")
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide session, creating it on first use.
+
+    Returns:
+        requests.Session: shared session.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def get_retry_policy() -> Retry:
+    """
+    Return the process-wide retry policy, creating it on first use.
+
+    Returns:
+        Retry: shared retry policy (see build_retry).
+    """
+    global _retry_policy
+    if _retry_policy is None:
+        with _session_lock:
+            if _retry_policy is None:
+                _retry_policy = build_retry()
+    return _retry_policy
+
+
+def configure_session(pool_size: int = POOL_SIZE, **kwargs) -> requests.Session:
+    """
+    Replace the shared session and retry policy with the given settings.
+
+    Args:
+        pool_size (int): number of keep-alive connections kept per host.
+        **kwargs: keyword arguments forwarded to build_retry.
+
+    Returns:
+        requests.Session: the new shared session.
+    """
+    global _session, _retry_policy
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = build_session(pool_size)
+        _retry_policy = build_retry(**kwargs)
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared session and reset the shared retry policy."""
+    global _session, _retry_policy
+    with _session_lock:
+        _retry_policy = None
+        if _session is not None:
+            _session.close()
+            _session = None
+            logger.debug("HTTP session closed.")
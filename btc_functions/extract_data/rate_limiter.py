@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from logging import getLogger
+from typing import Callable, Mapping, Optional
+
+logger = getLogger(__name__)
+
+# Limite Binance par IP: 6000 de poids par minute (REQUEST_WEIGHT)
+WEIGHT_LIMIT = int(os.getenv("BTC_APP_BINANCE_WEIGHT_LIMIT", "6000"))
+WEIGHT_INTERVAL = 60.0
+SAFETY_RATIO = float(os.getenv("BTC_APP_BINANCE_WEIGHT_SAFETY", "0.8"))
+USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+ENDPOINT_WEIGHTS = {
+    "klines": 2,
+    "ticker/24hr": 2,  # poids pour un seul symbole
+    "ticker/tradingDay": 4,  # poids par symbole
+    "aggTrades": 4,
+}
+DEFAULT_WEIGHT = 2
+
+_limiter: Optional["WeightRateLimiter"] = None
+_limiter_lock = threading.Lock()
+
+
+def endpoint_weight(endpoint: str) -> int:
+    """
+    Return the request weight Binance charges for an endpoint.
+
+    Args:
+        endpoint (str): API endpoint.
+
+    Returns:
+        int: weight of one call.
+    """
+    return ENDPOINT_WEIGHTS.get(endpoint, DEFAULT_WEIGHT)
+
+
+class WeightRateLimiter:
+    """
+    Token bucket over Binance request weight.
+
+    The bucket holds `limit * safety_ratio` tokens and refills continuously
+    over `interval` seconds. Callers block in acquire() until enough weight
+    is available. The used weight reported by Binance in the response
+    headers resynchronises the bucket, so other clients sharing the IP are
+    accounted for.
+    """
+
+    def __init__(
+        self,
+        limit: int = WEIGHT_LIMIT,
+        interval: float = WEIGHT_INTERVAL,
+        safety_ratio: float = SAFETY_RATIO,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.capacity = limit * safety_ratio
+        self.rate = self.capacity / interval
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, weight: int) -> float:
+        """
+        Block until `weight` tokens are available, then consume them.
+
+        Args:
+            weight (int): weight of the upcoming request.
+
+        Returns:
+            float: total time spent waiting, in seconds.
+        """
+        if weight > self.capacity:
+            raise ValueError(f"Weight {weight} exceeds capacity {self.capacity}")
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                wait = max(self.blocked_until - now, 0.0)
+                if wait == 0.0 and self.tokens >= weight:
+                    self.tokens -= weight
+                    return waited
+                if wait == 0.0:
+                    wait = (weight - self.tokens) / self.rate
+
+            logger.debug(f"Rate limiter: waiting {wait:.2f}s for weight {weight}")
+            self._sleep(wait)
+            waited += wait
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Resynchronise the bucket with the used weight reported by Binance.
+
+        Args:
+            headers (Mapping[str, str]): response headers.
+        """
+        used = headers.get(USED_WEIGHT_HEADER)
+        if used is None:
+            return
+        try:
+            used = int(used)
+        except ValueError:
+            logger.warning(f"Invalid {USED_WEIGHT_HEADER} header: {used}")
+            return
+
+        with self._lock:
+            self._refill(self._clock())
+            remaining = self.capacity - used
+            # Le serveur fait foi: on ne se crédite jamais plus qu'il ne reste
+            if remaining < self.tokens:
+                self.tokens = max(remaining, 0.0)
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Pause every caller for the given duration (Retry-After on 429/418).
+
+        Args:
+            seconds (float): duration of the pause.
+        """
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, self._clock() + seconds)
+            self.tokens = 0.0
+        logger.warning(f"Rate limiter: requests paused for {seconds:.0f}s")
+
+
+def get_rate_limiter() -> WeightRateLimiter:
+    """
+    Return the process-wide rate limiter, creating it on first use.
+
+    Returns:
+        WeightRateLimiter: shared limiter.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = WeightRateLimiter()
+    return _limiter
+
+
+def configure_rate_limiter(**kwargs) -> WeightRateLimiter:
+    """
+    Replace the shared limiter with one built from the given settings.
+
+    Args:
+        **kwargs: keyword arguments forwarded to WeightRateLimiter.
+
+    Returns:
+        WeightRateLimiter: the new shared limiter.
+    """
+    global _limiter
+    with _limiter_lock:
+        _limiter = WeightRateLimiter(**kwargs)
+    return _limiter
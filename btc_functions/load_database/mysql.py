@@ -1,57 +1,156 @@
 import os
 import json
 import shutil
+import tempfile
+import threading
+import time
+import atexit
 import pandas as pd
 from logging import getLogger
-from sqlalchemy import create_engine
+from sqlalchemy import MetaData, Table, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError
 from pathlib import Path
 
+from .schema import (
+    PARQUET_AVAILABLE,
+    PRIMARY_KEYS,
+    TABLE_SCHEMAS,
+    cast_to_schema,
+    raw_to_dataframe,
+    sqlalchemy_types,
+)
+
 logger = getLogger(__name__)
 
+LOAD_MODES = ("append", "upsert")
+LOAD_STRATEGIES = ("to_sql", "executemany", "load_data")
+BULK_STRATEGIES = ("executemany", "load_data")
+BULK_BATCH_SIZE = int(os.getenv("BTC_APP_BULK_BATCH_SIZE", "10000"))
+UPSERT_CHUNKSIZE = 1000
+# Les clés primaires des tables ne portent que le timestamp (la colonne
+# symbol de daily / ticker24h n'en fait pas partie): seuls les fichiers BTC
+# peuvent y être chargés, sinon un upsert ETH écraserait les lignes BTC de
+# même timestamp
+LOADABLE_FILE_PREFIX = "prices_btc_"
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def build_connection_string():
+    """
+    Builds the MySQL connection string from environment variables.
+
+    Returns:
+        str: SQLAlchemy connection string or None if a variable is missing.
+    """
+    sql_user = os.getenv("DB_USER")
+    sql_pass = os.getenv("DB_PASSWORD")
+    sql_host = os.getenv("DB_HOST")
+    sql_port = os.getenv("DB_PORT")
+    sql_db = os.getenv("DB_NAME")
+
+    if not all([sql_user, sql_pass, sql_host, sql_port, sql_db]):
+        missing_vars = [
+            var
+            for var, val in {
+                "DB_USER": sql_user,
+                "DB_PASSWORD": sql_pass,
+                "DB_HOST": sql_host,
+                "DB_PORT": sql_port,
+                "DB_NAME": sql_db,
+            }.items()
+            if not val
+        ]
+
+        logger.error(f"Missing environment variables: {', '.join(missing_vars)}")
+        return None
+
+    sqlcmd = "mysql+pymysql://"
+    # Chaîne de connexion
+    logger.info(f"Attempting to connect to {sql_host}:{sql_port} as {sql_user}")
+    return f"{sqlcmd}{sql_user}:{sql_pass}@{sql_host}:{sql_port}/{sql_db}"
+
+
+def get_engine(connection_string: str, **pool_options):
+    """
+    Returns the process-wide pooled engine for a connection string.
+
+    The engine is created (and its connection tested) on the first call only;
+    later calls reuse it and its pool, so repeated queries cost no reconnect.
+
+    Args:
+        connection_string (str): SQLAlchemy connection string.
+        **pool_options: Overrides of pool_size, max_overflow, pool_pre_ping
+            and pool_recycle.
+
+    Returns:
+        engine: Cached SQLAlchemy engine.
+    """
+    options = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_pre_ping": POOL_PRE_PING,
+        "pool_recycle": POOL_RECYCLE,
+        **pool_options,
+    }
+    if make_url(connection_string).get_backend_name() == "sqlite":
+        # SQLite n'utilise pas de QueuePool
+        options = {"pool_pre_ping": options["pool_pre_ping"]}
+
+    key = (connection_string, tuple(sorted(options.items())))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            # LOAD DATA LOCAL INFILE doit être autorisé côté client (bulk_insert)
+            connect_args = (
+                {"local_infile": True} if os.getenv("DB_LOCAL_INFILE") else {}
+            )
+            engine = create_engine(
+                connection_string, connect_args=connect_args, **options
+            )
+            # Tester la connexion
+            with engine.connect():
+                pass
+            _engines[key] = engine
+            logger.info("Connection pool created.")
+    return engine
+
+
+def dispose_engines():
+    """Disposes every cached engine and empties the cache."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+atexit.register(dispose_engines)
+
 
 def create_connection():
     """
     Establishes a connection to the MySQL database using SQLAlchemy and environment variables.
 
+    The engine is shared by the whole process (see get_engine).
+
     Returns:
         engine: SQLAlchemy engine object or None if connection fails.
     """
     try:
-        sql_user = os.getenv("DB_USER")
-        sql_pass = os.getenv("DB_PASSWORD")
-        sql_host = os.getenv("DB_HOST")
-        sql_port = os.getenv("DB_PORT")
-        sql_db = os.getenv("DB_NAME")
-
-        if not all([sql_user, sql_pass, sql_host, sql_port, sql_db]):
-            missing_vars = [
-                var
-                for var, val in {
-                    "DB_USER": sql_user,
-                    "DB_PASSWORD": sql_pass,
-                    "DB_HOST": sql_host,
-                    "DB_PORT": sql_port,
-                    "DB_NAME": sql_db,
-                }.items()
-                if not val
-            ]
-
-            logger.error(f"Missing environment variables: {', '.join(missing_vars)}")
+        connection_string = build_connection_string()
+        if connection_string is None:
             return None
 
-        sqlcmd = "mysql+pymysql://"
-        # Chaîne de connexion
-        connection_string = (
-            f"{sqlcmd}{sql_user}:{sql_pass}@{sql_host}:{sql_port}/{sql_db}"
-        )
-        logger.info(f"Attempting to connect to {sql_host}:{sql_port} as {sql_user}")
-
-        engine = create_engine(connection_string)
-        # Tester la connexion
-        with engine.connect() as conn:
-            pass
-
+        engine = get_engine(connection_string)
         logger.info("Connection to MySQL established successfully.")
         return engine
 
@@ -144,7 +243,9 @@ def convert_all_json_to_csv(json_dir: str, csv_dir: str) -> int:
     return successful_conversions
 
 
-def insert_data_from_csv(engine, csv_file: str, table_name: str) -> bool:
+def insert_data_from_csv(
+    engine, csv_file: str, table_name: str, mode: str = "append"
+) -> bool:
     """
     Inserts data from a CSV file into a MySQL database table.
 
@@ -152,6 +253,7 @@ def insert_data_from_csv(engine, csv_file: str, table_name: str) -> bool:
         engine: SQLAlchemy engine object for database connection.
         csv_file (str): Path to the CSV file to be inserted.
         table_name (str): Name of the target table in the database.
+        mode (str): "append" or "upsert". Defaults to "append".
 
     Returns:
         bool: True if insertion was successful, False otherwise.
@@ -162,9 +264,7 @@ def insert_data_from_csv(engine, csv_file: str, table_name: str) -> bool:
             logger.warning(f"No data to insert from {csv_file}")
             return False
 
-        with engine.begin() as connection:
-            data.to_sql(table_name, con=connection, if_exists="append", index=False)
-            logger.info(f"Inserted {len(data)} rows into the table {table_name}")
+        insert_dataframe(engine, data, table_name, mode)
         return True
 
     # ERRORS
@@ -181,10 +281,310 @@ def insert_data_from_csv(engine, csv_file: str, table_name: str) -> bool:
         return False
 
 
+def read_raw_file(raw_file: str, table_name: str = None) -> pd.DataFrame:
+    """
+    Reads a raw data file (Parquet, JSON or CSV) into a typed DataFrame.
+
+    JSON payloads are converted straight to typed columns, without going
+    through CSV. When the target table is known, its schema (init_db.sql)
+    selects the columns and drives their dtypes.
+
+    Args:
+        raw_file (str): Path to the raw file.
+        table_name (str, optional): Target table. Defaults to None.
+
+    Returns:
+        pd.DataFrame: File content, with the column dtypes of the database schema.
+    """
+    suffix = Path(raw_file).suffix.lower()
+
+    if suffix == ".parquet":
+        if not PARQUET_AVAILABLE:
+            raise ImportError("pyarrow is required to read Parquet files")
+        data = pd.read_parquet(raw_file)
+    elif suffix == ".json":
+        with open(raw_file, "r") as file:
+            data = raw_to_dataframe(json.load(file), table_name)
+    elif suffix == ".csv":
+        data = pd.read_csv(raw_file)
+    else:
+        raise ValueError(f"Unsupported raw file format: {raw_file}")
+
+    if table_name in TABLE_SCHEMAS:
+        data = cast_to_schema(data, table_name)
+    return data
+
+
+def build_insert_statement(table, dialect: str, columns: list, primary_keys=None):
+    """
+    Builds an INSERT statement, turned into an upsert when primary keys are given.
+
+    MySQL uses INSERT ... ON DUPLICATE KEY UPDATE, SQLite uses
+    INSERT ... ON CONFLICT DO UPDATE.
+
+    Args:
+        table: SQLAlchemy Table to insert into.
+        dialect (str): Name of the database dialect ("mysql", "sqlite").
+        columns (list): Columns being inserted.
+        primary_keys (list, optional): Primary key columns.
+            Defaults to None (plain INSERT).
+
+    Returns:
+        Insert: Statement to execute with a list of rows.
+    """
+    if not primary_keys:
+        return table.insert()
+
+    if dialect == "mysql":
+        stmt = mysql_insert(table)
+        updates = {
+            col: stmt.inserted[col] for col in columns if col not in primary_keys
+        }
+        return stmt.on_duplicate_key_update(**updates)
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table)
+        updates = {
+            col: stmt.excluded[col] for col in columns if col not in primary_keys
+        }
+        return stmt.on_conflict_do_update(index_elements=primary_keys, set_=updates)
+
+    raise NotImplementedError(f"Upsert not supported for {dialect}")
+
+
+def make_upsert_method(primary_keys: list):
+    """
+    Builds a DataFrame.to_sql insertion method that upserts on the primary keys.
+
+    Each chunk is sent in a single execute call, so no per-row existence
+    check is needed.
+
+    Args:
+        primary_keys (list): Primary key columns of the target table.
+
+    Returns:
+        callable: Method to pass as DataFrame.to_sql(method=...).
+    """
+
+    def upsert(pd_table, conn, keys, data_iter):
+        rows = [dict(zip(keys, row)) for row in data_iter]
+        if not rows:
+            return 0
+        stmt = build_insert_statement(
+            pd_table.table, conn.dialect.name, keys, primary_keys
+        )
+        return conn.execute(stmt, rows).rowcount
+
+    return upsert
+
+
+def _records(data: pd.DataFrame) -> list:
+    """Converts a DataFrame to a list of dicts, with None instead of NaN."""
+    if data.isna().any().any():
+        data = data.astype(object).where(data.notna(), None)
+    return data.to_dict("records")
+
+
+def _bulk_executemany(connection, data, table_name, primary_keys, batch_size):
+    """Inserts the rows by batches of multi-row executemany calls."""
+    table = Table(table_name, MetaData(), autoload_with=connection)
+    columns = list(data.columns)
+    stmt = build_insert_statement(
+        table, connection.dialect.name, columns, primary_keys
+    )
+
+    for start in range(0, len(data), batch_size):
+        batch = data.iloc[start : start + batch_size]
+        connection.execute(stmt, _records(batch))
+        logger.debug(f"Batch of {len(batch)} rows sent to {table_name}")
+
+
+def _bulk_load_data(connection, data, table_name, primary_keys, batch_size):
+    """Streams the rows through LOAD DATA LOCAL INFILE, one temp file per batch."""
+    if connection.dialect.name != "mysql":
+        raise NotImplementedError("LOAD DATA LOCAL INFILE requires MySQL")
+
+    columns = ", ".join(f"`{col}`" for col in data.columns)
+    # REPLACE remplace les lignes dont la clé primaire existe déjà
+    duplicates = "REPLACE" if primary_keys else ""
+
+    for start in range(0, len(data), batch_size):
+        batch = data.iloc[start : start + batch_size]
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as tmp:
+            batch.to_csv(tmp, index=False, header=False, na_rep="\\N")
+        try:
+            connection.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{Path(tmp.name).as_posix()}' {duplicates} "
+                f"INTO TABLE `{table_name}` FIELDS TERMINATED BY ',' "
+                f"OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' ({columns})"
+            )
+        finally:
+            os.remove(tmp.name)
+        logger.debug(f"Batch of {len(batch)} rows loaded into {table_name}")
+
+
+def bulk_insert(
+    engine,
+    data: pd.DataFrame,
+    table_name: str,
+    strategy: str = "executemany",
+    batch_size: int = BULK_BATCH_SIZE,
+    mode: str = "append",
+) -> int:
+    """
+    Inserts a DataFrame into an existing table with a high-throughput strategy.
+
+    Strategies:
+        - "executemany": batches of rows sent with executemany, which the
+          driver turns into multi-row INSERT statements.
+        - "load_data": each batch is written to a temporary CSV file and
+          loaded with LOAD DATA LOCAL INFILE (MySQL only, requires
+          DB_LOCAL_INFILE=1 and local_infile enabled on the server).
+
+    Args:
+        engine: SQLAlchemy engine object for database connection.
+        data (pd.DataFrame): Rows to insert.
+        table_name (str): Name of the target table (must already exist).
+        strategy (str): "executemany" or "load_data". Defaults to "executemany".
+        batch_size (int): Number of rows per batch.
+        mode (str): "append" or "upsert". Defaults to "append".
+
+    Returns:
+        int: Number of rows sent to the database.
+    """
+    if strategy not in BULK_STRATEGIES:
+        raise ValueError(f"Unknown bulk strategy: {strategy}")
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode}")
+
+    primary_keys = None
+    if mode == "upsert":
+        if table_name not in PRIMARY_KEYS:
+            raise ValueError(f"No primary key known for table {table_name}")
+        primary_keys = PRIMARY_KEYS[table_name]
+
+    loader = _bulk_executemany if strategy == "executemany" else _bulk_load_data
+    start_time = time.perf_counter()
+    with engine.begin() as connection:
+        loader(connection, data, table_name, primary_keys, batch_size)
+    elapsed = time.perf_counter() - start_time
+
+    rows_per_sec = len(data) / elapsed if elapsed > 0 else float("inf")
+    logger.info(
+        f"Inserted {len(data)} rows into {table_name} with {strategy} ({mode}) "
+        f"in {elapsed:.2f}s: {rows_per_sec:.0f} rows/s"
+    )
+    return len(data)
+
+
+def insert_dataframe(
+    engine,
+    data: pd.DataFrame,
+    table_name: str,
+    mode: str = "append",
+    strategy: str = "to_sql",
+    batch_size: int = BULK_BATCH_SIZE,
+):
+    """
+    Writes a DataFrame into a table, appending or upserting the rows.
+
+    Args:
+        engine: SQLAlchemy engine object for database connection.
+        data (pd.DataFrame): Rows to write.
+        table_name (str): Name of the target table in the database.
+        mode (str): "append" (plain INSERT) or "upsert" (update on duplicate key).
+        strategy (str): "to_sql" (creates the table if needed) or one of
+            BULK_STRATEGIES (table must exist). Defaults to "to_sql".
+        batch_size (int): Number of rows per batch for the bulk strategies.
+
+    Raises:
+        ValueError: If the mode is unknown or the table has no known primary key.
+    """
+    if strategy in BULK_STRATEGIES:
+        bulk_insert(engine, data, table_name, strategy, batch_size, mode)
+        return
+    if strategy != "to_sql":
+        raise ValueError(f"Unknown load strategy: {strategy}")
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode: {mode}")
+
+    column_types = (
+        sqlalchemy_types(table_name) if table_name in TABLE_SCHEMAS else None
+    )
+    method = None
+    chunksize = None
+    if mode == "upsert":
+        if table_name not in PRIMARY_KEYS:
+            raise ValueError(f"No primary key known for table {table_name}")
+        method = make_upsert_method(PRIMARY_KEYS[table_name])
+        chunksize = UPSERT_CHUNKSIZE
+
+    with engine.begin() as connection:
+        data.to_sql(
+            table_name,
+            con=connection,
+            if_exists="append",
+            index=False,
+            dtype=column_types,
+            method=method,
+            chunksize=chunksize,
+        )
+    logger.info(f"Inserted {len(data)} rows into the table {table_name} ({mode})")
+
+
+def insert_data_from_file(
+    engine,
+    raw_file: str,
+    table_name: str,
+    mode: str = "append",
+    strategy: str = "to_sql",
+    batch_size: int = BULK_BATCH_SIZE,
+) -> bool:
+    """
+    Inserts data from a raw file (Parquet, JSON or CSV) into a MySQL table.
+
+    The file is read once into typed columns and written to the database,
+    using the column types of the table schema. With mode="upsert", rows
+    whose primary key already exists are updated, so reloading a file or
+    overlapping backfills is safe.
+
+    Args:
+        engine: SQLAlchemy engine object for database connection.
+        raw_file (str): Path to the file to be inserted.
+        table_name (str): Name of the target table in the database.
+        mode (str): "append" or "upsert". Defaults to "append".
+        strategy (str): One of LOAD_STRATEGIES. Defaults to "to_sql".
+        batch_size (int): Number of rows per batch for the bulk strategies.
+
+    Returns:
+        bool: True if insertion was successful, False otherwise.
+    """
+    try:
+        data = read_raw_file(raw_file, table_name)
+        if data.empty:
+            logger.warning(f"No data to insert from {raw_file}")
+            return False
+
+        insert_dataframe(engine, data, table_name, mode, strategy, batch_size)
+        return True
+
+    # ERRORS
+    except SQLAlchemyError as e:
+        logger.error(
+            f"Database error inserting data from {raw_file} into {table_name}: {e}"
+        )
+        return False
+    except Exception as e:
+        logger.error(f"Unexpected error processing {raw_file}: {e}")
+        return False
+
+
 def close_engine(engine):
     """
     Closes the SQLAlchemy engine connection.
 
+    The pooled connections are released; a cached engine stays usable and
+    reconnects on its next use.
+
     Args:
         engine: The SQLAlchemy engine to be closed.
     """
@@ -216,14 +616,26 @@ def get_table_name(file_path):
     Args:
         file_path (str): Path of the CSV file.
 
+    Files of other assets (prices_ETH_...) are not loaded: the primary keys
+    are timestamp-only, so their rows would overwrite the BTC rows.
+
     Returns:
         str: Table name or "unknownfile" if file type isn't recognized.
     """
     file_path = file_path.lower()
-
+    file_name = os.path.basename(file_path)
+
+    if file_name.startswith("prices_") and not file_name.startswith(
+        LOADABLE_FILE_PREFIX
+    ):
+        logger.warning(
+            f"File ignored: {file_path} (only BTC files can be loaded, "
+            "the primary keys are timestamp-only)."
+        )
+        return "unknownfile"
     if "klines" in file_path:
         return "klines"
-    elif "btc_24h" in file_path:
+    elif "_24h" in file_path:
         return "ticker24h"
     elif "daily" in file_path:
         return "daily"
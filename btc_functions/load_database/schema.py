@@ -0,0 +1,252 @@
+import pandas as pd
+from logging import getLogger
+from typing import Any, Dict, List, Optional
+from sqlalchemy import BigInteger, Integer, Numeric, String
+from sqlalchemy.types import TypeEngine
+
+logger = getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Ordre des champs d'une kline renvoyée par Binance
+KLINES_COLUMNS = [
+    "kline_open_time",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "kline_close_time",
+    "quote_asset_volume",
+    "number_of_trades",
+    "taker_buy_base_asset_volume",
+    "taker_buy_quote_asset_volume",
+    "ignore",
+]
+
+# Miroir de docker-compose/init-scripts/init_db.sql
+TABLE_SCHEMAS = {
+    "klines": {
+        "kline_open_time": "BIGINT",
+        "open_price": "DECIMAL(18, 8)",
+        "high_price": "DECIMAL(18, 8)",
+        "low_price": "DECIMAL(18, 8)",
+        "close_price": "DECIMAL(18, 8)",
+        "volume": "DECIMAL(24, 8)",
+        "kline_close_time": "BIGINT",
+        "quote_asset_volume": "DECIMAL(24, 8)",
+        "number_of_trades": "INT",
+        "taker_buy_base_asset_volume": "DECIMAL(24, 8)",
+        "taker_buy_quote_asset_volume": "DECIMAL(24, 8)",
+    },
+    "ticker24h": {
+        "symbol": "VARCHAR(10)",
+        "priceChange": "DECIMAL(18, 8)",
+        "priceChangePercent": "DECIMAL(18, 6)",
+        "weightedAvgPrice": "DECIMAL(18, 8)",
+        "prevClosePrice": "DECIMAL(18, 8)",
+        "lastPrice": "DECIMAL(18, 8)",
+        "lastQty": "DECIMAL(24, 8)",
+        "bidPrice": "DECIMAL(18, 8)",
+        "bidQty": "DECIMAL(24, 8)",
+        "askPrice": "DECIMAL(18, 8)",
+        "askQty": "DECIMAL(24, 8)",
+        "openPrice": "DECIMAL(18, 8)",
+        "highPrice": "DECIMAL(18, 8)",
+        "lowPrice": "DECIMAL(18, 8)",
+        "volume": "DECIMAL(24, 8)",
+        "quoteVolume": "DECIMAL(24, 8)",
+        "openTime": "BIGINT",
+        "closeTime": "BIGINT",
+        "firstId": "BIGINT",
+        "lastId": "BIGINT",
+        "count": "INT",
+    },
+    "daily": {
+        "symbol": "VARCHAR(10)",
+        "priceChange": "DECIMAL(18, 8)",
+        "priceChangePercent": "DECIMAL(18, 8)",
+        "weightedAvgPrice": "DECIMAL(18, 8)",
+        "openPrice": "DECIMAL(18, 8)",
+        "highPrice": "DECIMAL(18, 8)",
+        "lowPrice": "DECIMAL(18, 8)",
+        "lastPrice": "DECIMAL(18, 8)",
+        "volume": "DECIMAL(18, 8)",
+        "quoteVolume": "DECIMAL(18, 8)",
+        "openTime": "BIGINT",
+        "closeTime": "BIGINT",
+        "firstId": "BIGINT",
+        "lastId": "BIGINT",
+        "count": "INT",
+    },
+}
+
+PRIMARY_KEYS = {
+    "klines": ["kline_open_time"],
+    "ticker24h": ["openTime"],
+    "daily": ["openTime"],
+}
+
+SQL_TO_PANDAS = {
+    "BIGINT": "int64",
+    "INT": "int64",
+    "DECIMAL": "float64",
+    "VARCHAR": "string",
+}
+
+
+def _base_type(sql_type: str) -> str:
+    """Returns the SQL type without its arguments: DECIMAL(18, 8) -> DECIMAL."""
+    return sql_type.split("(")[0].strip().upper()
+
+
+def _type_arguments(sql_type: str) -> List[int]:
+    """Returns the SQL type arguments: DECIMAL(18, 8) -> [18, 8]."""
+    if "(" not in sql_type:
+        return []
+    arguments = sql_type[sql_type.index("(") + 1 : sql_type.rindex(")")]
+    return [int(arg) for arg in arguments.split(",")]
+
+
+def table_dtypes(table_name: Optional[str] = None) -> Dict[str, str]:
+    """
+    Returns the pandas dtype of each column of a table.
+
+    Args:
+        table_name (Optional[str]): table name, or None for every known column.
+
+    Returns:
+        Dict[str, str]: column name -> pandas dtype.
+    """
+    if table_name is None:
+        schemas = TABLE_SCHEMAS.values()
+    elif table_name in TABLE_SCHEMAS:
+        schemas = [TABLE_SCHEMAS[table_name]]
+    else:
+        raise ValueError(f"Unknown table: {table_name}")
+
+    dtypes = {}
+    for schema in schemas:
+        for column, sql_type in schema.items():
+            dtypes[column] = SQL_TO_PANDAS[_base_type(sql_type)]
+    return dtypes
+
+
+def compact_dtypes(
+    table_name: Optional[str] = None, float_dtype: str = "float64"
+) -> Dict[str, str]:
+    """
+    Returns the smallest pandas dtype fitting each column of a table, for
+    frames read back from the database.
+
+    DECIMAL columns become float_dtype, INT columns (counts) int32, VARCHAR
+    columns category. BIGINT columns (timestamps, ids) stay int64.
+
+    Args:
+        table_name (Optional[str]): table name, or None for every known column.
+        float_dtype (str): dtype of DECIMAL columns (float64 or float32).
+
+    Returns:
+        Dict[str, str]: column name -> pandas dtype.
+    """
+    compact = {"INT": "int32", "DECIMAL": float_dtype, "VARCHAR": "category"}
+    if table_name is None:
+        schemas = TABLE_SCHEMAS.values()
+    elif table_name in TABLE_SCHEMAS:
+        schemas = [TABLE_SCHEMAS[table_name]]
+    else:
+        raise ValueError(f"Unknown table: {table_name}")
+
+    dtypes = {}
+    for schema in schemas:
+        for column, sql_type in schema.items():
+            base_type = _base_type(sql_type)
+            dtypes[column] = compact.get(base_type, SQL_TO_PANDAS[base_type])
+    return dtypes
+
+
+def sqlalchemy_types(table_name: str) -> Dict[str, TypeEngine]:
+    """
+    Returns the SQLAlchemy type of each column of a table, for DataFrame.to_sql.
+
+    Args:
+        table_name (str): table name.
+
+    Returns:
+        Dict[str, TypeEngine]: column name -> SQLAlchemy type.
+    """
+    if table_name not in TABLE_SCHEMAS:
+        raise ValueError(f"Unknown table: {table_name}")
+
+    types = {}
+    for column, sql_type in TABLE_SCHEMAS[table_name].items():
+        base_type = _base_type(sql_type)
+        arguments = _type_arguments(sql_type)
+        if base_type == "BIGINT":
+            types[column] = BigInteger()
+        elif base_type == "INT":
+            types[column] = Integer()
+        elif base_type == "DECIMAL":
+            types[column] = Numeric(*arguments, asdecimal=False)
+        elif base_type == "VARCHAR":
+            types[column] = String(*arguments)
+    return types
+
+
+def cast_to_schema(df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+    """
+    Keeps the columns of a table and casts them to the dtypes of its schema.
+
+    Args:
+        df (pd.DataFrame): DataFrame to cast.
+        table_name (str): target table.
+
+    Returns:
+        pd.DataFrame: DataFrame restricted to the table columns, typed.
+
+    Raises:
+        ValueError: if a column of the table is missing.
+    """
+    dtypes = table_dtypes(table_name)
+    missing_cols = [col for col in dtypes if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns for table {table_name}: {missing_cols}")
+
+    extra_cols = [col for col in df.columns if col not in dtypes]
+    if extra_cols:
+        logger.debug(f"Columns ignored for table {table_name}: {extra_cols}")
+
+    return df[list(dtypes)].astype(dtypes)
+
+
+def raw_to_dataframe(data: Any, table_name: Optional[str] = None) -> pd.DataFrame:
+    """
+    Converts a raw Binance payload into a typed DataFrame.
+
+    Klines (list of lists) get their column names, ticker payloads (dict or
+    list of dicts) keep theirs. Known columns are cast to the dtype of their
+    SQL type, so prices come out as float64 and timestamps as int64.
+
+    Args:
+        data (Any): payload returned by the Binance API.
+        table_name (Optional[str]): target table, used to pick the dtypes.
+
+    Returns:
+        pd.DataFrame: typed DataFrame.
+    """
+    if isinstance(data, dict):
+        df = pd.DataFrame([data])
+    elif isinstance(data, list) and data and all(isinstance(r, list) for r in data):
+        df = pd.DataFrame(data, columns=KLINES_COLUMNS).drop(columns=["ignore"])
+    elif isinstance(data, list) and data and all(isinstance(r, dict) for r in data):
+        df = pd.DataFrame(data)
+    else:
+        raise ValueError("Unsupported raw data format")
+
+    dtypes = table_dtypes(table_name)
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
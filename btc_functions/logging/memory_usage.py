@@ -0,0 +1,54 @@
+import logging
+import tracemalloc
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Mémoire suivie au début de l'étape en cours (fin de l'étape précédente)
+_stage_start = 0
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """Mémoire occupée par un DataFrame (chaînes comprises), en Mo."""
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def start_memory_tracking() -> None:
+    """
+    Active le suivi des allocations (tracemalloc, allocations numpy et
+    pandas comprises): chaque appel à log_memory rapporte ensuite le pic de
+    l'étape qui se termine, depuis l'appel précédent.
+    """
+    global _stage_start
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    _stage_start = tracemalloc.get_traced_memory()[0]
+
+
+def log_memory(stage: str, df: Optional[pd.DataFrame] = None) -> None:
+    """
+    Journalise la mémoire à la fin d'une étape: taille du DataFrame produit
+    et, si start_memory_tracking a été appelé, pic de mémoire suivie pendant
+    l'étape (depuis le log_memory précédent) et hausse par rapport à son
+    début. Le pic est ensuite remis à zéro pour l'étape suivante.
+
+    Args:
+        stage (str): nom de l'étape
+        df (pd.DataFrame, optional): DataFrame produit par l'étape
+    """
+    global _stage_start
+    parts = [f"Mémoire [{stage}]"]
+    if df is not None:
+        parts.append(f"DataFrame {frame_memory_mb(df):.1f} Mo ({len(df)} lignes)")
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        parts.append(
+            f"pic de l'étape {peak / 1024**2:.1f} Mo "
+            f"(+{(peak - _stage_start) / 1024**2:.1f} Mo)"
+        )
+        tracemalloc.reset_peak()
+        _stage_start = current
+    logger.info(" - ".join(parts))
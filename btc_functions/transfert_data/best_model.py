@@ -1,16 +1,37 @@
 import logging
 import os
+import shutil
+import time
+from collections import defaultdict
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
-from joblib import dump, load
-from sklearn.model_selection import train_test_split, cross_val_score
+from joblib import Parallel, delayed, dump, load
+from sklearn.base import BaseEstimator, clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    HalvingGridSearchCV,
+    KFold,
+    TimeSeriesSplit,
+    train_test_split,
+)
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, accuracy_score
 
+from ..logging.memory_usage import log_memory
+from .features import FEATURE_SPECS, compute_features, feature_name
+from .get_data_as_df import copy_for_update
+from .model_registry import (
+    MODEL_COMPRESSION,
+    compression_setting,
+    promote_model,
+    register_model,
+)
+
 logger = logging.getLogger(__name__)
 
 # Constants
@@ -23,77 +44,358 @@ FEATURES_COLUMNS = [
     "priceChange",
     "priceChangePercent",
 ]
+# Colonnes à lire en base pour construire FEATURES_COLUMNS après fusion
+# ("volume" est présent des deux côtés: il devient volume_x / volume_y)
+KLINES_ML_COLUMNS = [
+    "kline_open_time",
+    "kline_close_time",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "taker_buy_base_asset_volume",
+]
+DAILY_ML_COLUMNS = [
+    "openTime",
+    "closeTime",
+    "priceChange",
+    "priceChangePercent",
+    "volume",
+]
 MODEL_FOLDER = os.path.expanduser("~/BTC_app/models_ml")
+# Jointure as-of: la ligne daily ouverte à J+1 décrit le jour J
+ASOF_OFFSET = pd.Timedelta(days=1)
+ASOF_TOLERANCE = pd.Timedelta(days=1)
+# Nombre de processus pour la sélection de modèles (-1: tous les cœurs)
+N_JOBS = int(os.getenv("BTC_APP_N_JOBS", "-1"))
+# Validation walk-forward: plis successifs, entraînement sur le passé seul
+CV_SPLITS = 5
+# Lignes écartées entre entraînement et test: la cible regarde la bougie
+# suivante et les indicateurs jusqu'à un jour de klines 5m en arrière
+EMBARGO_ROWS = 288
+TEST_SIZE = 0.2
+# Recherche d'hyperparamètres par successive halving (mode search)
+PARAM_GRIDS = {
+    "LinearRegression": {"fit_intercept": [True, False]},
+    "DecisionTreeRegressor": {
+        "max_depth": [3, 5, 8, 12, None],
+        "min_samples_leaf": [1, 10, 50, 200],
+    },
+    "RandomForestRegressor": {
+        "max_depth": [5, 10, None],
+        "min_samples_leaf": [1, 10, 50],
+        "max_features": [1.0, "sqrt"],
+    },
+}
+# Ressource augmentée à chaque tour: nombre d'arbres pour la forêt,
+# nombre de lignes d'entraînement pour les autres modèles
+SEARCH_RESOURCES = {
+    "RandomForestRegressor": ("n_estimators", 25, 200),
+}
+HALVING_FACTOR = 3
+
+
+def build_models() -> Dict[str, BaseEstimator]:
+    """
+    Returns the candidate models, not fitted.
+
+    Returns:
+        Dict[str, BaseEstimator]: model name -> estimator.
+    """
+    return {
+        "LinearRegression": LinearRegression(),
+        "DecisionTreeRegressor": DecisionTreeRegressor(random_state=42),
+        "RandomForestRegressor": RandomForestRegressor(
+            n_estimators=100, random_state=42
+        ),
+    }
+
+
+def _fit_and_score(model, X, y, train_idx, test_idx) -> Tuple[float, float, float]:
+    """Entraîne une copie du modèle sur un pli: (-MSE, début, fin)."""
+    start = time.time()
+    fitted = clone(model).fit(X[train_idx], y[train_idx])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = -mean_squared_error(y[test_idx], fitted.predict(X[test_idx]))
+    return score, start, time.time()
 
 
-def compute_model_score(model, X, y, cv=3) -> float:
+def _fit(model, X, y) -> Tuple[BaseEstimator, float, float]:
+    """Entraîne une copie du modèle sur toutes les lignes: (modèle, début, fin)."""
+    start = time.time()
+    fitted = clone(model).fit(X, y)
+    return fitted, start, time.time()
+
+
+def walk_forward_splits(
+    n_samples: int,
+    n_splits: int = CV_SPLITS,
+    embargo: int = EMBARGO_ROWS,
+    max_train_size: Optional[int] = None,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
     """
-    Calcule le score de validation croisée et retourne l'opposé du MSE pour
-    compatibilité avec les fonctions de maximisation.
+    Builds walk-forward (expanding window) folds over time-ordered rows.
+
+    Each fold tests on a block of rows and trains only on the rows before
+    it, minus an embargo gap so that targets and rolling features of the
+    training rows do not overlap the test block.
 
     Args:
-        model (sklearn estimator): Modèle à évaluer.
-        X (pd.DataFrame): Matrice de caractéristiques.
-        y (pd.Series): Variable cible.
-        cv (int): Nombre de plis pour validation croisée.
+        n_samples (int): Number of rows, in chronological order.
+        n_splits (int): Number of folds.
+        embargo (int): Rows dropped between training and test rows.
+        max_train_size (int, optional): Rolling window instead of expanding.
 
     Returns:
-        float: Score moyen de validation croisée (négatif du MSE).
+        List[Tuple[np.ndarray, np.ndarray]]: (train indices, test indices).
     """
-    with np.errstate(divide="ignore", invalid="ignore"):
-        cross_validation = cross_val_score(
-            model, X, y, cv=cv, scoring="neg_mean_squared_error"
+    splitter = TimeSeriesSplit(
+        n_splits=n_splits, gap=embargo, max_train_size=max_train_size
+    )
+    return list(splitter.split(np.zeros((n_samples, 1))))
+
+
+def chronological_split(X, y, test_size=TEST_SIZE, embargo=EMBARGO_ROWS) -> tuple:
+    """
+    Splits time-ordered data into train / holdout without shuffling.
+
+    Args:
+        X (pd.DataFrame): Feature matrix, in chronological order.
+        y (pd.Series): Target.
+        test_size (float): Share of the most recent rows kept for the holdout.
+        embargo (int): Rows dropped between the train and holdout sets.
+
+    Returns:
+        tuple: X_train, X_test, y_train, y_test.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, shuffle=False
+    )
+    if embargo:
+        X_train, y_train = X_train.iloc[:-embargo], y_train.iloc[:-embargo]
+    if len(X_train) == 0:
+        raise ValueError("Pas assez de données avant l'ensemble de test")
+    return X_train, X_test, y_train, y_test
+
+
+def evaluate_models(
+    models: Dict[str, BaseEstimator], X, y, cv=3, n_jobs=N_JOBS
+) -> Tuple[Dict[str, float], Dict[str, BaseEstimator]]:
+    """
+    Cross-validates and fits every candidate model in one process pool.
+
+    Each (model, fold) pair and each final fit is an independent task, so
+    the pool stays busy even when one model is much slower than the others.
+    X is built once; folds are index arrays into it, and joblib memory-maps
+    large arrays instead of copying them to every worker.
+
+    Args:
+        models (Dict[str, BaseEstimator]): Candidate models.
+        X (np.ndarray): Feature matrix.
+        y (np.ndarray | pd.Series): Target.
+        cv (int | list): Number of KFold folds, or precomputed
+            (train, test) index pairs such as walk_forward_splits.
+        n_jobs (int): Number of worker processes (-1: every core).
+
+    Returns:
+        Tuple[Dict[str, float], Dict[str, BaseEstimator]]: mean CV score
+            (negative MSE) and model fitted on all the data, per model name.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    folds = list(KFold(n_splits=cv).split(X)) if isinstance(cv, int) else list(cv)
+
+    tasks = []
+    for name, model in models.items():
+        tasks.append((name, "fit", delayed(_fit)(model, X, y)))
+        for train_idx, test_idx in folds:
+            task = delayed(_fit_and_score)(model, X, y, train_idx, test_idx)
+            tasks.append((name, "fold", task))
+
+    start = time.perf_counter()
+    results = Parallel(n_jobs=n_jobs)(task for _, _, task in tasks)
+    elapsed = time.perf_counter() - start
+
+    fold_scores = defaultdict(list)
+    fitted_models = {}
+    # Horodatages time.time(), comparables entre processus: temps écoulé
+    # d'un modèle = première tâche lancée -> dernière tâche terminée.
+    # Le temps de calcul cumulé somme les durées des tâches, parallèles
+    compute_times = defaultdict(float)
+    starts, ends = {}, {}
+    for (name, kind, _), (value, task_start, task_end) in zip(tasks, results):
+        compute_times[name] += task_end - task_start
+        starts[name] = min(starts.get(name, task_start), task_start)
+        ends[name] = max(ends.get(name, task_end), task_end)
+        if kind == "fit":
+            fitted_models[name] = value
+        else:
+            fold_scores[name].append(value)
+
+    scores = {}
+    for name in models:
+        scores[name] = float(np.mean(fold_scores[name]))
+        logger.info(
+            f"Score {name}: {scores[name]:.4f} "
+            f"({ends[name] - starts[name]:.2f} s écoulées, "
+            f"{compute_times[name]:.2f} s de calcul cumulé pour {len(folds)} "
+            "plis + entraînement)"
         )
-    score = cross_validation.mean()
-    logger.info(f"Score {type(model).__name__}: {score:.4f}")
-    return score
+    logger.info(f"{len(tasks)} tâches en {elapsed:.2f} s (n_jobs={n_jobs})")
+    return scores, fitted_models
 
 
-def train_and_save_model(model, X, y, path_to_model):
+def save_artifact(obj, path, compress=MODEL_COMPRESSION) -> None:
     """
-    Entraîne un modèle et le sauvegarde dans un fichier.
+    Dumps an object with joblib through a temporary file and os.replace.
+
+    The file gets a new inode on each save, so a hard link made by
+    link_artifact keeps pointing to the previous version.
 
     Args:
-        model (sklearn estimator): Modèle à entraîner.
-        X (pd.DataFrame): Matrice de caractéristiques.
-        y (pd.Series): Variable cible.
-        path_to_model (str or Path): Chemin pour sauvegarder le modèle.
+        obj: Object to save (model, scaler).
+        path (str or Path): Target file.
+        compress (str): joblib compression, see
+            model_registry.compression_setting ("0" disables it).
     """
-    model.fit(X, y)
-    dump(model, path_to_model)
-    logger.info(f"Modèle {type(model).__name__} sauvegardé à {path_to_model}")
+    tmp_path = f"{path}.tmp"
+    dump(obj, tmp_path, compress=compression_setting(compress))
+    os.replace(tmp_path, path)
 
 
-def prepare_data(df: pd.DataFrame) -> tuple:
+def link_artifact(source, target) -> None:
     """
-    Prépare les données pour l'entraînement ML.
+    Publishes an existing artifact under another name, atomically.
+
+    A hard link is used when the filesystem allows it (no copy at all),
+    otherwise the file is copied. The target is replaced in one step, so a
+    reader never sees a partial file.
 
     Args:
-        df (pd.DataFrame): DataFrame avec les colonnes nécessaires.
+        source (str or Path): Existing artifact.
+        target (str or Path): Name to publish it under.
+    """
+    tmp_path = f"{target}.tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+    logger.info(f"{target} -> {source}")
+
+
+def search_models(
+    models: Dict[str, BaseEstimator], X, y, cv, n_jobs=N_JOBS
+) -> Tuple[Dict[str, float], Dict[str, BaseEstimator]]:
+    """
+    Tunes every candidate model with successive halving over PARAM_GRIDS.
+
+    All configurations start with a small budget (few trees or few training
+    rows); only the best third survives each round with three times the
+    budget. The candidates of a round are evaluated in the process pool.
+
+    Args:
+        models (Dict[str, BaseEstimator]): Candidate models.
+        X (np.ndarray): Feature matrix, in chronological order.
+        y (np.ndarray | pd.Series): Target.
+        cv: Splitter re-applied at each round, e.g. TimeSeriesSplit.
+        n_jobs (int): Number of worker processes (-1: every core).
 
     Returns:
-        tuple: (X, y), où X est la matrice de caractéristiques et y la variable cible.
+        Tuple[Dict[str, float], Dict[str, BaseEstimator]]: best CV score
+            (negative MSE) and best configuration refitted on all the data,
+            per model name.
+    """
+    scores, fitted_models = {}, {}
+    for name, model in models.items():
+        resource, min_resources, max_resources = SEARCH_RESOURCES.get(
+            name, ("n_samples", "exhaust", "auto")
+        )
+        start = time.perf_counter()
+        search = HalvingGridSearchCV(
+            model,
+            PARAM_GRIDS.get(name, {}),
+            factor=HALVING_FACTOR,
+            resource=resource,
+            min_resources=min_resources,
+            max_resources=max_resources,
+            cv=cv,
+            scoring="neg_mean_squared_error",
+            n_jobs=n_jobs,
+            random_state=42,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            search.fit(X, y)
+
+        scores[name] = float(search.best_score_)
+        fitted_models[name] = search.best_estimator_
+        logger.info(
+            f"Score {name}: {scores[name]:.4f} avec {search.best_params_} "
+            f"({search.n_candidates_[0]} configurations, {search.n_iterations_} "
+            f"tours, {time.perf_counter() - start:.2f} s)"
+        )
+    return scores, fitted_models
+
+
+def build_feature_matrix(df: pd.DataFrame, feature_specs=FEATURE_SPECS) -> pd.DataFrame:
+    """
+    Construit la matrice de caractéristiques: colonnes brutes FEATURES_COLUMNS
+    suivies des indicateurs techniques de feature_specs. Les indicateurs déjà
+    présents dans df (feature store) sont repris tels quels.
+
+    Args:
+        df (pd.DataFrame): klines fusionnées avec daily, ordonnées par date.
+        feature_specs (list): indicateurs à ajouter (voir features.FEATURE_SPECS).
+
+    Returns:
+        pd.DataFrame: matrice de caractéristiques, même index que df.
     """
     missing_cols = [col for col in FEATURES_COLUMNS if col not in df.columns]
     if missing_cols:
         raise ValueError(f"Colonnes manquantes dans le DataFrame: {missing_cols}")
 
-    # Copier seulement les colonnes nécessaires
-    X = df[FEATURES_COLUMNS].copy()
+    # Indicateurs déjà présents (lus depuis le feature store): pas recalculés
+    feature_specs = list(feature_specs or [])
+    stored = [feature_name(*spec) for spec in feature_specs]
+    stored = [name for name in stored if name in df.columns]
+    to_compute = [spec for spec in feature_specs if feature_name(*spec) not in stored]
 
-    # Calcul de la variation de prix pour la prédiction
-    X["price_change"] = X["close_price"].shift(-1) - X["close_price"]
+    # La sélection de colonnes crée déjà un nouveau DataFrame: pas de copy()
+    X = df[FEATURES_COLUMNS + stored]
+    if to_compute:
+        X = pd.concat([X, compute_features(df, to_compute)], axis=1)
+    return X[FEATURES_COLUMNS + [feature_name(*spec) for spec in feature_specs]]
 
-    # Création de la variable cible (tendance: hausse ou baisse)
-    y = (X["price_change"] > 0).astype(int)
 
-    # Supprimer la colonne price_change qui contient des informations futures
-    X = X.drop(["price_change"], axis=1)
+def prepare_data(df: pd.DataFrame, feature_specs=FEATURE_SPECS) -> tuple:
+    """
+    Prépare les données pour l'entraînement ML.
+
+    Args:
+        df (pd.DataFrame): DataFrame avec les colonnes nécessaires.
+        feature_specs (list): indicateurs techniques à ajouter aux colonnes brutes.
+
+    Returns:
+        tuple: (X, y), où X est la matrice de caractéristiques et y la variable cible.
+    """
+    X = build_feature_matrix(df, feature_specs)
 
-    # Supprimer les lignes avec des valeurs manquantes
-    valid_indices = ~X.isna().any(axis=1) & ~y.isna()
-    X = X[valid_indices]
-    y = y[valid_indices]
+    # Variation de prix calculée à part: elle contient des informations
+    # futures et ne doit pas être ajoutée (puis retirée) de X
+    price_change = X["close_price"].shift(-1) - X["close_price"]
+
+    # Création de la variable cible (tendance: hausse ou baisse)
+    y = (price_change > 0).astype(int)
+
+    # Supprimer les lignes avec des valeurs manquantes, dont le préchauffage
+    # des indicateurs (sans copie si aucune)
+    valid_indices = ~X.isna().any(axis=1)
+    if not valid_indices.all():
+        X = X[valid_indices]
+        y = y[valid_indices]
 
     return X, y
 
@@ -128,7 +430,69 @@ def merge_dfs(df1, df2, col1, col2, typ="inner") -> pd.DataFrame:
         raise
 
 
-def format_time_ml(df, col) -> pd.DataFrame:
+def merge_asof_dfs(
+    df1,
+    df2,
+    col1,
+    col2,
+    tolerance=ASOF_TOLERANCE,
+    direction="backward",
+    offset=ASOF_OFFSET,
+    drop_unmatched=True,
+) -> pd.DataFrame:
+    """
+    Aligns each row of df1 on the nearest row of df2 in time (as-of merge).
+
+    Unlike format_time_ml + merge_dfs, the timestamps are not floored to the
+    day and the left DataFrame is not copied: only the (small) right side
+    gets a shifted key. Works for any kline interval.
+
+    Args:
+        df1 (pd.DataFrame): Left DataFrame (e.g. klines).
+        df2 (pd.DataFrame): Right DataFrame (e.g. daily).
+        col1 (str): Datetime column of df1.
+        col2 (str): Datetime column of df2.
+        tolerance (pd.Timedelta): Maximum distance between matched keys.
+        direction (str): 'backward', 'forward' or 'nearest'.
+        offset (pd.Timedelta): Subtracted from col2 before matching; the
+            default attaches the daily row opened on day D+1 to day D.
+        drop_unmatched (bool): Drop the rows of df1 without a match.
+
+    Returns:
+        pd.DataFrame: Merged DataFrame, ordered by col1.
+    """
+    if col1 not in df1.columns:
+        raise ValueError(f"Colonne {col1} non trouvée dans le premier DataFrame")
+    if col2 not in df2.columns:
+        raise ValueError(f"Colonne {col2} non trouvée dans le deuxième DataFrame")
+
+    # merge_asof exige des clés triées: on ne trie que si nécessaire
+    if not df1[col1].is_monotonic_increasing:
+        df1 = df1.sort_values(col1, kind="stable")
+    right = df2.assign(_asof_key=df2[col2] - pd.Timedelta(offset))
+    if not right["_asof_key"].is_monotonic_increasing:
+        right = right.sort_values("_asof_key", kind="stable")
+
+    merged_df = pd.merge_asof(
+        df1,
+        right,
+        left_on=col1,
+        right_on="_asof_key",
+        tolerance=pd.Timedelta(tolerance),
+        direction=direction,
+    ).drop(columns="_asof_key")
+
+    unmatched = merged_df[col2].isna()
+    if unmatched.any():
+        logger.warning(f"{int(unmatched.sum())} lignes sans correspondance dans {col2}")
+        if drop_unmatched:
+            merged_df = merged_df[~unmatched].reset_index(drop=True)
+
+    logger.info(f"Fusion as-of réussie: {len(merged_df)} lignes résultantes")
+    return merged_df
+
+
+def format_time_ml(df, col, inplace=False) -> pd.DataFrame:
     """
     Formats a DataFrame column as datetime, floored to day, and adjusts
     specific columns if needed.
@@ -136,6 +500,7 @@ def format_time_ml(df, col) -> pd.DataFrame:
     Args:
         df (pd.DataFrame): Input DataFrame.
         col (str): Column name to format.
+        inplace (bool): Update df itself instead of a copy.
 
     Returns:
         pd.DataFrame: DataFrame with formatted time column.
@@ -144,7 +509,8 @@ def format_time_ml(df, col) -> pd.DataFrame:
         raise ValueError(f"Colonne {col} non trouvée dans le DataFrame")
 
     # Créer une copie pour éviter les SettingWithCopyWarning
-    result_df = df.copy()
+    # (paresseuse en copy-on-write, aucune en mode inplace)
+    result_df = df if inplace else copy_for_update(df)
 
     # Convertir en datetime et arrondir au jour
     result_df[col] = pd.to_datetime(result_df[col]).dt.floor("D")
@@ -156,24 +522,44 @@ def format_time_ml(df, col) -> pd.DataFrame:
     return result_df
 
 
-def train_and_select_best_models(merge_df: pd.DataFrame) -> str:
+def train_and_select_best_models(
+    merge_df: pd.DataFrame,
+    feature_specs=FEATURE_SPECS,
+    n_jobs=N_JOBS,
+    n_splits=CV_SPLITS,
+    embargo=EMBARGO_ROWS,
+    search=False,
+    promote=True,
+) -> str:
     """
     Trains multiple models, selects the best, and saves it.
 
+    Models are compared with walk-forward validation on the oldest 80 % of
+    the rows; the most recent 20 % are kept as a chronological holdout.
+    The best model and its scaler are also registered as a new version of
+    the model registry (MODEL_FOLDER/registry), with their metrics.
+
     Args:
-        merge_df (pd.DataFrame): DataFrame containing features and target.
+        merge_df (pd.DataFrame): DataFrame containing features and target,
+            in chronological order.
+        feature_specs (list): Technical indicators added to the raw features.
+        n_jobs (int): Worker processes for model selection (-1: every core).
+        n_splits (int): Number of walk-forward folds.
+        embargo (int): Rows dropped between training and test rows.
+        search (bool): Tune each model over PARAM_GRIDS by successive halving
+            instead of using its default hyperparameters.
+        promote (bool): Make the new registry version the current one.
 
     Returns:
         str: The name of the best-performing model.
     """
-    X, y = prepare_data(merge_df)
+    X, y = prepare_data(merge_df, feature_specs)
     if len(X) == 0:
         raise ValueError("Aucune donnée valide après préparation")
+    log_memory("préparation X, y", X)
 
-    # Division train/test
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    # Division train/test chronologique: pas de mélange des bougies
+    X_train, X_test, y_train, y_test = chronological_split(X, y, embargo=embargo)
 
     # Normalisation des données
     scaler = StandardScaler()
@@ -182,38 +568,39 @@ def train_and_select_best_models(merge_df: pd.DataFrame) -> str:
 
     # Sauvegarde du scaler pour utilisation future
     os.makedirs(MODEL_FOLDER, exist_ok=True)
-    dump(scaler, os.path.join(MODEL_FOLDER, "scaler.pickle"))
+    save_artifact(scaler, os.path.join(MODEL_FOLDER, "scaler.pickle"))
 
     # Définition des modèles à tester
-    models = {
-        "LinearRegression": LinearRegression(),
-        "DecisionTreeRegressor": DecisionTreeRegressor(random_state=42),
-        "RandomForestRegressor": RandomForestRegressor(
-            n_estimators=100, random_state=42
-        ),
-    }
-
-    # Évaluation des modèles
-    scores_models = {}
-    for name, model in models.items():
-        # Calcul du score par validation croisée
-        score = compute_model_score(model, X_train_scaled, y_train)
-        scores_models[name] = score
+    models = build_models()
 
-        # Entraînement et sauvegarde du modèle
+    # Évaluation (validation croisée) et entraînement des modèles en parallèle
+    if search:
+        splitter = TimeSeriesSplit(n_splits=n_splits, gap=embargo)
+        scores_models, fitted_models = search_models(
+            models, X_train_scaled, y_train, cv=splitter, n_jobs=n_jobs
+        )
+    else:
+        folds = walk_forward_splits(len(X_train_scaled), n_splits, embargo)
+        scores_models, fitted_models = evaluate_models(
+            models, X_train_scaled, y_train, cv=folds, n_jobs=n_jobs
+        )
+    for name, model in fitted_models.items():
         path_to_model = os.path.join(MODEL_FOLDER, f"{name}_model.pickle")
-        train_and_save_model(model, X_train_scaled, y_train, path_to_model)
+        save_artifact(model, path_to_model)
+        logger.info(f"Modèle {name} sauvegardé à {path_to_model}")
 
     # Sélection du meilleur modèle
     best_model_name = max(scores_models, key=scores_models.get)
-    best_model = models[best_model_name]
+    best_model = fitted_models[best_model_name]
     logger.info(
         f"{best_model_name} sélectionné avec score: {scores_models[best_model_name]:.4f}"
     )
 
-    # Sauvegarde du meilleur modèle
-    best_model_path = os.path.join(MODEL_FOLDER, f"best_model.pickle")
-    train_and_save_model(best_model, X_train_scaled, y_train, best_model_path)
+    # Le meilleur modèle est déjà entraîné et sauvegardé: simple lien
+    best_model_path = os.path.join(MODEL_FOLDER, "best_model.pickle")
+    link_artifact(
+        os.path.join(MODEL_FOLDER, f"{best_model_name}_model.pickle"), best_model_path
+    )
 
     # Évaluation sur l'ensemble de test
     y_pred = best_model.predict(X_test_scaled)
@@ -234,4 +621,30 @@ def train_and_select_best_models(merge_df: pd.DataFrame) -> str:
     predictions_df.to_csv(predictions_path, index=False)
     logger.info(f"Prédictions sauvegardées dans {predictions_path}")
 
+    # Nouvelle version du registre: modèle, scaler et métadonnées
+    registry_dir = os.path.join(MODEL_FOLDER, "registry")
+    version = register_model(
+        best_model,
+        scaler,
+        best_model_name,
+        metrics={
+            "cv_score": scores_models[best_model_name],
+            "cv_scores": scores_models,
+            "test_mse": mse,
+            "test_accuracy": accuracy,
+        },
+        feature_names=list(X.columns),
+        feature_specs=feature_specs,
+        # Dernière ligne apprise: les lignes de test et d'embargo restent
+        # à apprendre par les mises à jour incrémentales
+        watermark=(
+            merge_df["kline_close_time"].loc[X_train.index[-1]]
+            if "kline_close_time" in merge_df.columns
+            else None
+        ),
+        registry_dir=registry_dir,
+    )
+    if promote:
+        promote_model(version, registry_dir)
+
     return best_model_name
@@ -0,0 +1,308 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from .best_model import (
+    DAILY_ML_COLUMNS,
+    KLINES_ML_COLUMNS,
+    build_feature_matrix,
+    format_time_ml,
+    merge_dfs,
+)
+from .features import FEATURE_SPECS
+from .get_data_as_df import (
+    DAY_MS,
+    count_rows,
+    get_df_change_timestamp,
+    to_milliseconds,
+)
+from .table_cache import frame_suffix, read_frame, write_frame
+
+logger = logging.getLogger(__name__)
+
+FEATURE_STORE_DIR = os.path.expanduser(
+    os.getenv("BTC_APP_FEATURE_STORE_DIR", "~/BTC_app/data/6_features")
+)
+# Colonne de temps du store: kline_close_time n'est pas arrondie au jour
+# par format_time_ml, contrairement à kline_open_time
+TIME_COLUMN = "kline_close_time"
+# Historique conservé pour les moyennes exponentielles (EMA, RSI, ATR): après
+# 20 fenêtres, le poids des valeurs oubliées est inférieur à e^-20 (2e-9)
+EWM_WARMUP_FACTOR = 20
+EWM_KINDS = ("ema_ratio", "rsi", "atr")
+
+
+def warmup_rows(feature_specs=FEATURE_SPECS) -> int:
+    """
+    Nombre de lignes passées nécessaires pour calculer les indicateurs de la
+    ligne suivante comme sur l'historique complet.
+
+    Args:
+        feature_specs (list): indicateurs calculés
+
+    Returns:
+        int: taille de la queue d'historique à conserver
+    """
+    rows = 1
+    for kind, window in feature_specs:
+        if window is None:
+            continue
+        factor = EWM_WARMUP_FACTOR if kind in EWM_KINDS else 1
+        rows = max(rows, window * factor + 1)
+    return rows
+
+
+def _meta_path(store_dir: str) -> Path:
+    return Path(store_dir) / "meta.json"
+
+
+def load_store_meta(store_dir: Optional[str] = None) -> Optional[dict]:
+    """
+    Lit les métadonnées du feature store (indicateurs, watermark, fichiers).
+
+    Args:
+        store_dir (str, optional): répertoire du store.
+            Defaults to FEATURE_STORE_DIR.
+
+    Returns:
+        Optional[dict]: métadonnées, ou None si le store est vide
+    """
+    meta_path = _meta_path(store_dir or FEATURE_STORE_DIR)
+    if not meta_path.exists():
+        return None
+    with open(meta_path, "r") as f:
+        return json.load(f)
+
+
+def _save_store_meta(meta: dict, store_dir: str) -> None:
+    meta_path = _meta_path(store_dir)
+    tmp_path = meta_path.with_name(meta_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def reset_feature_store(store_dir: Optional[str] = None) -> None:
+    """
+    Vide le feature store: le prochain update repart de tout l'historique.
+
+    Args:
+        store_dir (str, optional): répertoire du store.
+            Defaults to FEATURE_STORE_DIR.
+    """
+    store_dir = Path(store_dir or FEATURE_STORE_DIR)
+    if not store_dir.exists():
+        return
+    for path in store_dir.iterdir():
+        path.unlink()
+    logger.info(f"Feature store vidé: {store_dir}")
+
+
+def update_feature_store(
+    new_rows: pd.DataFrame,
+    feature_specs=FEATURE_SPECS,
+    store_dir: Optional[str] = None,
+) -> int:
+    """
+    Ajoute au store les indicateurs des nouvelles bougies.
+
+    Seules les lignes postérieures au watermark sont traitées, précédées de
+    la queue d'historique conservée (warmup_rows): le coût dépend du nombre
+    de nouvelles lignes, pas de la taille de l'historique. Chaque update
+    écrit un fichier de partition; le store est reconstruit si la liste des
+    indicateurs change.
+
+    Args:
+        new_rows (pd.DataFrame): klines fusionnées avec daily, contenant
+            TIME_COLUMN (les lignes déjà dans le store sont ignorées)
+        feature_specs (list): indicateurs à calculer. Defaults to FEATURE_SPECS.
+        store_dir (str, optional): répertoire du store.
+            Defaults to FEATURE_STORE_DIR.
+
+    Returns:
+        int: nombre de lignes ajoutées au store
+    """
+    store_dir = store_dir or FEATURE_STORE_DIR
+    specs = [list(spec) for spec in feature_specs]
+    meta = load_store_meta(store_dir)
+    if meta and meta["feature_specs"] != specs:
+        logger.info("Indicateurs modifiés: feature store reconstruit")
+        reset_feature_store(store_dir)
+        meta = None
+
+    if meta:
+        watermark = pd.Timestamp(meta["watermark"], unit="ms")
+        new_rows = new_rows[new_rows[TIME_COLUMN] > watermark]
+    if new_rows.empty:
+        logger.info("Feature store à jour")
+        return 0
+    if not new_rows[TIME_COLUMN].is_monotonic_increasing:
+        new_rows = new_rows.sort_values(TIME_COLUMN, kind="stable")
+
+    tail = read_frame(Path(store_dir) / meta["tail"]) if meta else None
+    history = new_rows if tail is None else pd.concat([tail, new_rows])
+    history = history.reset_index(drop=True)
+
+    # Indicateurs calculés sur queue + nouvelles lignes, conservés pour ces
+    # dernières seulement
+    features = build_feature_matrix(history, feature_specs)
+    features.insert(0, TIME_COLUMN, history[TIME_COLUMN])
+    features = features.iloc[len(history) - len(new_rows) :]
+
+    watermark = to_milliseconds(new_rows[TIME_COLUMN].iloc[-1])
+    suffix = frame_suffix()
+    part_file = f"part-{watermark}{suffix}"
+    tail_file = f"tail{suffix}"
+    write_frame(features.reset_index(drop=True), Path(store_dir) / part_file)
+    tail = history.iloc[-warmup_rows(feature_specs) :]
+    write_frame(tail, Path(store_dir) / tail_file)
+
+    meta = {
+        "feature_specs": specs,
+        "watermark": watermark,
+        "tail": tail_file,
+        "parts": (meta["parts"] if meta else []) + [part_file],
+        "rows": (meta["rows"] if meta else 0) + len(features),
+    }
+    _save_store_meta(meta, store_dir)
+    logger.info(
+        f"Feature store: {len(features)} lignes ajoutées, {meta['rows']} au total"
+    )
+    return len(features)
+
+
+def load_feature_store(store_dir: Optional[str] = None, since=None) -> pd.DataFrame:
+    """
+    Relit les lignes du feature store, dans l'ordre chronologique.
+
+    Args:
+        store_dir (str, optional): répertoire du store.
+            Defaults to FEATURE_STORE_DIR.
+        since (optional): ne relire que les lignes postérieures (ms ou date);
+            seules les partitions concernées sont ouvertes. Defaults to None.
+
+    Returns:
+        pd.DataFrame: TIME_COLUMN, colonnes brutes et indicateurs
+    """
+    store_dir = store_dir or FEATURE_STORE_DIR
+    meta = load_store_meta(store_dir)
+    if not meta:
+        return pd.DataFrame()
+
+    part_files = meta["parts"]
+    if since is not None:
+        since = to_milliseconds(since)
+        # Le nom d'une partition porte le watermark de sa dernière ligne
+        part_files = [
+            part for part in part_files if int(Path(part).stem.split("-")[1]) > since
+        ]
+    if not part_files:
+        return pd.DataFrame()
+
+    df = pd.concat(
+        [read_frame(Path(store_dir) / part) for part in part_files],
+        ignore_index=True,
+    )
+    if since is not None:
+        df = df[df[TIME_COLUMN] > pd.Timestamp(since, unit="ms")]
+        df = df.reset_index(drop=True)
+    return df
+
+
+def source_row_counts(watermark: int) -> dict:
+    """
+    Compte en base les lignes sources du store jusqu'à son watermark: klines
+    ouvertes avant, et lignes daily rattachées à ces klines (ouvertes au
+    plus tard le lendemain du jour du watermark).
+
+    Args:
+        watermark (int): watermark du store (ms)
+
+    Returns:
+        dict: {"klines": n, "daily": n} (None sans connexion à la base)
+    """
+    return {
+        "klines": count_rows("klines", "kline_open_time", end=watermark + 1),
+        "daily": count_rows("daily", "openTime", end=watermark + DAY_MS + 1),
+    }
+
+
+def refresh_feature_store(
+    feature_specs=FEATURE_SPECS, store_dir: Optional[str] = None
+) -> int:
+    """
+    Lit en base les klines postérieures au watermark du store, les fusionne
+    avec daily comme l'ETL d'entraînement et met le store à jour.
+
+    Les klines dont la ligne daily du lendemain n'est pas encore chargée
+    sont écartées par la fusion: le watermark ne les dépasse pas, elles
+    seront reprises à l'update suivant.
+
+    Le nombre de lignes sources jusqu'au watermark est conservé dans les
+    métadonnées: s'il a changé (klines ou daily rattrapées derrière le
+    watermark), les indicateurs suivants ont été calculés sur un trou et le
+    store est reconstruit depuis le début.
+
+    Args:
+        feature_specs (list): indicateurs à calculer. Defaults to FEATURE_SPECS.
+        store_dir (str, optional): répertoire du store.
+            Defaults to FEATURE_STORE_DIR.
+
+    Returns:
+        int: nombre de lignes ajoutées au store
+    """
+    store_dir = store_dir or FEATURE_STORE_DIR
+    meta = load_store_meta(store_dir)
+    if meta and meta["feature_specs"] != [list(spec) for spec in feature_specs]:
+        # update_feature_store reconstruira le store: tout l'historique
+        meta = None
+    if meta and "source_rows" in meta:
+        counts = source_row_counts(meta["watermark"])
+        if None not in counts.values() and counts != meta["source_rows"]:
+            logger.info(
+                f"Historique modifié derrière le watermark ({counts} contre "
+                f"{meta['source_rows']}): feature store reconstruit"
+            )
+            reset_feature_store(store_dir)
+            meta = None
+
+    # La bougie suivante s'ouvre juste après la clôture de la dernière
+    start = meta["watermark"] + 1 if meta else None
+
+    df_klines = get_df_change_timestamp(
+        "klines",
+        "kline_open_time",
+        "kline_close_time",
+        columns=KLINES_ML_COLUMNS,
+        start=start,
+    )
+    if df_klines.empty:
+        logger.info("Aucune nouvelle kline pour le feature store")
+        return 0
+
+    # La ligne daily du jour J+1 est rattachée aux klines du jour J
+    first_day = df_klines["kline_open_time"].min().floor("D")
+    first_day += pd.Timedelta(days=1)
+    df_daily = get_df_change_timestamp(
+        "daily", "openTime", "closeTime", columns=DAILY_ML_COLUMNS, start=first_day
+    )
+    if df_daily.empty:
+        logger.info("Pas encore de ligne daily pour les nouvelles klines")
+        return 0
+
+    df_klines = format_time_ml(df_klines, "kline_open_time", inplace=True)
+    df_daily = format_time_ml(df_daily, "openTime", inplace=True)
+    merge_df = merge_dfs(
+        df_klines, df_daily, "kline_open_time", "openTime", "inner"
+    )
+    added = update_feature_store(merge_df, feature_specs, store_dir)
+    if added:
+        meta = load_store_meta(store_dir)
+        meta["source_rows"] = source_row_counts(meta["watermark"])
+        _save_store_meta(meta, store_dir)
+    return added
+
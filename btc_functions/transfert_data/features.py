@@ -0,0 +1,230 @@
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Indicateurs calculés sur les klines: (type, fenêtre en nombre de bougies).
+# Avec des klines 5m, 12 bougies = 1 h et 288 bougies = 1 jour.
+FEATURE_SPECS: List[Tuple[str, Optional[int]]] = [
+    ("return", 1),
+    ("return", 12),
+    ("return", 288),
+    ("sma_ratio", 12),
+    ("sma_ratio", 288),
+    ("ema_ratio", 12),
+    ("ema_ratio", 288),
+    ("rsi", 14),
+    ("atr", 14),
+    ("bollinger_width", 20),
+    ("volume_zscore", 288),
+    ("taker_buy_ratio", None),
+]
+
+
+def feature_name(kind: str, window: Optional[int]) -> str:
+    """Nom de la colonne produite par un indicateur: rsi_14, taker_buy_ratio..."""
+    return kind if window is None else f"{kind}_{window}"
+
+
+def feature_names(feature_specs: Sequence[Tuple[str, Optional[int]]]) -> List[str]:
+    """Noms des colonnes produites par une liste d'indicateurs."""
+    return [feature_name(kind, window) for kind, window in feature_specs]
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Moyenne glissante par somme cumulée, en O(n) quelle que soit la fenêtre.
+
+    Les valeurs sont centrées avant le cumul pour limiter la perte de
+    précision sur de longues séries de prix. Les NaN comptent pour zéro dans
+    la somme et sont décomptés à part: comme rolling(window).mean(), une
+    fenêtre qui contient un NaN vaut NaN, les suivantes sont calculées.
+
+    Args:
+        values (np.ndarray): série de valeurs
+        window (int): taille de la fenêtre
+
+    Returns:
+        np.ndarray: moyennes, NaN tant que la fenêtre n'est pas pleine
+    """
+    result = np.full(len(values), np.nan)
+    valid = ~np.isnan(values)
+    if len(values) < window or not valid.any():
+        return result
+    offset = values[valid].mean()
+    cumsum = np.cumsum(np.insert(np.where(valid, values - offset, 0.0), 0, 0.0))
+    counts = np.cumsum(np.insert(valid, 0, False))
+    sums = cumsum[window:] - cumsum[:-window]
+    full = counts[window:] - counts[:-window] == window
+    result[window - 1 :] = np.where(full, sums / window + offset, np.nan)
+    return result
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Écart-type glissant (ddof=0).
+
+    Calculé par rolling de pandas (algorithme en ligne, O(n)): la formule
+    E[x²] - E[x]² par sommes cumulées perd trop de précision sur des prix
+    élevés, et une vue en fenêtres allouerait n x window valeurs.
+
+    Args:
+        values (np.ndarray): série de valeurs
+        window (int): taille de la fenêtre
+
+    Returns:
+        np.ndarray: écarts-types, NaN tant que la fenêtre n'est pas pleine
+    """
+    return pd.Series(values).rolling(window).std(ddof=0).to_numpy()
+
+
+def shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Décale une série vers le futur de periods bougies (NaN en tête)."""
+    result = np.full(len(values), np.nan)
+    result[periods:] = values[:-periods]
+    return result
+
+
+def wilder_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Moyenne lissée de Wilder (EMA d'alpha 1 / window), utilisée par RSI et ATR."""
+    return pd.Series(values).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+
+
+def _return(frame: Dict[str, np.ndarray], window: int) -> np.ndarray:
+    close = frame["close"]
+    return close / shift(close, window) - 1
+
+
+def _sma_ratio(frame: Dict[str, np.ndarray], window: int) -> np.ndarray:
+    return frame["close"] / rolling_mean(frame["close"], window) - 1
+
+
+def _ema_ratio(frame: Dict[str, np.ndarray], window: int) -> np.ndarray:
+    # La récurrence de l'EMA n'est pas vectorisable en NumPy: ewm (Cython)
+    ema = pd.Series(frame["close"]).ewm(span=window, adjust=False).mean()
+    return frame["close"] / ema.to_numpy() - 1
+
+
+def _rsi(frame: Dict[str, np.ndarray], window: int) -> np.ndarray:
+    delta = np.diff(frame["close"], prepend=np.nan)
+    gain = wilder_mean(np.where(delta > 0, delta, 0.0), window)
+    loss = wilder_mean(np.where(delta < 0, -delta, 0.0), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + gain / loss)
+    rsi[loss == 0] = 100.0
+    rsi[:window] = np.nan
+    return rsi
+
+
+def _atr(frame: Dict[str, np.ndarray], window: int) -> np.ndarray:
+    # ATR rapporté au prix pour rester comparable d'une période à l'autre
+    previous_close = shift(frame["close"], 1)
+    true_range = np.fmax(
+        frame["high"] - frame["low"],
+        np.fmax(
+            np.abs(frame["high"] - previous_close),
+            np.abs(frame["low"] - previous_close),
+        ),
+    )
+    atr = wilder_mean(true_range, window)
+    atr[: window - 1] = np.nan
+    return atr / frame["close"]
+
+
+def _bollinger_width(frame: Dict[str, np.ndarray], window: int) -> np.ndarray:
+    close = frame["close"]
+    return 4 * rolling_std(close, window) / rolling_mean(close, window)
+
+
+def _volume_zscore(frame: Dict[str, np.ndarray], window: int) -> np.ndarray:
+    volume = frame["volume"]
+    std = rolling_std(volume, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zscore = (volume - rolling_mean(volume, window)) / std
+    # Volume constant sur la fenêtre: écart nul (NaN conservé en préchauffage)
+    return np.where(std == 0, 0.0, zscore)
+
+
+def _taker_buy_ratio(frame: Dict[str, np.ndarray], window=None) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = frame["taker_buy"] / frame["volume"]
+    return np.where(frame["volume"] > 0, ratio, 0.5)
+
+
+FEATURE_FUNCTIONS: Dict[str, Callable] = {
+    "return": _return,
+    "sma_ratio": _sma_ratio,
+    "ema_ratio": _ema_ratio,
+    "rsi": _rsi,
+    "atr": _atr,
+    "bollinger_width": _bollinger_width,
+    "volume_zscore": _volume_zscore,
+    "taker_buy_ratio": _taker_buy_ratio,
+}
+
+# Colonnes sources des indicateurs; "volume" devient volume_x après fusion
+SOURCE_COLUMNS = {
+    "close": ["close_price"],
+    "high": ["high_price"],
+    "low": ["low_price"],
+    "volume": ["volume", "volume_x"],
+    "taker_buy": ["taker_buy_base_asset_volume"],
+}
+REQUIRED_SOURCES = {
+    "return": ["close"],
+    "sma_ratio": ["close"],
+    "ema_ratio": ["close"],
+    "rsi": ["close"],
+    "atr": ["close", "high", "low"],
+    "bollinger_width": ["close"],
+    "volume_zscore": ["volume"],
+    "taker_buy_ratio": ["volume", "taker_buy"],
+}
+
+
+def _source_arrays(df: pd.DataFrame, sources: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Extrait les colonnes sources en tableaux float64 (sans copie si possible)."""
+    frame = {}
+    for source in sources:
+        column = next((c for c in SOURCE_COLUMNS[source] if c in df.columns), None)
+        if column is None:
+            raise ValueError(
+                f"Colonne manquante pour les indicateurs: {SOURCE_COLUMNS[source]}"
+            )
+        frame[source] = df[column].to_numpy(dtype="float64")
+    return frame
+
+
+def compute_features(
+    df: pd.DataFrame,
+    feature_specs: Sequence[Tuple[str, Optional[int]]] = FEATURE_SPECS,
+) -> pd.DataFrame:
+    """
+    Calcule les indicateurs techniques sur un DataFrame de klines trié par
+    date (klines seules ou déjà fusionnées avec daily).
+
+    Args:
+        df (pd.DataFrame): klines ordonnées par kline_open_time
+        feature_specs (Sequence[Tuple[str, Optional[int]]]): indicateurs à
+            calculer, (type, fenêtre). Defaults to FEATURE_SPECS.
+
+    Returns:
+        pd.DataFrame: une colonne par indicateur, même index que df; les
+            premières lignes valent NaN tant que la fenêtre n'est pas pleine
+    """
+    unknown = [kind for kind, _ in feature_specs if kind not in FEATURE_FUNCTIONS]
+    if unknown:
+        raise ValueError(f"Indicateurs inconnus: {unknown}")
+
+    sources = {s for kind, _ in feature_specs for s in REQUIRED_SOURCES[kind]}
+    frame = _source_arrays(df, sorted(sources))
+
+    features = {}
+    for kind, window in feature_specs:
+        features[feature_name(kind, window)] = FEATURE_FUNCTIONS[kind](frame, window)
+
+    logger.debug(f"{len(features)} indicateurs calculés sur {len(df)} lignes")
+    return pd.DataFrame(features, index=df.index)
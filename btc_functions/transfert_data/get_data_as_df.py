@@ -1,45 +1,322 @@
+import os
+import re
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import logging
 from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
 
 from ..logging.logger_config import setup_logger
 from ..load_database import mysql as db_functions
+from ..load_database.schema import TABLE_SCHEMAS, compact_dtypes
 
 logger = logging.getLogger(__name__)
 
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+CHUNKSIZE = 50_000  # Nombre de lignes par lot pour la lecture en streaming
+DAY_MS = 86_400_000
+# Type des colonnes DECIMAL une fois lues (float32 divise leur mémoire par 2)
+FLOAT_DTYPE = os.getenv("BTC_APP_FLOAT_DTYPE", "float64")
+
 
 @contextmanager
 def database_connection():
     """
     Gestionnaire de contexte pour la connexion à la base de données.
-    Assure la fermeture de la connexion même en cas d'exception.
+    Le moteur est partagé par tout le processus (pool de connexions): il n'est
+    pas fermé en sortie, les connexions empruntées retournent au pool.
     """
-    engine = None
     try:
         engine = db_functions.create_connection()
         yield engine
     except Exception as e:
         logger.error(f"Erreur de connexion à la base de données: {e}")
         raise
-    finally:
-        if engine:
-            db_functions.close_engine(
-                engine
-            )  # Utiliser la fonction close_engine que vous avez déjà
-            logger.debug("Connexion à la base de données fermée")
 
 
-def get_df_change_timestamp(table_name, col1, col2=None) -> pd.DataFrame:
+def to_milliseconds(value) -> int:
+    """
+    Convertit une borne temporelle en timestamp Unix (millisecondes).
+
+    Args:
+        value (int | str | datetime | pd.Timestamp): borne à convertir;
+            un entier est considéré comme déjà en millisecondes, une date
+            sans fuseau comme UTC.
+
+    Returns:
+        int: timestamp en millisecondes
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return int(timestamp.value // 1_000_000)
+
+
+def build_select_query(
+    table_name: str,
+    time_col: str,
+    columns: Optional[List[str]] = None,
+    start=None,
+    end=None,
+) -> Tuple[TextClause, Dict[str, int]]:
+    """
+    Construit la requête SELECT avec projection de colonnes et filtre temporel.
+
+    Args:
+        table_name (str): nom de la table cible
+        time_col (str): colonne BIGINT (millisecondes) portant le filtre
+        columns (List[str], optional): colonnes à récupérer.
+            Defaults to None (toutes).
+        start (optional): borne incluse de l'intervalle [start, end)
+        end (optional): borne exclue de l'intervalle [start, end)
+
+    Returns:
+        Tuple[TextClause, Dict[str, int]]: requête et paramètres liés
+    """
+    for identifier in [table_name, time_col, *(columns or [])]:
+        if not IDENTIFIER_PATTERN.match(identifier):
+            raise ValueError(f"Identifiant SQL invalide: {identifier}")
+
+    selected = ", ".join(columns) if columns else "*"
+    where, params = _time_filter(time_col, start, end)
+    query = f"SELECT {selected} FROM {table_name}{where}"
+
+    # La clé primaire est la colonne de temps: tri sans coût sur InnoDB
+    query += f" ORDER BY {time_col}"
+    return text(query), params
+
+
+def _time_filter(time_col: str, start=None, end=None) -> Tuple[str, Dict[str, int]]:
+    """Clause WHERE de l'intervalle [start, end) sur time_col, et ses paramètres."""
+    conditions = []
+    params = {}
+    if start is not None:
+        conditions.append(f"{time_col} >= :start")
+        params["start"] = to_milliseconds(start)
+    if end is not None:
+        conditions.append(f"{time_col} < :end")
+        params["end"] = to_milliseconds(end)
+    if not conditions:
+        return "", params
+    return " WHERE " + " AND ".join(conditions), params
+
+
+def with_time_columns(columns, col1, col2=None):
+    """
+    Ajoute les colonnes de temps à convertir à une projection de colonnes.
+
+    Args:
+        columns (List[str] | None): colonnes demandées (None = toutes)
+        col1 (str): première colonne de temps
+        col2 (str, optional): deuxième colonne de temps. Defaults to None.
+
+    Returns:
+        List[str] | None: colonnes à récupérer
+    """
+    if columns is None:
+        return None
+    return list(dict.fromkeys([*columns, *[c for c in (col1, col2) if c]]))
+
+
+def copy_for_update(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copie d'un DataFrame avant modification de colonnes: superficielle si le
+    mode copy-on-write de pandas est actif (les données ne sont dupliquées
+    qu'à l'écriture), complète sinon.
+    """
+    return df.copy(deep=pd.options.mode.copy_on_write is not True)
+
+
+def normalize_dtypes(
+    df: pd.DataFrame, table_name: Optional[str] = None, float_dtype=None
+) -> pd.DataFrame:
+    """
+    Convertit les colonnes lues en base vers des types compacts, d'après le
+    schéma: DECIMAL (objets Decimal avec MySQL) en float, symbol en category,
+    compteurs INT en int32. Les BIGINT (timestamps) ne changent pas.
+
+    Args:
+        df (pd.DataFrame): DataFrame lu en base
+        table_name (str, optional): table d'origine. Defaults to None
+            (toutes les tables connues, suffixes _x / _y compris).
+        float_dtype (str, optional): type des DECIMAL. Defaults to FLOAT_DTYPE.
+
+    Returns:
+        pd.DataFrame: DataFrame avec les types compacts
+    """
+    if table_name is not None and table_name not in TABLE_SCHEMAS:
+        logger.debug(f"Table {table_name} hors schéma: types inchangés")
+        return df
+    dtypes = compact_dtypes(table_name, float_dtype or FLOAT_DTYPE)
+
+    conversions = {}
+    for col in df.columns:
+        dtype = dtypes.get(col)
+        if dtype is None and col[-2:] in ("_x", "_y"):
+            dtype = dtypes.get(col[:-2])
+        if dtype is None or df[col].dtype == dtype:
+            continue
+        # Colonnes de temps déjà converties par reverse_timestamp
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue
+        # Un entier NULL en base ne tient pas dans un int: on garde un float
+        if dtype.startswith("int") and df[col].isna().any():
+            dtype = float_dtype or FLOAT_DTYPE
+        conversions[col] = dtype
+
+    if not conversions:
+        return df
+    return df.astype(conversions)
+
+
+def build_join_query(
+    klines_columns: List[str],
+    daily_columns: List[str],
+    start=None,
+    end=None,
+) -> Tuple[TextClause, Dict[str, int]]:
+    """
+    Construit la jointure klines / daily calculée côté SQL.
+
+    Reproduit format_time_ml + merge_dfs: kline_open_time est ramené au jour,
+    openTime au jour moins un jour, et les colonnes présentes des deux côtés
+    prennent les suffixes _x / _y. La condition porte sur un intervalle de
+    d.openTime pour rester indexable par la clé primaire de daily.
+
+    Args:
+        klines_columns (List[str]): colonnes de klines à récupérer
+        daily_columns (List[str]): colonnes de daily à récupérer
+        start (optional): borne incluse sur kline_open_time
+        end (optional): borne exclue sur kline_open_time
+
+    Returns:
+        Tuple[TextClause, Dict[str, int]]: requête et paramètres liés
+    """
+    for identifier in [*klines_columns, *daily_columns]:
+        if not IDENTIFIER_PATTERN.match(identifier):
+            raise ValueError(f"Identifiant SQL invalide: {identifier}")
+
+    k_day = f"(k.kline_open_time - k.kline_open_time % {DAY_MS})"
+    d_day = f"(d.openTime - d.openTime % {DAY_MS} - {DAY_MS})"
+    common = set(klines_columns) & set(daily_columns)
+
+    selected = []
+    sides = (("k", klines_columns, "_x"), ("d", daily_columns, "_y"))
+    for alias, columns, suffix in sides:
+        for col in columns:
+            if col == "kline_open_time":
+                expression = k_day
+            elif col == "openTime":
+                expression = d_day
+            else:
+                expression = f"{alias}.{col}"
+            name = f"{col}{suffix}" if col in common else col
+            selected.append(f"{expression} AS {name}")
+
+    query = (
+        f"SELECT {', '.join(selected)} FROM klines k JOIN daily d "
+        f"ON d.openTime >= {k_day} + {DAY_MS} "
+        f"AND d.openTime < {k_day} + {2 * DAY_MS}"
+    )
+
+    conditions = []
+    params = {}
+    if start is not None:
+        conditions.append("k.kline_open_time >= :start")
+        params["start"] = to_milliseconds(start)
+    if end is not None:
+        conditions.append("k.kline_open_time < :end")
+        params["end"] = to_milliseconds(end)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    query += " ORDER BY k.kline_open_time"
+    return text(query), params
+
+
+def get_joined_klines_daily(
+    klines_columns: List[str],
+    daily_columns: List[str],
+    start=None,
+    end=None,
+    float_dtype=None,
+) -> pd.DataFrame:
+    """
+    Récupère klines et daily déjà joints par jour, en une seule requête SQL.
+
+    Équivalent de get_df_change_timestamp sur les deux tables suivi de
+    format_time_ml et merge_dfs, sans transférer les deux tables complètes
+    ni fusionner en mémoire.
+
+    Args:
+        klines_columns (List[str]): colonnes de klines à récupérer
+        daily_columns (List[str]): colonnes de daily à récupérer
+        start (optional): début inclus sur kline_open_time. Defaults to None.
+        end (optional): fin exclue sur kline_open_time. Defaults to None.
+        float_dtype (str, optional): type des colonnes DECIMAL.
+            Defaults to FLOAT_DTYPE.
+
+    Returns:
+        pd.DataFrame: lignes jointes avec les timestamps convertis
+    """
+    setup_logger()
+
+    query, params = build_join_query(klines_columns, daily_columns, start, end)
+
+    with database_connection() as engine:
+        try:
+            if engine is None:
+                logger.error("Impossible de créer une connexion à la base de données")
+                return pd.DataFrame()
+
+            df = pd.read_sql_query(query, engine, params=params)
+        except Exception as e:
+            logger.error(f"Erreur lors de la jointure klines / daily: {e}")
+            raise
+
+    if not df.empty:
+        df = normalize_dtypes(df, float_dtype=float_dtype)
+        df = reverse_timestamp(
+            df, "kline_open_time", "kline_close_time", inplace=True
+        )
+        df = reverse_timestamp(df, "openTime", "closeTime", inplace=True)
+
+    logger.info(f"Jointure SQL: {len(df)} lignes résultantes")
+    return df
+
+
+def get_df_change_timestamp(
+    table_name,
+    col1,
+    col2=None,
+    columns=None,
+    start=None,
+    end=None,
+    float_dtype=None,
+) -> pd.DataFrame:
     """
     Récupère une table SQL, applique reverse_timestamp sur les cols BIGINT spécifiées
     et retourne le DataFrame.
 
+    La projection de colonnes et l'intervalle [start, end) sur col1 sont
+    appliqués côté SQL: seules les lignes et colonnes demandées transitent.
+
     Args:
         table_name (str): nom de la table cible (type BIGINT / timestamp)
-        col1 (str): colonne à convertir en timestamp
+        col1 (str): colonne à convertir en timestamp, porte aussi le filtre temporel
         col2 (str, optional): 2e colonne à convertir. Defaults to None.
+        columns (List[str], optional): colonnes à récupérer (col1 et col2
+            sont ajoutées si absentes). Defaults to None (toutes).
+        start (optional): début inclus (ms, datetime ou chaîne). Defaults to None.
+        end (optional): fin exclue (ms, datetime ou chaîne). Defaults to None.
+        float_dtype (str, optional): type des colonnes DECIMAL.
+            Defaults to FLOAT_DTYPE.
 
     Returns:
         pd.DataFrame: DataFrame avec les colonnes de timestamp converties
@@ -47,7 +324,8 @@ def get_df_change_timestamp(table_name, col1, col2=None) -> pd.DataFrame:
     setup_logger()
 
     # Construction de la requête
-    query = f"SELECT * FROM {table_name}"
+    columns = with_time_columns(columns, col1, col2)
+    query, params = build_select_query(table_name, col1, columns, start, end)
 
     # Récupération des données avec gestion de la connexion
     with database_connection() as engine:
@@ -56,21 +334,108 @@ def get_df_change_timestamp(table_name, col1, col2=None) -> pd.DataFrame:
                 logger.error("Impossible de créer une connexion à la base de données")
                 return pd.DataFrame()  # Retourne un DataFrame vide
 
-            df = pd.read_sql_query(query, engine)
+            df = pd.read_sql_query(query, engine, params=params)
         except Exception as e:
             logger.error(
                 f"Erreur lors de la récupération de la table {table_name}: {e}"
             )
             raise
 
-    # Conversion des timestamps
+    # Types compacts puis conversion des timestamps
     if not df.empty:
-        df = reverse_timestamp(df, col1, col2)
+        df = normalize_dtypes(df, table_name, float_dtype)
+        df = reverse_timestamp(df, col1, col2, inplace=True)
 
     return df
 
 
-def reverse_timestamp(df: pd.DataFrame, col1: str, col2: str = None) -> pd.DataFrame:
+def count_rows(table_name: str, time_col: str, start=None, end=None) -> Optional[int]:
+    """
+    Compte les lignes d'une table sur l'intervalle [start, end) de time_col.
+
+    Sert à vérifier qu'un historique déjà lu (cache, feature store) n'a pas
+    reçu de lignes plus anciennes que son watermark (rattrapage, upsert).
+
+    Args:
+        table_name (str): nom de la table cible
+        time_col (str): colonne BIGINT (millisecondes) portant le filtre
+        start (optional): début inclus. Defaults to None.
+        end (optional): fin exclue. Defaults to None.
+
+    Returns:
+        Optional[int]: nombre de lignes, None sans connexion à la base
+    """
+    for identifier in (table_name, time_col):
+        if not IDENTIFIER_PATTERN.match(identifier):
+            raise ValueError(f"Identifiant SQL invalide: {identifier}")
+    where, params = _time_filter(time_col, start, end)
+    query = text(f"SELECT COUNT(*) FROM {table_name}{where}")
+
+    with database_connection() as engine:
+        if engine is None:
+            logger.error("Impossible de créer une connexion à la base de données")
+            return None
+        with engine.connect() as connection:
+            return int(connection.execute(query, params).scalar())
+
+
+def iter_df_change_timestamp(
+    table_name,
+    col1,
+    col2=None,
+    columns=None,
+    start=None,
+    end=None,
+    chunksize=CHUNKSIZE,
+    float_dtype=None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lit une table SQL par lots via un curseur côté serveur et renvoie chaque
+    lot avec reverse_timestamp appliqué. La mémoire reste bornée par la
+    taille d'un lot, quelle que soit la taille de la table.
+
+    Args:
+        table_name (str): nom de la table cible
+        col1 (str): colonne à convertir en timestamp, porte aussi le filtre temporel
+        col2 (str, optional): 2e colonne à convertir. Defaults to None.
+        columns (List[str], optional): colonnes à récupérer. Defaults to None.
+        start (optional): début inclus de l'intervalle. Defaults to None.
+        end (optional): fin exclue de l'intervalle. Defaults to None.
+        chunksize (int): nombre de lignes par lot. Defaults to CHUNKSIZE.
+        float_dtype (str, optional): type des colonnes DECIMAL.
+            Defaults to FLOAT_DTYPE.
+
+    Yields:
+        pd.DataFrame: lot de lignes, dans l'ordre de col1
+    """
+    setup_logger()
+
+    columns = with_time_columns(columns, col1, col2)
+    query, params = build_select_query(table_name, col1, columns, start, end)
+
+    with database_connection() as engine:
+        if engine is None:
+            logger.error("Impossible de créer une connexion à la base de données")
+            return
+
+        # stream_results: curseur côté serveur (SSCursor avec pymysql)
+        with engine.connect() as conn:
+            conn = conn.execution_options(
+                stream_results=True, max_row_buffer=chunksize
+            )
+            n_rows = 0
+            for chunk in pd.read_sql_query(
+                query, conn, params=params, chunksize=chunksize
+            ):
+                n_rows += len(chunk)
+                chunk = normalize_dtypes(chunk, table_name, float_dtype)
+                yield reverse_timestamp(chunk, col1, col2, inplace=True)
+            logger.info(f"{n_rows} lignes lues par lots depuis {table_name}")
+
+
+def reverse_timestamp(
+    df: pd.DataFrame, col1: str, col2: str = None, inplace: bool = False
+) -> pd.DataFrame:
     """
     Convertit les colonnes de timestamp Unix (millisecondes) en datetime.
 
@@ -78,6 +443,8 @@ def reverse_timestamp(df: pd.DataFrame, col1: str, col2: str = None) -> pd.DataF
         df (pd.DataFrame): DataFrame source
         col1 (str): nom de la première colonne à transformer
         col2 (str, optional): nom de la deuxième colonne à transformer. Defaults to None.
+        inplace (bool): modifier df sans le copier (DataFrame que l'appelant
+            vient de créer). Defaults to False.
 
     Returns:
         pd.DataFrame: DataFrame avec les colonnes converties
@@ -95,7 +462,8 @@ def reverse_timestamp(df: pd.DataFrame, col1: str, col2: str = None) -> pd.DataF
         return df
 
     # Copie du DataFrame pour éviter les modifications en place
-    result = df.copy()
+    # (paresseuse en copy-on-write: seules les colonnes converties sont écrites)
+    result = df if inplace else copy_for_update(df)
 
     # Conversion plus efficace avec vectorisation
     for col in cols:
@@ -111,7 +479,9 @@ def reverse_timestamp(df: pd.DataFrame, col1: str, col2: str = None) -> pd.DataF
 
 def load_best_model():
     """
-    Charge le meilleur modèle entraîné et le scaler associé.
+    Charge le meilleur modèle entraîné et le scaler associé: version en
+    production du registre de modèles, sinon best_model.pickle et
+    scaler.pickle (modèles entraînés avant le registre).
 
     Returns:
         tuple: (model, scaler) - le modèle et le scaler pour les nouvelles prédictions
@@ -119,6 +489,15 @@ def load_best_model():
     model_folder = Path("~/BTC_app/models_ml").expanduser()
 
     try:
+        from .model_registry import current_version, load_model_version
+
+        registry_dir = str(model_folder / "registry")
+        version = current_version(registry_dir)
+        if version is not None:
+            model, scaler = load_model_version(version, registry_dir)
+            logger.info(f"Modèle {type(model).__name__} ({version}) chargé")
+            return model, scaler
+
         model_path = model_folder / "best_model.pickle"
         scaler_path = model_folder / "scaler.pickle"
 
@@ -139,7 +518,7 @@ def load_best_model():
         return None, None
 
 
-def predict_trend(X, model=None, scaler=None):
+def predict_trend(X, model=None, scaler=None, feature_specs=None):
     """
     Prédit la tendance du prix du Bitcoin avec le modèle entraîné.
 
@@ -147,6 +526,10 @@ def predict_trend(X, model=None, scaler=None):
         X (pd.DataFrame): Features pour la prédiction
         model: Modèle préchargé (optionnel)
         scaler: Scaler préchargé (optionnel)
+        feature_specs (list, optional): indicateurs utilisés à l'entraînement.
+            Si fournis, X est l'historique récent de klines fusionnées (au
+            moins la plus grande fenêtre) et la prédiction porte sur sa
+            dernière ligne, avec les mêmes indicateurs que prepare_data.
 
     Returns:
         dict: Résultat de la prédiction avec probabilités et tendance
@@ -158,6 +541,10 @@ def predict_trend(X, model=None, scaler=None):
 
     try:
         # Préparation des données
+        if feature_specs is not None:
+            from .best_model import build_feature_matrix
+
+            X = build_feature_matrix(X, feature_specs).iloc[[-1]]
         X_scaled = scaler.transform(X)
 
         # Prédiction
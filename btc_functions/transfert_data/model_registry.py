@@ -0,0 +1,325 @@
+import json
+import logging
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from joblib import dump, load
+
+from .get_data_as_df import to_milliseconds
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lz4  # noqa: F401
+
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+REGISTRY_DIR = os.path.expanduser("~/BTC_app/models_ml/registry")
+# Compression joblib des modèles: "méthode:niveau", ou un niveau seul (zlib).
+# lz4 (si installé) décompresse bien plus vite que zlib pour un gain proche
+MODEL_COMPRESSION = os.getenv(
+    "BTC_APP_MODEL_COMPRESSION", "lz4:3" if LZ4_AVAILABLE else "zlib:3"
+)
+# Versions gardées par prune_registry: les plus récentes et autant de
+# versions de l'historique de CURRENT (profondeur de rollback_model)
+REGISTRY_KEEP_LAST = int(os.getenv("BTC_APP_REGISTRY_KEEP_LAST", "10"))
+BUNDLE_FILE = "bundle.joblib"
+MANIFEST_FILE = "manifest.json"
+# Pointeur vers la version en production, et versions promues avant elle
+CURRENT_FILE = "CURRENT"
+VERSION_PATTERN = re.compile(r"^v(\d+)$")
+
+
+def compression_setting(value: Optional[str] = None):
+    """
+    Traduit un réglage de compression en argument compress de joblib.dump.
+
+    Args:
+        value (str, optional): "lz4:3", "zlib:6", "3" ou "0" (sans
+            compression). Defaults to MODEL_COMPRESSION.
+
+    Returns:
+        int | tuple: niveau, ou (méthode, niveau)
+    """
+    value = str(MODEL_COMPRESSION if value is None else value)
+    if ":" not in value:
+        return int(value)
+    method, level = value.split(":", 1)
+    if method == "lz4" and not LZ4_AVAILABLE:
+        logger.warning("lz4 non installé: compression zlib utilisée")
+        method = "zlib"
+    return (method, int(level))
+
+
+def _write_json(data: dict, path: Path) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def list_versions(registry_dir: Optional[str] = None) -> List[str]:
+    """
+    Liste les versions enregistrées, de la plus ancienne à la plus récente.
+
+    Args:
+        registry_dir (str, optional): répertoire du registre.
+            Defaults to REGISTRY_DIR.
+
+    Returns:
+        List[str]: noms des versions (v0001, v0002...)
+    """
+    registry_dir = Path(registry_dir or REGISTRY_DIR)
+    if not registry_dir.exists():
+        return []
+    versions = [
+        path.name
+        for path in registry_dir.iterdir()
+        if path.is_dir() and VERSION_PATTERN.match(path.name)
+    ]
+    return sorted(versions, key=lambda name: int(name[1:]))
+
+
+def register_model(
+    model,
+    scaler,
+    model_name: str,
+    metrics: Optional[Dict] = None,
+    feature_names: Optional[List[str]] = None,
+    feature_specs=None,
+    watermark=None,
+    registry_dir: Optional[str] = None,
+    compress: Optional[str] = None,
+    keep_last: Optional[int] = REGISTRY_KEEP_LAST,
+) -> str:
+    """
+    Enregistre un modèle et son scaler dans une nouvelle version du registre.
+
+    La version est écrite dans un répertoire temporaire puis renommée: une
+    version visible est toujours complète. Modèle et scaler forment un seul
+    fichier, relu d'un bloc au chargement. Les anciennes versions sont
+    ensuite supprimées par prune_registry.
+
+    Args:
+        model: modèle entraîné
+        scaler: scaler associé
+        model_name (str): nom du modèle (LinearRegression...)
+        metrics (dict, optional): scores de validation et de test
+        feature_names (List[str], optional): colonnes attendues par le scaler
+        feature_specs (list, optional): indicateurs techniques utilisés
+        watermark (optional): dernière bougie vue à l'entraînement (ms ou date)
+        registry_dir (str, optional): répertoire du registre.
+            Defaults to REGISTRY_DIR.
+        compress (str, optional): compression joblib (voir
+            compression_setting). Defaults to MODEL_COMPRESSION.
+        keep_last (int, optional): voir prune_registry; None conserve
+            toutes les versions. Defaults to REGISTRY_KEEP_LAST.
+
+    Returns:
+        str: nom de la version créée
+    """
+    registry_dir = Path(registry_dir or REGISTRY_DIR)
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    versions = list_versions(str(registry_dir))
+    number = int(versions[-1][1:]) + 1 if versions else 1
+    version = f"v{number:04d}"
+
+    tmp_dir = registry_dir / f".{version}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir()
+    compress = compress or MODEL_COMPRESSION
+    dump(
+        {"model": model, "scaler": scaler},
+        tmp_dir / BUNDLE_FILE,
+        compress=compression_setting(compress),
+    )
+    manifest = {
+        "version": version,
+        "model_name": model_name,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "metrics": metrics or {},
+        "feature_names": list(feature_names or []),
+        "feature_specs": [list(spec) for spec in feature_specs or []],
+        "watermark": None if watermark is None else to_milliseconds(watermark),
+        "compression": compress,
+        "size_bytes": (tmp_dir / BUNDLE_FILE).stat().st_size,
+    }
+    _write_json(manifest, tmp_dir / MANIFEST_FILE)
+    os.replace(tmp_dir, registry_dir / version)
+
+    logger.info(
+        f"Version {version} enregistrée ({model_name}, "
+        f"{manifest['size_bytes'] / 1024**2:.1f} Mo)"
+    )
+    if keep_last is not None:
+        prune_registry(keep_last, str(registry_dir))
+    return version
+
+
+def prune_registry(
+    keep_last: int = REGISTRY_KEEP_LAST, registry_dir: Optional[str] = None
+) -> List[str]:
+    """
+    Supprime les anciennes versions du registre. Sont conservées les
+    keep_last versions les plus récentes, la version en production et les
+    keep_last dernières versions de son historique; l'historique de CURRENT
+    est ramené à ces dernières, rollback_model ne remonte pas plus loin.
+
+    Args:
+        keep_last (int): nombre de versions récentes, et de versions de
+            l'historique, à conserver. Defaults to REGISTRY_KEEP_LAST.
+        registry_dir (str, optional): répertoire du registre.
+            Defaults to REGISTRY_DIR.
+
+    Returns:
+        List[str]: versions supprimées
+    """
+    if keep_last < 1:
+        raise ValueError("keep_last doit être au moins 1")
+    registry_dir = Path(registry_dir or REGISTRY_DIR)
+    versions = list_versions(str(registry_dir))
+    kept = set(versions[-keep_last:])
+
+    pointer = _load_pointer(registry_dir)
+    if pointer:
+        history = pointer["history"][-keep_last:]
+        if history != pointer["history"]:
+            _write_json(
+                {"version": pointer["version"], "history": history},
+                registry_dir / CURRENT_FILE,
+            )
+        kept.update(history, [pointer["version"]])
+
+    removed = [version for version in versions if version not in kept]
+    for version in removed:
+        shutil.rmtree(registry_dir / version)
+    if removed:
+        logger.info(f"Versions supprimées du registre: {', '.join(removed)}")
+    return removed
+
+
+def load_manifest(version: str, registry_dir: Optional[str] = None) -> dict:
+    """
+    Lit le manifest d'une version: métriques, indicateurs, watermark.
+
+    Args:
+        version (str): version à lire
+        registry_dir (str, optional): répertoire du registre.
+            Defaults to REGISTRY_DIR.
+
+    Returns:
+        dict: manifest de la version
+    """
+    manifest_path = Path(registry_dir or REGISTRY_DIR) / version / MANIFEST_FILE
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def _load_pointer(registry_dir: Path) -> Optional[dict]:
+    pointer_path = registry_dir / CURRENT_FILE
+    if not pointer_path.exists():
+        return None
+    with open(pointer_path, "r") as f:
+        return json.load(f)
+
+
+def current_version(registry_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Version en production du registre.
+
+    Args:
+        registry_dir (str, optional): répertoire du registre.
+            Defaults to REGISTRY_DIR.
+
+    Returns:
+        Optional[str]: version promue, ou None si aucune
+    """
+    pointer = _load_pointer(Path(registry_dir or REGISTRY_DIR))
+    return pointer["version"] if pointer else None
+
+
+def promote_model(version: str, registry_dir: Optional[str] = None) -> None:
+    """
+    Fait d'une version la version en production, en remplaçant le pointeur
+    CURRENT en une seule opération. La version précédente est conservée
+    dans l'historique pour rollback_model.
+
+    Args:
+        version (str): version à promouvoir
+        registry_dir (str, optional): répertoire du registre.
+            Defaults to REGISTRY_DIR.
+
+    Raises:
+        ValueError: si la version n'existe pas
+    """
+    registry_dir = Path(registry_dir or REGISTRY_DIR)
+    if not (registry_dir / version / BUNDLE_FILE).exists():
+        raise ValueError(f"Version inconnue: {version}")
+
+    pointer = _load_pointer(registry_dir)
+    history = pointer["history"] + [pointer["version"]] if pointer else []
+    _write_json({"version": version, "history": history}, registry_dir / CURRENT_FILE)
+    logger.info(f"Version {version} promue")
+
+
+def rollback_model(registry_dir: Optional[str] = None) -> str:
+    """
+    Revient à la version promue avant la version en production. Seul le
+    pointeur CURRENT est réécrit: aucun modèle n'est rechargé ni copié.
+
+    Args:
+        registry_dir (str, optional): répertoire du registre.
+            Defaults to REGISTRY_DIR.
+
+    Returns:
+        str: version redevenue en production
+
+    Raises:
+        ValueError: si aucune version antérieure n'a été promue
+    """
+    registry_dir = Path(registry_dir or REGISTRY_DIR)
+    pointer = _load_pointer(registry_dir)
+    if not pointer or not pointer["history"]:
+        raise ValueError("Aucune version précédente vers laquelle revenir")
+
+    version = pointer["history"][-1]
+    _write_json(
+        {"version": version, "history": pointer["history"][:-1]},
+        registry_dir / CURRENT_FILE,
+    )
+    logger.info(f"Retour à la version {version} (depuis {pointer['version']})")
+    return version
+
+
+def load_model_version(
+    version: Optional[str] = None, registry_dir: Optional[str] = None
+) -> Tuple:
+    """
+    Charge le modèle et le scaler d'une version: lecture du pointeur (si
+    version n'est pas fournie) puis du seul fichier de la version.
+
+    Args:
+        version (str, optional): version à charger.
+            Defaults to None (version en production).
+        registry_dir (str, optional): répertoire du registre.
+            Defaults to REGISTRY_DIR.
+
+    Returns:
+        tuple: (model, scaler)
+
+    Raises:
+        ValueError: si aucune version n'est promue
+    """
+    registry_dir = Path(registry_dir or REGISTRY_DIR)
+    version = version or current_version(str(registry_dir))
+    if version is None:
+        raise ValueError(f"Aucune version promue dans {registry_dir}")
+    bundle = load(registry_dir / version / BUNDLE_FILE)
+    return bundle["model"], bundle["scaler"]
@@ -0,0 +1,339 @@
+import copy
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from joblib import load
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error
+
+from . import best_model as bm
+from .feature_store import TIME_COLUMN, load_feature_store
+from .features import FEATURE_SPECS
+from .get_data_as_df import DAY_MS, to_milliseconds
+from .model_registry import (
+    current_version,
+    load_manifest,
+    load_model_version,
+    promote_model,
+    register_model,
+)
+
+logger = logging.getLogger(__name__)
+
+ONLINE_STATE_FILE = "online_state.json"
+# Forêt: arbres ajoutés à chaque mise à jour, entraînés sur les seules
+# nouvelles lignes; au-delà de MAX_FOREST_TREES, les plus anciens sont retirés
+ONLINE_EXTRA_TREES = 10
+MAX_FOREST_TREES = 300
+# Modèles sans apprentissage incrémental (régression linéaire, arbre de
+# décision): réentraînés sur les REFIT_WINDOW_DAYS derniers jours
+REFIT_WINDOW_DAYS = 30
+# Part la plus récente des nouvelles lignes gardée pour comparer le modèle
+# mis à jour au modèle en production, avant toute promotion
+ONLINE_HOLDOUT = 0.2
+MIN_ONLINE_ROWS = 20
+
+
+def _state_path(model_folder: str) -> Path:
+    return Path(model_folder) / ONLINE_STATE_FILE
+
+
+def load_online_state(model_folder: Optional[str] = None) -> Optional[dict]:
+    """
+    Lit l'état de l'apprentissage incrémental (watermark, lignes vues).
+
+    Args:
+        model_folder (str, optional): répertoire des modèles.
+            Defaults to bm.MODEL_FOLDER.
+
+    Returns:
+        Optional[dict]: état, ou None si aucun modèle incrémental n'existe
+    """
+    state_path = _state_path(model_folder or bm.MODEL_FOLDER)
+    if not state_path.exists():
+        return None
+    with open(state_path, "r") as f:
+        return json.load(f)
+
+
+def save_online_state(state: dict, model_folder: Optional[str] = None) -> None:
+    """
+    Enregistre l'état de l'apprentissage incrémental de façon atomique.
+
+    Args:
+        state (dict): état à enregistrer
+        model_folder (str, optional): répertoire des modèles.
+            Defaults to bm.MODEL_FOLDER.
+    """
+    state_path = _state_path(model_folder or bm.MODEL_FOLDER)
+    tmp_path = state_path.with_name(state_path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def initialize_online_state(
+    watermark,
+    feature_specs=FEATURE_SPECS,
+    model_folder: Optional[str] = None,
+    version: Optional[str] = None,
+) -> dict:
+    """
+    Démarre l'apprentissage incrémental après un entraînement complet.
+
+    Args:
+        watermark: dernière ligne (TIME_COLUMN) vue par l'entraînement complet
+        feature_specs (list): indicateurs utilisés par le modèle
+        model_folder (str, optional): répertoire des modèles.
+            Defaults to bm.MODEL_FOLDER.
+        version (str, optional): version du registre dont part l'état
+
+    Returns:
+        dict: état initial
+    """
+    state = {
+        "watermark": to_milliseconds(watermark),
+        "feature_specs": [list(spec) for spec in feature_specs],
+        "version": version,
+        "rows_seen": 0,
+        "updates": 0,
+    }
+    save_online_state(state, model_folder)
+    return state
+
+
+def sync_online_state(model_folder: Optional[str] = None) -> Optional[dict]:
+    """
+    Recale l'état sur la version en production du registre (après
+    rollback_model ou une promotion faite hors de update_online_model):
+    watermark et indicateurs sont repris de son manifest.
+
+    Args:
+        model_folder (str, optional): répertoire des modèles.
+            Defaults to bm.MODEL_FOLDER.
+
+    Returns:
+        Optional[dict]: état recalé, ou None sans état ou sans version promue
+    """
+    model_folder = model_folder or bm.MODEL_FOLDER
+    state = load_online_state(model_folder)
+    registry_dir = str(Path(model_folder) / "registry")
+    version = current_version(registry_dir)
+    if state is None or version is None or state.get("version") == version:
+        return state
+
+    previous = state.get("version")
+    manifest = load_manifest(version, registry_dir)
+    if manifest["watermark"] is not None:
+        state["watermark"] = manifest["watermark"]
+    state.update(
+        feature_specs=manifest["feature_specs"] or state["feature_specs"],
+        version=version,
+    )
+    save_online_state(state, model_folder)
+    logger.info(
+        f"État incrémental recalé sur {version} (depuis {previous})"
+    )
+    return state
+
+
+def labelled_rows(df: pd.DataFrame, feature_specs=FEATURE_SPECS) -> tuple:
+    """
+    Construit X, y sur des lignes consécutives du feature store. La dernière
+    ligne est écartée: sa cible dépend d'une bougie pas encore reçue, elle
+    sera apprise à la mise à jour suivante.
+
+    Args:
+        df (pd.DataFrame): lignes du feature store, dans l'ordre chronologique
+        feature_specs (list): indicateurs utilisés par le modèle
+
+    Returns:
+        tuple: (X, y, times) des lignes dont la cible est connue
+    """
+    if df.empty:
+        return pd.DataFrame(), pd.Series(dtype=int), pd.Series(dtype=object)
+    next_close = df["close_price"].shift(-1)
+    X = bm.build_feature_matrix(df, feature_specs)
+    y = (next_close - df["close_price"] > 0).astype(int)
+    valid = X.notna().all(axis=1) & next_close.notna()
+    return X[valid], y[valid], df.loc[valid, TIME_COLUMN]
+
+
+def is_incremental(model) -> bool:
+    """Le modèle apprend-il des seules nouvelles lignes (partial_fit, forêt)?"""
+    return hasattr(model, "partial_fit") or isinstance(model, RandomForestRegressor)
+
+
+def partial_update(model, X: np.ndarray, y: np.ndarray):
+    """
+    Met à jour un modèle.
+
+    - partial_fit quand le modèle le propose;
+    - forêt aléatoire: nouveaux arbres (warm_start) entraînés sur les
+      nouvelles lignes, les plus anciens retirés au-delà de MAX_FOREST_TREES;
+    - sinon (voir is_incremental) une copie du modèle, mêmes
+      hyperparamètres, est réentraînée: X et y sont alors la fenêtre récente
+      (REFIT_WINDOW_DAYS), pas les seules nouvelles lignes.
+
+    Args:
+        model: modèle entraîné
+        X (np.ndarray): lignes d'apprentissage, normalisées
+        y (np.ndarray): cibles de ces lignes
+
+    Returns:
+        modèle mis à jour (nouvel objet pour un réentraînement)
+    """
+    if hasattr(model, "partial_fit"):
+        model.partial_fit(X, y)
+        return model
+
+    if isinstance(model, RandomForestRegressor):
+        model.set_params(
+            warm_start=True, n_estimators=model.n_estimators + ONLINE_EXTRA_TREES
+        )
+        model.fit(X, y)
+        if len(model.estimators_) > MAX_FOREST_TREES:
+            model.estimators_ = model.estimators_[-MAX_FOREST_TREES:]
+            model.n_estimators = MAX_FOREST_TREES
+        return model
+
+    return clone(model).fit(X, y)
+
+
+def update_online_model(
+    model_folder: Optional[str] = None, store_dir: Optional[str] = None
+) -> int:
+    """
+    Met à jour scaler et meilleur modèle avec les lignes du feature store
+    postérieures au watermark: le coût dépend du nombre de nouvelles
+    bougies, pas de la taille de l'historique.
+
+    Le modèle et le scaler sont ceux de la version en production du
+    registre (à défaut best_model.pickle et scaler.pickle); l'état est
+    d'abord recalé sur cette version (sync_online_state). Les nouvelles
+    lignes les plus récentes (ONLINE_HOLDOUT) sont mises de côté, le
+    modèle apprend les autres par partial_update. Le scaler d'un modèle mis
+    à jour sur place reste figé: ses arbres et coefficients ont été appris
+    à cette échelle. Il n'est réentraîné qu'avec un modèle réentraîné sur
+    la fenêtre REFIT_WINDOW_DAYS.
+
+    Le candidat n'est enregistré et promu que si son erreur sur les lignes
+    mises de côté n'est pas pire que celle du modèle en production. Promu
+    ou rejeté, le watermark avance jusqu'à la dernière ligne apprise: un
+    rejet ne fait pas grossir le lot de la mise à jour suivante.
+
+    Args:
+        model_folder (str, optional): répertoire des modèles.
+            Defaults to bm.MODEL_FOLDER.
+        store_dir (str, optional): répertoire du feature store.
+
+    Returns:
+        int: nombre de lignes apprises (0 si le candidat est rejeté)
+
+    Raises:
+        ValueError: sans entraînement complet préalable
+    """
+    model_folder = model_folder or bm.MODEL_FOLDER
+    state = sync_online_state(model_folder)
+    model_path = Path(model_folder) / "best_model.pickle"
+    scaler_path = Path(model_folder) / "scaler.pickle"
+    registry_dir = str(Path(model_folder) / "registry")
+    version = current_version(registry_dir)
+    pickles = model_path.exists() and scaler_path.exists()
+    if state is None or (version is None and not pickles):
+        raise ValueError(
+            "Entraînement complet requis avant la mise à jour incrémentale"
+        )
+
+    start = time.perf_counter()
+    new_rows = load_feature_store(store_dir, since=state["watermark"])
+    X, y, times = labelled_rows(new_rows, state["feature_specs"])
+    if len(X) < MIN_ONLINE_ROWS:
+        logger.info(
+            f"{len(X)} nouvelles lignes, {MIN_ONLINE_ROWS} requises "
+            "pour la mise à jour incrémentale"
+        )
+        return 0
+
+    if version is not None:
+        model, scaler = load_model_version(version, registry_dir)
+    else:
+        model, scaler = load(model_path), load(scaler_path)
+
+    split = len(X) - max(1, int(len(X) * ONLINE_HOLDOUT))
+    X_fit, y_fit, fit_end = X.iloc[:split], y.iloc[:split], times.iloc[split - 1]
+    X_holdout, y_holdout = X.iloc[split:], y.iloc[split:]
+    current_mse = mean_squared_error(
+        y_holdout, model.predict(scaler.transform(X_holdout))
+    )
+
+    if is_incremental(model):
+        # Même échelle que l'apprentissage initial; la forêt est modifiée
+        # sur place: copie, le modèle en production reste intact
+        candidate_scaler = scaler
+        X_train, y_train = X_fit, y_fit
+        model = copy.deepcopy(model)
+    else:
+        window = load_feature_store(
+            store_dir, since=state["watermark"] - REFIT_WINDOW_DAYS * DAY_MS
+        )
+        X_train, y_train, train_times = labelled_rows(
+            window, state["feature_specs"]
+        )
+        learned = (train_times <= fit_end).to_numpy()
+        X_train, y_train = X_train[learned], y_train[learned]
+        candidate_scaler = clone(scaler).fit(X_train)
+    candidate = partial_update(
+        model, candidate_scaler.transform(X_train), y_train.to_numpy()
+    )
+    candidate_mse = mean_squared_error(
+        y_holdout, candidate.predict(candidate_scaler.transform(X_holdout))
+    )
+
+    state["watermark"] = to_milliseconds(fit_end)
+    if candidate_mse > current_mse:
+        logger.warning(
+            f"Mise à jour de {type(model).__name__} rejetée: MSE "
+            f"{candidate_mse:.4f} contre {current_mse:.4f} en production"
+        )
+        save_online_state(state, model_folder)
+        return 0
+
+    bm.save_artifact(candidate_scaler, scaler_path)
+    bm.save_artifact(candidate, model_path)
+    state.update(
+        rows_seen=state["rows_seen"] + len(X_fit),
+        updates=state["updates"] + 1,
+    )
+    new_version = register_model(
+        candidate,
+        candidate_scaler,
+        type(candidate).__name__,
+        metrics={
+            "rows_learned": len(X_fit),
+            "rows_seen": state["rows_seen"],
+            "holdout_mse": candidate_mse,
+            "previous_holdout_mse": current_mse,
+        },
+        feature_names=list(X.columns),
+        feature_specs=state["feature_specs"],
+        watermark=state["watermark"],
+        registry_dir=registry_dir,
+    )
+    promote_model(new_version, registry_dir)
+    state["version"] = new_version
+    save_online_state(state, model_folder)
+
+    logger.info(
+        f"{type(candidate).__name__} mis à jour avec {len(X_fit)} lignes "
+        f"en {time.perf_counter() - start:.2f} s (MSE {current_mse:.4f} -> "
+        f"{candidate_mse:.4f})"
+    )
+    return len(X_fit)
@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from ..load_database.schema import PARQUET_AVAILABLE
+from .get_data_as_df import (
+    FLOAT_DTYPE,
+    count_rows,
+    get_df_change_timestamp,
+    normalize_dtypes,
+    to_milliseconds,
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.expanduser(
+    os.getenv("BTC_APP_CACHE_DIR", "~/BTC_app/data/4_cache")
+)
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> None:
+    """
+    Écrit un DataFrame sur disque de façon atomique (Parquet ou pickle selon
+    le suffixe du chemin).
+
+    Args:
+        df (pd.DataFrame): DataFrame à écrire
+        path (Path): fichier cible (.parquet ou .pkl)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    if path.suffix == ".parquet":
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    """
+    Relit un DataFrame écrit par write_frame.
+
+    Args:
+        path (Path): fichier à lire (.parquet ou .pkl)
+
+    Returns:
+        pd.DataFrame: contenu du fichier
+    """
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def frame_suffix() -> str:
+    """Format de stockage local: Parquet si pyarrow est installé, sinon pickle."""
+    return ".parquet" if PARQUET_AVAILABLE else ".pkl"
+
+
+def _meta_path(table_name: str, cache_dir: str) -> Path:
+    return Path(cache_dir) / f"{table_name}.meta.json"
+
+
+def load_cache_meta(
+    table_name: str, cache_dir: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Lit les métadonnées du cache d'une table (watermark, colonnes, fichier).
+
+    Args:
+        table_name (str): nom de la table
+        cache_dir (str, optional): répertoire du cache. Defaults to CACHE_DIR.
+
+    Returns:
+        Optional[dict]: métadonnées, ou None si la table n'est pas en cache
+    """
+    meta_path = _meta_path(table_name, cache_dir or CACHE_DIR)
+    if not meta_path.exists():
+        return None
+    with open(meta_path, "r") as f:
+        return json.load(f)
+
+
+def invalidate_cache(
+    table_name: Optional[str] = None, cache_dir: Optional[str] = None
+) -> None:
+    """
+    Supprime le cache d'une table, ou de toutes les tables.
+
+    À appeler après une modification de valeurs de lignes déjà en cache: le
+    cache ne relit que les lignes plus récentes que son watermark. Les
+    lignes ajoutées avant le watermark sont, elles, détectées par
+    get_cached_table (comptage en base).
+
+    Args:
+        table_name (str, optional): table à invalider. Defaults to None (toutes).
+        cache_dir (str, optional): répertoire du cache. Defaults to CACHE_DIR.
+    """
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    if not cache_dir.exists():
+        return
+
+    pattern = f"{table_name}.*" if table_name else "*"
+    for path in cache_dir.glob(pattern):
+        path.unlink()
+        logger.info(f"Cache supprimé: {path}")
+
+
+def get_cached_table(
+    table_name: str,
+    col1: str,
+    col2: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    start=None,
+    end=None,
+    cache_dir: Optional[str] = None,
+    float_dtype: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Équivalent de get_df_change_timestamp avec un cache local incrémental.
+
+    La table est conservée sur disque avec son watermark (valeur max de col1
+    déjà en cache); chaque appel ne lit en base que les lignes postérieures.
+    Le cache est reconstruit si la projection de colonnes ou le type des
+    colonnes DECIMAL change, ou si la base compte jusqu'au watermark plus de
+    lignes que le cache (historique rattrapé après coup).
+
+    Args:
+        table_name (str): nom de la table cible
+        col1 (str): colonne de temps BIGINT, sert de watermark
+        col2 (str, optional): 2e colonne à convertir. Defaults to None.
+        columns (List[str], optional): colonnes à conserver. Defaults to None.
+        start (optional): début inclus du résultat. Defaults to None.
+        end (optional): fin exclue du résultat. Defaults to None.
+        cache_dir (str, optional): répertoire du cache. Defaults to CACHE_DIR.
+        float_dtype (str, optional): type des colonnes DECIMAL.
+            Defaults to FLOAT_DTYPE.
+
+    Returns:
+        pd.DataFrame: table (ou fenêtre demandée) avec les timestamps convertis
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    float_dtype = float_dtype or FLOAT_DTYPE
+    meta = load_cache_meta(table_name, cache_dir)
+
+    if meta and (
+        meta["columns"] != columns
+        or meta["col1"] != col1
+        or meta.get("float_dtype", "float64") != float_dtype
+    ):
+        logger.info(f"Projection ou types modifiés: cache {table_name} reconstruit")
+        invalidate_cache(table_name, cache_dir)
+        meta = None
+
+    if meta:
+        # Lignes chargées derrière le watermark (backfill, upsert d'un jour
+        # passé): la lecture incrémentale ne les verrait jamais
+        db_rows = count_rows(table_name, col1, end=meta["watermark"] + 1)
+        if db_rows is not None and db_rows != meta["rows"]:
+            logger.info(
+                f"{db_rows} lignes en base jusqu'au watermark contre "
+                f"{meta['rows']} en cache: cache {table_name} reconstruit"
+            )
+            invalidate_cache(table_name, cache_dir)
+            meta = None
+
+    cached = None
+    watermark = None
+    if meta:
+        cached = read_frame(Path(cache_dir) / meta["file"])
+        watermark = meta["watermark"]
+
+    new_rows = get_df_change_timestamp(
+        table_name,
+        col1,
+        col2,
+        columns=columns,
+        start=watermark + 1 if watermark is not None else None,
+        float_dtype=float_dtype,
+    )
+    logger.info(f"{len(new_rows)} nouvelles lignes lues pour {table_name}")
+
+    if new_rows.empty:
+        df = cached if cached is not None else new_rows
+    else:
+        df = new_rows if cached is None else pd.concat([cached, new_rows])
+        # Un arrêt entre l'écriture des données et des métadonnées peut
+        # faire relire des lignes déjà en cache
+        df = df.drop_duplicates(subset=[col1], keep="last").reset_index(drop=True)
+        # concat de catégories différentes -> object: on retype le tout
+        df = normalize_dtypes(df, table_name, float_dtype)
+
+        data_file = f"{table_name}{frame_suffix()}"
+        write_frame(df, Path(cache_dir) / data_file)
+        meta = {
+            "table": table_name,
+            "col1": col1,
+            "columns": columns,
+            "float_dtype": float_dtype,
+            "file": data_file,
+            "watermark": to_milliseconds(df[col1].max()),
+            "rows": len(df),
+        }
+        meta_path = _meta_path(table_name, cache_dir)
+        tmp_path = meta_path.with_name(meta_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    if start is not None and not df.empty:
+        df = df[df[col1] >= pd.Timestamp(to_milliseconds(start), unit="ms")]
+    if end is not None and not df.empty:
+        df = df[df[col1] < pd.Timestamp(to_milliseconds(end), unit="ms")]
+    return df
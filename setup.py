@@ -10,6 +10,9 @@ setup(
         "mysql-connector-python",  # Si tu utilises un connecteur MySQL
         # Si autres dépendances nécessaires
     ],
+    extras_require={
+        "parquet": ["pyarrow"],  # Format brut colonnaire (BTC_APP_RAW_FORMAT=parquet)
+    },
     # entry_points={
     #     'console_scripts': [
     #         'get_binance_data = btc_functions.get_binance_data:main',
@@ -1,9 +1,19 @@
 from datetime import datetime, timedelta
-from btc_functions.extract_data.binance_daylies import get_data_from_binance
+from btc_functions.extract_data.async_fetcher import (
+    MAX_CONCURRENCY,
+    backfill_all,
+    fetch_all,
+)
+from btc_functions.extract_data.binance_daylies import (
+    DEFAULT_SYMBOL,
+    symbol_file_prefix,
+)
 from btc_functions.logging.logger_config import setup_logger
+import argparse
 import logging
 import os
 import glob
+import sys
 
 logger = logging.getLogger(__name__)
 
@@ -48,19 +58,93 @@ def rename_json_files_with_date():
                 logger.error(f"Error renaming {file_path}: {e}")
 
 
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Extraction des données Binance (J-1 ou rattrapage d'historique)"
+    )
+    parser.add_argument(
+        "--backfill-start",
+        type=lambda d: datetime.strptime(d, "%Y-%m-%d").date(),
+        help="Premier jour à rattraper (YYYY-MM-DD), active le mode backfill",
+    )
+    parser.add_argument(
+        "--backfill-end",
+        type=lambda d: datetime.strptime(d, "%Y-%m-%d").date(),
+        help="Dernier jour à rattraper (YYYY-MM-DD), hier par défaut",
+    )
+    parser.add_argument(
+        "--interval", type=str, default="5m", help="Intervalle des klines"
+    )
+    parser.add_argument(
+        "--symbols",
+        nargs="+",
+        default=[DEFAULT_SYMBOL],
+        help="Paires à récupérer (ex: BTCUSDT ETHUSDT). Seuls les fichiers BTC "
+        "sont chargés en base: les clés primaires ne portent que le timestamp",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=MAX_CONCURRENCY,
+        help="Nombre maximum de requêtes simultanées",
+    )
+    parser.add_argument(
+        "--group-by",
+        choices=["day", "chunk"],
+        default="day",
+        help="Un fichier par jour ou par requête",
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_arguments()
     setup_logger()
+
+    other_assets = [s for s in args.symbols if symbol_file_prefix(s) != "prices_BTC"]
+    if other_assets:
+        logger.warning(
+            f"{other_assets}: fichiers récupérés mais non chargés en base "
+            "(clés primaires sur le seul timestamp: ils écraseraient BTC)"
+        )
+
+    if args.backfill_start:
+        end_date = args.backfill_end or (datetime.now() - timedelta(days=1)).date()
+        # Les symboles sont rattrapés en parallèle, les pages d'un symbole
+        # à la suite
+        results = backfill_all(
+            args.backfill_start,
+            end_date,
+            symbols=args.symbols,
+            interval=args.interval,
+            group_by=args.group_by,
+            max_concurrency=args.max_concurrency,
+        )
+        failed = [symbol for symbol, files in results.items() if files is None]
+        if failed:
+            logger.error(f"Backfill interrompu pour {failed}")
+            return 1
+        return 0
+
     endpoints = ["klines", "ticker/24hr", "ticker/tradingDay"]
 
-    for endpoint in endpoints:
-        # Sauvegarde les fichiers sans date dans le nom
-        get_data_from_binance(endpoint, use_today_for_filename=True)
-        logger.info(f"Data successfully fetched and saved for endpoint: {endpoint}")
+    # Tous les endpoints x symboles sont récupérés en parallèle
+    results = fetch_all(
+        endpoints,
+        symbols=args.symbols,
+        max_concurrency=args.max_concurrency,
+        use_today_for_filename=True,
+    )
+    for (endpoint, symbol, _), success in results.items():
+        if success:
+            logger.info(f"Data successfully fetched and saved for {endpoint} {symbol}")
 
     # Après avoir récupéré toutes les données, renommer les fichiers pour ajouter la date
     rename_json_files_with_date()
     logger.info("File renaming completed")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
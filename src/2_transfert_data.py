@@ -1,25 +1,73 @@
 from logging import getLogger
 from btc_functions.logging.logger_config import setup_logger
+import argparse
 import os
 import sys
 import glob
 from dotenv import load_dotenv
 import btc_functions.load_database.mysql as db_functions
+from btc_functions.transfert_data.feature_store import refresh_feature_store
 from pathlib import Path
 
 logger = getLogger(__name__)
 
 
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Chargement des données brutes Binance dans MySQL"
+    )
+    parser.add_argument(
+        "--load-mode",
+        choices=db_functions.LOAD_MODES,
+        default="upsert",
+        help="upsert: rechargement idempotent sur la clé primaire, "
+        "append: INSERT simple",
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=db_functions.LOAD_STRATEGIES,
+        default="executemany",
+        help="Méthode d'insertion (load_data nécessite DB_LOCAL_INFILE=1)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=db_functions.BULK_BATCH_SIZE,
+        help="Nombre de lignes par lot pour executemany / load_data",
+    )
+    parser.add_argument(
+        "--export-csv",
+        action="store_true",
+        help="Exporter aussi les JSON en CSV (non utilisés pour le chargement)",
+    )
+    parser.add_argument(
+        "--csv-dir",
+        type=str,
+        default="~/BTC_app/data/3_csv",
+        help="Répertoire de l'export CSV",
+    )
+    parser.add_argument(
+        "--refresh-features",
+        action="store_true",
+        help="Calculer les indicateurs des nouvelles klines dans le feature store",
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_arguments()
     setup_logger()
 
     # Définir les répertoires
     directories = {
         "json_dir": "~/BTC_app/data/1_raw",
-        "csv_dir": "~/BTC_app/data/1_raw",
         "interim_dir": "~/BTC_app/data/2_interim",
         "failed_dir": "~/BTC_app/data/5_failed",
+        "rejected_dir": "~/BTC_app/data/7_rejected",
     }
+    if args.export_csv:
+        directories["csv_dir"] = args.csv_dir
 
     # Créer les répertoires nécessaires
     for name, dir_path in directories.items():
@@ -32,32 +80,45 @@ def main():
         sys.exit(1)
 
     try:
-        # Convertir tous les fichiers JSON en CSV
-        db_functions.convert_all_json_to_csv(
-            directories["json_dir"], directories["csv_dir"]
+        # Export CSV optionnel: le chargement lit directement les fichiers bruts
+        if args.export_csv:
+            db_functions.convert_all_json_to_csv(
+                directories["json_dir"], directories["csv_dir"]
+            )
+
+        # Traiter tous les fichiers JSON et Parquet, sans passer par le CSV
+        raw_dir = os.path.expanduser(directories["json_dir"])
+        raw_files = glob.glob(os.path.join(raw_dir, "*.json")) + glob.glob(
+            os.path.join(raw_dir, "*.parquet")
         )
 
-        # Traiter tous les fichiers CSV
-        csv_pattern = os.path.join(os.path.expanduser(directories["csv_dir"]), "*.csv")
-        csv_files = glob.glob(csv_pattern)
-
-        if not csv_files:
-            logger.warning("No CSV files found to process.")
+        if not raw_files:
+            logger.warning("No JSON or Parquet files found to process.")
         else:
-            logger.info(f"Found {len(csv_files)} CSV files to process.")
+            logger.info(f"Found {len(raw_files)} JSON/Parquet files to process.")
 
         processed_files = 0
         failed_files = 0
+        rejected_files = 0
 
-        for file_path in csv_files:
+        for file_path in raw_files:
             table_name = db_functions.get_table_name(file_path)
             if table_name == "unknownfile":
-                logger.info(f"Skipping unknown file type: {file_path}")
+                # Hors du répertoire brut: pas relu ni signalé à chaque exécution
+                db_functions.move_to_interim(file_path, directories["rejected_dir"])
+                rejected_files += 1
                 continue
 
             try:
                 # Insérer les données dans la base de données
-                if db_functions.insert_data_from_csv(engine, file_path, table_name):
+                if db_functions.insert_data_from_file(
+                    engine,
+                    file_path,
+                    table_name,
+                    mode=args.load_mode,
+                    strategy=args.strategy,
+                    batch_size=args.batch_size,
+                ):
                     # Déplacer le fichier vers interim après traitement réussi
                     if db_functions.move_to_interim(
                         file_path, directories["interim_dir"]
@@ -76,17 +137,15 @@ def main():
                 # Déplacer vers le dossier des fichiers échoués
                 db_functions.move_to_interim(file_path, directories["failed_dir"])
 
-        # Déplacer tous les fichiers JSON originaux vers interim
-        json_pattern = os.path.join(
-            os.path.expanduser(directories["json_dir"]), "*.json"
-        )
-        for file_path in glob.glob(json_pattern):
-            db_functions.move_to_interim(file_path, directories["interim_dir"])
-
         logger.info(
-            f"File processing completed: {processed_files} successful, {failed_files} failed."
+            f"File processing completed: {processed_files} successful, "
+            f"{failed_files} failed, {rejected_files} rejected "
+            f"(moved to {directories['rejected_dir']})."
         )
 
+        if args.refresh_features:
+            refresh_feature_store()
+
     finally:
         # Fermer la connexion à la base de données
         db_functions.close_engine(engine)
@@ -6,7 +6,20 @@ from pathlib import Path
 import pandas as pd
 from dotenv import load_dotenv
 from btc_functions.logging.logger_config import setup_logger
-from btc_functions.transfert_data.get_data_as_df import get_df_change_timestamp
+from btc_functions.logging.memory_usage import log_memory, start_memory_tracking
+from btc_functions.transfert_data.get_data_as_df import (
+    get_df_change_timestamp,
+    get_joined_klines_daily,
+)
+from btc_functions.transfert_data.table_cache import (
+    get_cached_table,
+    invalidate_cache,
+)
+from btc_functions.transfert_data import feature_store, online_model
+from btc_functions.transfert_data.model_registry import (
+    current_version,
+    load_manifest,
+)
 import btc_functions.transfert_data.best_model as bm
 
 # Ajout du répertoire parent au chemin de recherche des modules
@@ -32,26 +45,139 @@ def parse_arguments():
         default="~/BTC_app/models_ml",
         help="Répertoire de sortie pour les modèles et prédictions",
     )
+    parser.add_argument(
+        "--start",
+        type=str,
+        default=None,
+        help="Début (inclus) de la fenêtre d'entraînement, ex: 2024-01-01",
+    )
+    parser.add_argument(
+        "--end",
+        type=str,
+        default=None,
+        help="Fin (exclue) de la fenêtre d'entraînement, ex: 2025-01-01",
+    )
+    parser.add_argument(
+        "--join-mode",
+        choices=["pandas", "asof", "sql"],
+        default="pandas",
+        help="Fusion klines / daily par jour en mémoire (pandas), alignée "
+        "dans le temps (asof) ou côté base (sql)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Lire les tables directement en base, sans le cache local",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Vider le cache local avant lecture (après un upsert de l'historique)",
+    )
+    parser.add_argument(
+        "--feature-store",
+        action="store_true",
+        help="Entraîner sur le feature store, mis à jour avec les seules "
+        "nouvelles klines (--join-mode et le cache sont alors ignorés)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Mettre à jour le modèle avec les seules nouvelles bougies du "
+        "feature store (entraînement complet au premier lancement)",
+    )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=bm.N_JOBS,
+        help="Processus pour la validation croisée et l'entraînement "
+        "(-1: tous les cœurs)",
+    )
+    parser.add_argument(
+        "--cv-splits",
+        type=int,
+        default=bm.CV_SPLITS,
+        help="Nombre de plis de la validation walk-forward",
+    )
+    parser.add_argument(
+        "--embargo",
+        type=int,
+        default=bm.EMBARGO_ROWS,
+        help="Lignes écartées entre entraînement et test (fuite de la cible)",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Recherche d'hyperparamètres par successive halving (bm.PARAM_GRIDS)",
+    )
+    parser.add_argument(
+        "--copy-on-write",
+        action="store_true",
+        help="Activer le mode copy-on-write de pandas (copies paresseuses)",
+    )
     parser.add_argument("--debug", action="store_true", help="Activer le mode debug")
     return parser.parse_args()
 
 
-def prepare_data():
+def shift_day(bound, days=1):
+    """Décale une borne de la fenêtre d'un nombre de jours (None reste None)."""
+    if bound is None:
+        return None
+    return pd.Timestamp(bound) + pd.Timedelta(days=days)
+
+
+def prepare_data(start=None, end=None, use_cache=True, join_mode="pandas"):
     """
     Récupère et prépare les données pour l'entraînement.
 
+    Args:
+        start (optional): début (inclus) de la fenêtre sur kline_open_time
+        end (optional): fin (exclue) de la fenêtre sur kline_open_time
+        use_cache (bool): lire via le cache local incrémental des tables
+        join_mode (str): "pandas" (fusion par jour en mémoire), "asof"
+            (alignement temporel, voir bm.merge_asof_dfs) ou "sql" (jointure
+            en base, sans cache ni transfert des tables complètes)
+
     Returns:
         pd.DataFrame: DataFrame fusionné prêt pour l'entraînement
     """
+    read_table = get_cached_table if use_cache else get_df_change_timestamp
+
     try:
-        # Récupération des données depuis la base
+        if join_mode == "sql":
+            logger.info("Jointure klines / daily côté base...")
+            merge_df = get_joined_klines_daily(
+                bm.KLINES_ML_COLUMNS, bm.DAILY_ML_COLUMNS, start=start, end=end
+            )
+            if merge_df.empty:
+                raise ValueError("La jointure klines / daily est vide")
+            log_memory("jointure SQL", merge_df)
+            return merge_df
+
+        # Récupération des seules colonnes / lignes utiles depuis la base
         logger.info("Récupération des données de klines...")
-        df_klines = get_df_change_timestamp(
-            "klines", "kline_open_time", "kline_close_time"
+        df_klines = read_table(
+            "klines",
+            "kline_open_time",
+            "kline_close_time",
+            columns=bm.KLINES_ML_COLUMNS,
+            start=start,
+            end=end,
         )
+        log_memory("lecture klines", df_klines)
 
+        # La ligne daily du jour J+1 est rattachée aux klines du jour J
+        # (en as-of, la ligne précédente peut servir: un jour de marge en plus)
         logger.info("Récupération des données quotidiennes...")
-        df_daily = get_df_change_timestamp("daily", "openTime", "closeTime")
+        df_daily = read_table(
+            "daily",
+            "openTime",
+            "closeTime",
+            columns=bm.DAILY_ML_COLUMNS,
+            start=start if join_mode == "asof" else shift_day(start),
+            end=shift_day(end),
+        )
+        log_memory("lecture daily", df_daily)
 
         # Vérification des données récupérées
         if df_klines.empty or df_daily.empty:
@@ -61,9 +187,18 @@ def prepare_data():
             f"Données récupérées: {len(df_klines)} klines, {len(df_daily)} entrées quotidiennes"
         )
 
-        # Formatage des colonnes temporelles
-        df_klines = bm.format_time_ml(df_klines, "kline_open_time")
-        df_daily = bm.format_time_ml(df_daily, "openTime")
+        if join_mode == "asof":
+            # Alignement temporel sans arrondi au jour ni copie des klines
+            merge_df = bm.merge_asof_dfs(
+                df_klines, df_daily, "kline_open_time", "openTime"
+            )
+            log_memory("fusion as-of", merge_df)
+            return merge_df
+
+        # Formatage des colonnes temporelles, sur place: les DataFrames lus
+        # ne servent qu'ici
+        df_klines = bm.format_time_ml(df_klines, "kline_open_time", inplace=True)
+        df_daily = bm.format_time_ml(df_daily, "openTime", inplace=True)
         logger.info("Formatage des colonnes temporelles effectué")
 
         # Fusion des DataFrames
@@ -71,6 +206,7 @@ def prepare_data():
             df_klines, df_daily, "kline_open_time", "openTime", "inner"
         )
         logger.info(f"Fusion réussie: {len(merge_df)} lignes résultantes")
+        log_memory("fusion", merge_df)
 
         return merge_df
 
@@ -88,6 +224,9 @@ def main():
     # Configuration du logger
     setup_logger()
 
+    if args.copy_on_write:
+        pd.set_option("mode.copy_on_write", True)
+
     # Chargement des variables d'environnement
     env_path = os.path.expanduser(args.env_file)
     if os.path.exists(env_path):
@@ -101,11 +240,35 @@ def main():
     output_dir.mkdir(parents=True, exist_ok=True)
 
     logger.info("=== Démarrage du processus ETL ===")
+    # Pic mémoire par étape, rapporté par log_memory
+    start_memory_tracking()
 
     try:
         # Préparation des données
         logger.info("Préparation des données...")
-        merge_df = prepare_data()
+        if args.refresh_cache:
+            invalidate_cache()
+        if args.incremental and online_model.load_online_state() is not None:
+            feature_store.refresh_feature_store()
+            learned = online_model.update_online_model()
+            logger.info(f"=== Mise à jour incrémentale: {learned} lignes ===")
+            return 0
+        if args.feature_store or args.incremental:
+            feature_store.refresh_feature_store()
+            merge_df = feature_store.load_feature_store()
+            time_col = merge_df[feature_store.TIME_COLUMN]
+            if args.start:
+                merge_df = merge_df[time_col >= pd.Timestamp(args.start)]
+            if args.end:
+                merge_df = merge_df[time_col < pd.Timestamp(args.end)]
+            log_memory("feature store", merge_df)
+        else:
+            merge_df = prepare_data(
+                args.start,
+                args.end,
+                use_cache=not args.no_cache,
+                join_mode=args.join_mode,
+            )
 
         # Sauvegarde du DataFrame fusionné pour analyse
         sample_path = output_dir / "sample_data.csv"
@@ -114,8 +277,23 @@ def main():
 
         # Entraînement des modèles
         logger.info("Entraînement des modèles...")
-        best_model = bm.train_and_select_best_models(merge_df)
+        best_model = bm.train_and_select_best_models(
+            merge_df,
+            n_jobs=args.n_jobs,
+            n_splits=args.cv_splits,
+            embargo=args.embargo,
+            search=args.search,
+        )
         logger.info(f"Meilleur modèle: {best_model}")
+        if args.incremental:
+            # Les mises à jour suivantes repartent de la dernière ligne
+            # d'entraînement du modèle promu (watermark de son manifest)
+            registry_dir = os.path.join(bm.MODEL_FOLDER, "registry")
+            version = current_version(registry_dir)
+            manifest = load_manifest(version, registry_dir)
+            online_model.initialize_online_state(
+                manifest["watermark"], version=version
+            )
 
         # Résumé des opérations
         logger.info("=== Processus ETL terminé avec succès ===")
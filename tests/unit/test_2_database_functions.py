@@ -56,6 +56,10 @@ class TestDatabaseFunctions:
             ("prices_BTC_24h_2023-01-01.csv", "ticker24h"),
             ("prices_BTC_daily_2023-01-01.csv", "daily"),
             ("unknown_file.csv", "unknownfile"),
+            # Clés primaires sur le seul timestamp: les autres actifs ne sont
+            # pas chargés
+            ("prices_ETH_24h_2023-01-01.json", "unknownfile"),
+            ("/data/prices_ETH_KLINES_20230101.parquet", "unknownfile"),
         ]
 
         for input_file, expected_table in test_cases:
@@ -0,0 +1,97 @@
+import threading
+import time
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from btc_functions.extract_data import async_fetcher, binance_daylies
+from btc_functions.extract_data.async_fetcher import (
+    backfill_all,
+    build_jobs,
+    fetch_all,
+)
+
+
+class TestAsyncFetcher:
+    def test_build_jobs_expands_dated_endpoints_only(self):
+        """Teste que seuls les klines sont multipliés par les jours"""
+        jobs = build_jobs(
+            ["klines", "ticker/24hr"], ["BTCUSDT", "ETHUSDT"], days=[1, 2, 3]
+        )
+        assert len([job for job in jobs if job[0] == "klines"]) == 6
+        assert sorted(job for job in jobs if job[0] == "ticker/24hr") == [
+            ("ticker/24hr", "BTCUSDT", 1),
+            ("ticker/24hr", "ETHUSDT", 1),
+        ]
+
+    def test_build_jobs_invalid_endpoint(self):
+        with pytest.raises(ValueError):
+            build_jobs(["depth"], ["BTCUSDT"], [1])
+
+    def test_fetch_all_is_bounded_and_saves_files(self, tmp_path):
+        """Teste la concurrence bornée et le nommage des fichiers"""
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_request(endpoint, params=None):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return [[0]] if endpoint == "klines" else {"symbol": params["symbol"]}
+
+        with patch.object(binance_daylies, "BASE_DIR", str(tmp_path)), patch.object(
+            async_fetcher, "request_data", side_effect=slow_request
+        ):
+            results = fetch_all(
+                ["klines", "ticker/24hr", "ticker/tradingDay"],
+                symbols=["BTCUSDT", "ETHUSDT"],
+                days=[1, 2],
+                max_concurrency=3,
+            )
+
+        assert all(results.values())
+        assert len(results) == 8
+        assert 1 < peak <= 3
+        names = sorted(path.name for path in tmp_path.glob("*.json"))
+        assert len(names) == 8
+        assert any(name.startswith("prices_ETH_24h_") for name in names)
+        assert any(name.startswith("prices_BTC_KLINES_") for name in names)
+
+    def test_fetch_all_rejects_today_filename_for_several_days(self):
+        with pytest.raises(ValueError):
+            fetch_all(["klines"], days=[1, 2], use_today_for_filename=True)
+
+    def test_backfill_all_runs_symbols_concurrently(self):
+        """Teste le rattrapage des symboles en parallèle et l'échec d'un seul"""
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_backfill(start_date, end_date, symbol, interval, group_by):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            if symbol == "ETHUSDT":
+                raise RuntimeError("Failed to fetch klines page")
+            return 3
+
+        with patch.object(async_fetcher, "backfill_klines", side_effect=slow_backfill):
+            results = backfill_all(
+                date(2024, 1, 1),
+                date(2024, 1, 3),
+                symbols=["BTCUSDT", "ETHUSDT", "SOLUSDT"],
+                max_concurrency=3,
+            )
+
+        assert results == {"BTCUSDT": 3, "ETHUSDT": None, "SOLUSDT": 3}
+        assert peak > 1
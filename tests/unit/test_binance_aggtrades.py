@@ -0,0 +1,90 @@
+import json
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+
+from btc_functions.extract_data import binance_aggtrades
+from btc_functions.extract_data.binance_aggtrades import stream_agg_trades
+
+DAY = date(2024, 1, 1)
+DAY_START = int(datetime(2024, 1, 1).timestamp() * 1000)
+# 2500 trades dans la journée, puis quelques trades le lendemain
+TRADES = [
+    {"a": i, "p": "1.0", "q": "1.0", "T": DAY_START + 30_000 + i * 34_000}
+    for i in range(2500)
+] + [
+    {"a": 2500 + i, "p": "1.0", "q": "1.0", "T": DAY_START + 86_400_000 + i}
+    for i in range(10)
+]
+
+
+def fake_aggtrades_api(endpoint, params=None):
+    """Simule l'API aggTrades (startTime/endTime ou fromId)"""
+    limit = params["limit"]
+    if "fromId" in params:
+        return [t for t in TRADES if t["a"] >= params["fromId"]][:limit]
+    return [
+        t for t in TRADES if params["startTime"] <= t["T"] <= params["endTime"]
+    ][:limit]
+
+
+def read_trades(directory):
+    rows = []
+    for part in sorted(directory.glob("*.jsonl")):
+        with open(part) as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+class TestAggTradesStreaming:
+    def test_streams_whole_day_in_chunks(self, tmp_path):
+        """Teste l'écriture complète du jour avec rotation des fichiers"""
+        with patch.object(
+            binance_aggtrades, "request_data", side_effect=fake_aggtrades_api
+        ):
+            written = stream_agg_trades(
+                DAY, directory=str(tmp_path), chunk_rows=1000, limit=500
+            )
+
+        assert written == 2500
+        assert len(list(tmp_path.glob("*.jsonl"))) == 3
+        assert [t["a"] for t in read_trades(tmp_path)] == list(range(2500))
+
+        checkpoint = json.loads(
+            (tmp_path / "aggTrades_BTCUSDT_20240101.checkpoint.json").read_text()
+        )
+        assert checkpoint["done"] is True
+
+    def test_resumes_from_checkpoint_after_failure(self, tmp_path):
+        """Teste la reprise sans doublon après une requête en échec"""
+        calls = {"count": 0}
+
+        def failing_api(endpoint, params=None):
+            calls["count"] += 1
+            if calls["count"] == 3:
+                return None
+            return fake_aggtrades_api(endpoint, params)
+
+        with patch.object(binance_aggtrades, "request_data", side_effect=failing_api):
+            with pytest.raises(RuntimeError):
+                stream_agg_trades(DAY, directory=str(tmp_path), limit=500)
+
+        # Checkpoint conservé après l'échec, sur les pages déjà écrites
+        checkpoint = json.loads(
+            (tmp_path / "aggTrades_BTCUSDT_20240101.checkpoint.json").read_text()
+        )
+        first = len(read_trades(tmp_path))
+        assert checkpoint["done"] is False
+        assert checkpoint["next_from_id"] == first
+        assert 0 < first < 2500
+
+        with patch.object(
+            binance_aggtrades, "request_data", side_effect=fake_aggtrades_api
+        ):
+            second = stream_agg_trades(DAY, directory=str(tmp_path), limit=500)
+            third = stream_agg_trades(DAY, directory=str(tmp_path), limit=500)
+
+        assert first + second == 2500
+        assert third == 0
+        assert [t["a"] for t in read_trades(tmp_path)] == list(range(2500))
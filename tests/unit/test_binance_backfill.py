@@ -0,0 +1,98 @@
+import json
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+
+from btc_functions.extract_data import binance_daylies
+from btc_functions.extract_data.binance_daylies import backfill_klines, iter_klines
+
+
+def make_klines(start_ms, count, step_ms=300_000):
+    """Construit des klines factices au format Binance"""
+    return [
+        [
+            start_ms + i * step_ms,
+            "1.0",
+            "1.0",
+            "1.0",
+            "1.0",
+            "1.0",
+            start_ms + (i + 1) * step_ms - 1,
+            "1.0",
+            1,
+            "1.0",
+            "1.0",
+            "0",
+        ]
+        for i in range(count)
+    ]
+
+
+def fake_klines_api(endpoint, params=None):
+    """Simule l'API klines: renvoie toutes les bougies 5m de la fenêtre"""
+    count = (params["endTime"] - params["startTime"]) // 300_000 + 1
+    return make_klines(params["startTime"], min(count, params["limit"]))
+
+
+class TestKlinesBackfill:
+    def test_iter_klines_paginates_from_last_close(self):
+        """Teste que chaque page repart de la clôture de la précédente"""
+        start = 0
+        end = 2500 * 300_000 - 1
+        with patch.object(
+            binance_daylies, "request_data", side_effect=fake_klines_api
+        ) as mock_request:
+            pages = list(iter_klines(start, end))
+
+        assert [len(page) for page in pages] == [1000, 1000, 500]
+        assert mock_request.call_count == 3
+        second_call = mock_request.call_args_list[1].kwargs["params"]
+        assert second_call["startTime"] == pages[0][-1][6] + 1
+
+    def test_iter_klines_raises_on_failure(self):
+        """Teste qu'une requête en échec n'est pas prise pour la fin de plage"""
+        with patch.object(binance_daylies, "request_data", return_value=None):
+            with pytest.raises(RuntimeError):
+                list(iter_klines(0, 10_000_000))
+
+    def test_iter_klines_invalid_interval(self):
+        with pytest.raises(ValueError):
+            list(iter_klines(0, 1, interval="7m"))
+
+    def test_backfill_writes_one_file_per_day(self, tmp_path):
+        """Teste l'écriture d'un fichier par jour sur la plage demandée"""
+        with patch.object(binance_daylies, "BASE_DIR", str(tmp_path)), patch.object(
+            binance_daylies, "request_data", side_effect=fake_klines_api
+        ):
+            written = backfill_klines(date(2024, 1, 1), date(2024, 1, 3))
+
+        assert written == 3
+        for day in ("20240101", "20240102", "20240103"):
+            with open(tmp_path / f"prices_BTC_KLINES_{day}.json") as f:
+                rows = json.load(f)
+            assert len(rows) == 288
+            first_open = datetime.fromtimestamp(rows[0][0] / 1000)
+            assert first_open.strftime("%Y%m%d") == day
+
+    def test_backfill_discards_partial_day(self, tmp_path):
+        """Teste que seuls les jours complets sont écrits avant l'échec"""
+        calls = []
+
+        def failing_api(endpoint, params=None):
+            # Une page de 1000 bougies (3 jours et demi), puis une erreur
+            calls.append(params)
+            return fake_klines_api(endpoint, params) if len(calls) == 1 else None
+
+        with patch.object(binance_daylies, "BASE_DIR", str(tmp_path)), patch.object(
+            binance_daylies, "request_data", side_effect=failing_api
+        ):
+            with pytest.raises(RuntimeError):
+                backfill_klines(date(2024, 1, 1), date(2024, 1, 10))
+
+        written = sorted(path.name for path in tmp_path.iterdir())
+        assert written == [
+            "prices_BTC_KLINES_20240101.json",
+            "prices_BTC_KLINES_20240102.json",
+            "prices_BTC_KLINES_20240103.json",
+        ]
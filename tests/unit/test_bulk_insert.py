@@ -0,0 +1,87 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from btc_functions.load_database.mysql import bulk_insert, insert_dataframe
+
+
+@pytest.fixture
+def engine():
+    """Base SQLite avec la table klines et sa clé primaire"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE klines (kline_open_time BIGINT PRIMARY KEY, "
+                "close_price NUMERIC, number_of_trades INT)"
+            )
+        )
+    return engine
+
+
+def klines_rows(n, price=1.0):
+    return pd.DataFrame(
+        {
+            "kline_open_time": np.arange(n, dtype="int64") * 300_000,
+            "close_price": np.full(n, price),
+            "number_of_trades": np.arange(n, dtype="int64"),
+        }
+    )
+
+
+class TestBulkInsert:
+    def test_executemany_in_batches(self, engine):
+        """Teste l'insertion par lots avec executemany"""
+        rows = bulk_insert(engine, klines_rows(2500), "klines", batch_size=1000)
+        assert rows == 2500
+        count = pd.read_sql_query("SELECT COUNT(*) AS n FROM klines", engine)
+        assert count["n"].iloc[0] == 2500
+
+    def test_executemany_upsert(self, engine):
+        bulk_insert(engine, klines_rows(100), "klines", batch_size=30)
+        bulk_insert(engine, klines_rows(150, price=2.0), "klines", mode="upsert")
+        df = pd.read_sql_query("SELECT * FROM klines", engine)
+        assert len(df) == 150
+        assert (df["close_price"] == 2.0).all()
+
+    def test_null_values_are_inserted_as_null(self, engine):
+        rows = klines_rows(3)
+        rows.loc[1, "close_price"] = np.nan
+        insert_dataframe(engine, rows, "klines", strategy="executemany")
+        df = pd.read_sql_query(
+            "SELECT * FROM klines ORDER BY kline_open_time", engine
+        )
+        assert df["close_price"].isna().tolist() == [False, True, False]
+
+    def test_load_data_builds_one_statement_per_batch(self):
+        """Teste la génération des LOAD DATA LOCAL INFILE (MySQL simulé)"""
+        connection = MagicMock()
+        connection.dialect.name = "mysql"
+        engine = MagicMock()
+        engine.begin.return_value.__enter__.return_value = connection
+
+        bulk_insert(
+            engine,
+            klines_rows(25),
+            "klines",
+            strategy="load_data",
+            batch_size=10,
+            mode="upsert",
+        )
+
+        calls = connection.exec_driver_sql.call_args_list
+        statements = [call.args[0] for call in calls]
+        assert len(statements) == 3
+        assert statements[0].startswith("LOAD DATA LOCAL INFILE")
+        assert "REPLACE INTO TABLE `klines`" in statements[0]
+
+    def test_load_data_requires_mysql(self, engine):
+        with pytest.raises(NotImplementedError):
+            bulk_insert(engine, klines_rows(1), "klines", strategy="load_data")
+
+    def test_unknown_strategy(self, engine):
+        with pytest.raises(ValueError):
+            bulk_insert(engine, klines_rows(1), "klines", strategy="copy")
@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+import pytest
+
+from btc_functions.load_database import mysql
+from btc_functions.load_database.mysql import (
+    create_connection,
+    dispose_engines,
+    get_engine,
+)
+
+DB_ENV = {
+    "DB_USER": "user",
+    "DB_PASSWORD": "pass",
+    "DB_HOST": "localhost",
+    "DB_PORT": "3306",
+    "DB_NAME": "btc_db",
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    dispose_engines()
+    yield
+    dispose_engines()
+
+
+class TestEnginePool:
+    def test_get_engine_is_cached(self, tmp_path):
+        """Teste la réutilisation du même moteur pour une même chaîne"""
+        url = f"sqlite:///{tmp_path / 'btc.db'}"
+        assert get_engine(url) is get_engine(url)
+
+    def test_dispose_engines_empties_cache(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'btc.db'}"
+        first = get_engine(url)
+        dispose_engines()
+        assert get_engine(url) is not first
+
+    def test_create_connection_connects_once(self, monkeypatch):
+        """Teste qu'un seul moteur (et un seul test de connexion) est créé"""
+        for key, value in DB_ENV.items():
+            monkeypatch.setenv(key, value)
+
+        with patch.object(mysql, "create_engine") as mock_create_engine:
+            first = create_connection()
+            second = create_connection()
+
+        assert first is second
+        mock_create_engine.assert_called_once()
+        kwargs = mock_create_engine.call_args.kwargs
+        assert kwargs["pool_pre_ping"] is True
+        assert kwargs["pool_size"] == mysql.POOL_SIZE
+        assert kwargs["pool_recycle"] == mysql.POOL_RECYCLE
+
+    def test_create_connection_missing_env(self, monkeypatch):
+        for key in DB_ENV:
+            monkeypatch.delenv(key, raising=False)
+        assert create_connection() is None
@@ -0,0 +1,195 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from btc_functions.transfert_data import best_model as bm
+from btc_functions.transfert_data import feature_store, get_data_as_df
+from btc_functions.transfert_data.feature_store import (
+    load_feature_store,
+    load_store_meta,
+    refresh_feature_store,
+    update_feature_store,
+    warmup_rows,
+)
+from btc_functions.transfert_data.features import FEATURE_SPECS
+
+FIVE_MIN = 300_000
+DAY_MS = 86_400_000
+
+
+def klines_frame(n, seed=0):
+    """Klines 5m (colonnes de KLINES_ML_COLUMNS, timestamps en ms)"""
+    rng = np.random.default_rng(seed)
+    close = 40_000 + np.cumsum(rng.normal(scale=20, size=n))
+    volume = rng.uniform(1, 10, n)
+    return pd.DataFrame(
+        {
+            "kline_open_time": np.arange(n) * FIVE_MIN,
+            "kline_close_time": np.arange(1, n + 1) * FIVE_MIN - 1,
+            "open_price": close - 1,
+            "high_price": close + rng.uniform(0, 30, n),
+            "low_price": close - rng.uniform(0, 30, n),
+            "close_price": close,
+            "volume": volume,
+            "taker_buy_base_asset_volume": volume / 2,
+        }
+    )
+
+
+def merged_frame(n):
+    df = klines_frame(n).rename(columns={"volume": "volume_x"})
+    df["kline_close_time"] = pd.to_datetime(df["kline_close_time"], unit="ms")
+    df["priceChange"] = 1.0
+    df["priceChangePercent"] = 0.1
+    return df
+
+
+class TestUpdateFeatureStore:
+    def test_incremental_matches_full_history(self, tmp_path):
+        """Teste que deux updates donnent les indicateurs du calcul complet"""
+        merged = merged_frame(8000)
+        update_feature_store(merged.iloc[:6000], store_dir=str(tmp_path))
+
+        with patch.object(
+            feature_store,
+            "build_feature_matrix",
+            wraps=feature_store.build_feature_matrix,
+        ) as builder:
+            added = update_feature_store(merged, store_dir=str(tmp_path))
+
+        assert added == 2000
+        assert len(builder.call_args.args[0]) == warmup_rows() + 2000
+
+        stored = load_feature_store(str(tmp_path))
+        full = bm.build_feature_matrix(merged, FEATURE_SPECS)
+        assert len(stored) == 8000
+        pd.testing.assert_frame_equal(
+            stored[full.columns], full.reset_index(drop=True), rtol=1e-6
+        )
+
+    def test_nothing_new(self, tmp_path):
+        merged = merged_frame(500)
+        update_feature_store(merged, store_dir=str(tmp_path))
+        assert update_feature_store(merged, store_dir=str(tmp_path)) == 0
+        assert len(load_store_meta(str(tmp_path))["parts"]) == 1
+
+    def test_specs_change_rebuilds_store(self, tmp_path):
+        merged = merged_frame(500)
+        update_feature_store(merged, [("return", 1)], store_dir=str(tmp_path))
+        added = update_feature_store(merged, [("rsi", 14)], store_dir=str(tmp_path))
+        assert added == 500
+        assert "rsi_14" in load_feature_store(str(tmp_path)).columns
+        assert "return_1" not in load_feature_store(str(tmp_path)).columns
+
+    def test_stored_features_not_recomputed(self, tmp_path):
+        """Teste l'entraînement sur le store sans recalcul des indicateurs"""
+        update_feature_store(merged_frame(500), store_dir=str(tmp_path))
+        stored = load_feature_store(str(tmp_path))
+        with patch.object(bm, "compute_features") as compute:
+            X, y = bm.prepare_data(stored)
+        compute.assert_not_called()
+        assert len(X) == 500 - 288
+
+
+class TestLoadFeatureStore:
+    def test_since_reads_only_new_parts(self, tmp_path):
+        merged = merged_frame(800)
+        update_feature_store(merged.iloc[:500], store_dir=str(tmp_path))
+        update_feature_store(merged, store_dir=str(tmp_path))
+        since = merged["kline_close_time"].iloc[599]
+
+        with patch.object(
+            feature_store, "read_frame", wraps=feature_store.read_frame
+        ) as reader:
+            rows = load_feature_store(str(tmp_path), since=since)
+
+        assert reader.call_count == 1
+        assert len(rows) == 200
+        assert rows["kline_close_time"].iloc[0] > since
+
+
+@pytest.fixture
+def btc_engine(tmp_path):
+    """Base SQLite avec 2 jours de klines 5m et les lignes daily associées"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'btc.db'}")
+    klines_frame(576).to_sql("klines", engine, index=False)
+    pd.DataFrame(
+        {
+            "openTime": [DAY_MS, 2 * DAY_MS],
+            "closeTime": [2 * DAY_MS - 1, 3 * DAY_MS - 1],
+            "priceChange": [1.0, 2.0],
+            "priceChangePercent": [0.1, 0.2],
+            "volume": [100.0, 200.0],
+        }
+    ).to_sql("daily", engine, index=False)
+    with patch.object(
+        get_data_as_df.db_functions, "create_connection", return_value=engine
+    ):
+        yield engine
+
+
+class TestRefreshFeatureStore:
+    def test_reads_only_new_klines(self, btc_engine, tmp_path):
+        store_dir = str(tmp_path / "store")
+        assert refresh_feature_store([("return", 1)], store_dir) == 576
+
+        new_klines = klines_frame(864).iloc[576:]
+        new_klines.to_sql("klines", btc_engine, index=False, if_exists="append")
+        # Pas encore de ligne daily pour le jour 3: rien n'est ajouté
+        assert refresh_feature_store([("return", 1)], store_dir) == 0
+
+        pd.DataFrame(
+            {
+                "openTime": [3 * DAY_MS],
+                "closeTime": [4 * DAY_MS - 1],
+                "priceChange": [3.0],
+                "priceChangePercent": [0.3],
+                "volume": [300.0],
+            }
+        ).to_sql("daily", btc_engine, index=False, if_exists="append")
+        with patch.object(
+            feature_store,
+            "get_df_change_timestamp",
+            wraps=feature_store.get_df_change_timestamp,
+        ) as reader:
+            assert refresh_feature_store([("return", 1)], store_dir) == 288
+        assert reader.call_args_list[0].kwargs["start"] == 2 * DAY_MS
+
+        stored = load_feature_store(store_dir)
+        assert len(stored) == 864
+        assert stored["kline_close_time"].is_monotonic_increasing
+        assert stored["return_1"].notna().sum() == 863
+
+    def test_backfill_behind_watermark_rebuilds_store(self, tmp_path):
+        """Teste la reconstruction quand l'historique arrive après coup"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'late.db'}")
+        klines_frame(576).iloc[288:].to_sql("klines", engine, index=False)
+        daily = pd.DataFrame(
+            {
+                "openTime": [DAY_MS, 2 * DAY_MS],
+                "closeTime": [2 * DAY_MS - 1, 3 * DAY_MS - 1],
+                "priceChange": [1.0, 2.0],
+                "priceChangePercent": [0.1, 0.2],
+                "volume": [100.0, 200.0],
+            }
+        )
+        daily.iloc[1:].to_sql("daily", engine, index=False)
+        store_dir = str(tmp_path / "store")
+
+        with patch.object(
+            get_data_as_df.db_functions, "create_connection", return_value=engine
+        ):
+            assert refresh_feature_store([("return", 1)], store_dir) == 288
+            # Rattrapage du premier jour, derrière le watermark du store
+            klines_frame(288).to_sql("klines", engine, index=False, if_exists="append")
+            daily.iloc[:1].to_sql("daily", engine, index=False, if_exists="append")
+            assert refresh_feature_store([("return", 1)], store_dir) == 576
+            assert refresh_feature_store([("return", 1)], store_dir) == 0
+
+        stored = load_feature_store(store_dir)
+        assert len(stored) == 576
+        assert stored["return_1"].notna().sum() == 575
+        assert load_store_meta(store_dir)["source_rows"] == {"klines": 576, "daily": 2}
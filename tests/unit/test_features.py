@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from btc_functions.transfert_data import best_model as bm
+from btc_functions.transfert_data.features import (
+    FEATURE_SPECS,
+    compute_features,
+    feature_names,
+    rolling_mean,
+    rolling_std,
+)
+from btc_functions.transfert_data.get_data_as_df import predict_trend
+
+
+@pytest.fixture
+def klines():
+    rng = np.random.default_rng(0)
+    n = 1000
+    close = 40_000 + np.cumsum(rng.normal(scale=20, size=n))
+    volume = rng.uniform(1, 10, n)
+    return pd.DataFrame(
+        {
+            "open_price": close - rng.normal(scale=5, size=n),
+            "high_price": close + rng.uniform(0, 30, n),
+            "low_price": close - rng.uniform(0, 30, n),
+            "close_price": close,
+            "volume_x": volume,
+            "taker_buy_base_asset_volume": volume * rng.uniform(0, 1, n),
+            "priceChange": 1.0,
+            "priceChangePercent": 0.1,
+        }
+    )
+
+
+class TestRollingWindows:
+    def test_match_pandas(self, klines):
+        close = klines["close_price"]
+        np.testing.assert_allclose(
+            rolling_mean(close.to_numpy(), 20), close.rolling(20).mean(), rtol=1e-12
+        )
+        np.testing.assert_allclose(
+            rolling_std(close.to_numpy(), 20), close.rolling(20).std(ddof=0)
+        )
+
+    def test_short_series(self):
+        assert np.isnan(rolling_mean(np.arange(3.0), 5)).all()
+
+    def test_missing_value(self):
+        """Teste qu'un NaN n'invalide que les fenêtres qui le contiennent"""
+        values = np.arange(10.0, 20.0)
+        values[3] = np.nan
+        expected = pd.Series(values).rolling(3).mean()
+        np.testing.assert_allclose(rolling_mean(values, 3), expected, rtol=1e-12)
+        assert not np.isnan(rolling_mean(values, 3)[-4:]).any()
+
+
+class TestComputeFeatures:
+    def test_all_specs(self, klines):
+        features = compute_features(klines)
+        assert list(features.columns) == feature_names(FEATURE_SPECS)
+        assert features.index.equals(klines.index)
+        # Préchauffage: NaN jusqu'à la plus grande fenêtre seulement
+        assert features.iloc[288:].notna().all().all()
+
+    def test_indicator_values(self, klines):
+        """Teste les indicateurs contre leur définition pandas"""
+        close = klines["close_price"]
+        features = compute_features(
+            klines, [("return", 12), ("sma_ratio", 20), ("rsi", 14)]
+        )
+        pd.testing.assert_series_equal(
+            features["return_12"], close.pct_change(12), check_names=False
+        )
+        pd.testing.assert_series_equal(
+            features["sma_ratio_20"],
+            close / close.rolling(20).mean() - 1,
+            check_names=False,
+        )
+        rsi = features["rsi_14"].dropna()
+        assert ((rsi >= 0) & (rsi <= 100)).all()
+
+    def test_taker_buy_ratio(self, klines):
+        ratio = compute_features(klines, [("taker_buy_ratio", None)])
+        assert ratio["taker_buy_ratio"].between(0, 1).all()
+
+    def test_unknown_or_missing(self, klines):
+        with pytest.raises(ValueError):
+            compute_features(klines, [("macd", 12)])
+        with pytest.raises(ValueError):
+            compute_features(klines.drop(columns="high_price"), [("atr", 14)])
+
+
+class TestFeatureReuse:
+    def test_prepare_data_and_predict_trend(self, klines):
+        """Teste que l'entraînement et la prédiction partagent les indicateurs"""
+        specs = [("return", 12), ("volume_zscore", 48)]
+        X, y = bm.prepare_data(klines, specs)
+        expected_columns = bm.FEATURES_COLUMNS + ["return_12", "volume_zscore_48"]
+        assert list(X.columns) == expected_columns
+        assert len(X) == len(klines) - 47
+
+        class LastReturn:
+            def predict(self, X_scaled):
+                return X_scaled[:, -2] + 0.5
+
+        class Identity:
+            def transform(self, X):
+                return X.to_numpy()
+
+        result = predict_trend(klines, LastReturn(), Identity(), feature_specs=specs)
+        expected = X["return_12"].iloc[-1] + 0.5
+        assert result["prediction_raw"] == pytest.approx(expected)
@@ -0,0 +1,206 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from btc_functions.transfert_data import best_model as bm
+from btc_functions.transfert_data import get_data_as_df
+from btc_functions.transfert_data.get_data_as_df import (
+    build_select_query,
+    get_df_change_timestamp,
+    get_joined_klines_daily,
+    iter_df_change_timestamp,
+    normalize_dtypes,
+    to_milliseconds,
+)
+
+DAY_MS = 86_400_000
+
+
+@pytest.fixture
+def klines_engine(tmp_path):
+    """Base SQLite contenant 3 jours de klines (une par heure)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'btc.db'}")
+    rows = pd.DataFrame(
+        {
+            "kline_open_time": [i * 3_600_000 for i in range(72)],
+            "kline_close_time": [(i + 1) * 3_600_000 - 1 for i in range(72)],
+            "open_price": [float(i) for i in range(72)],
+            "close_price": [float(i) + 0.5 for i in range(72)],
+            "high_price": [float(i) + 1 for i in range(72)],
+            "low_price": [float(i) - 1 for i in range(72)],
+            "volume": [10.0 + i for i in range(72)],
+            "taker_buy_base_asset_volume": [5.0 + i / 2 for i in range(72)],
+            "number_of_trades": list(range(72)),
+        }
+    )
+    rows.to_sql("klines", engine, index=False)
+    with patch.object(
+        get_data_as_df.db_functions, "create_connection", return_value=engine
+    ):
+        yield engine
+
+
+class TestSelectQuery:
+    def test_to_milliseconds(self):
+        assert to_milliseconds(1234) == 1234
+        assert to_milliseconds("1970-01-02") == DAY_MS
+        assert to_milliseconds(pd.Timestamp("1970-01-02", tz="Europe/Paris")) == (
+            DAY_MS - 3_600_000
+        )
+
+    def test_projection_and_range(self):
+        query, params = build_select_query(
+            "klines", "kline_open_time", ["close_price"], start=0, end=DAY_MS
+        )
+        assert str(query) == (
+            "SELECT close_price FROM klines WHERE kline_open_time >= :start "
+            "AND kline_open_time < :end ORDER BY kline_open_time"
+        )
+        assert params == {"start": 0, "end": DAY_MS}
+
+    def test_rejects_invalid_identifiers(self):
+        with pytest.raises(ValueError):
+            build_select_query("klines; DROP TABLE klines", "kline_open_time")
+
+
+class TestNormalizeDtypes:
+    def test_decimal_symbol_and_counts(self):
+        """Teste la conversion des colonnes lues depuis MySQL en types compacts"""
+        df = pd.DataFrame(
+            {
+                "symbol": ["BTCUSDT"] * 300,
+                "priceChange": [Decimal("1.5"), Decimal("-2.25"), Decimal("0")] * 100,
+                "count": [10, 20, 30] * 100,
+                "openTime": [d * DAY_MS for d in range(300)],
+            }
+        )
+        result = normalize_dtypes(df, "daily", "float32")
+        assert result["priceChange"].dtype == "float32"
+        assert isinstance(result["symbol"].dtype, pd.CategoricalDtype)
+        assert result["count"].dtype == "int32"
+        assert result["openTime"].dtype == "int64"
+        assert result["priceChange"].tolist()[:3] == [1.5, -2.25, 0.0]
+        assert result.memory_usage(deep=True).sum() < (
+            df.memory_usage(deep=True).sum() / 2
+        )
+
+    def test_suffixed_and_nullable_columns(self):
+        df = pd.DataFrame(
+            {"volume_x": [Decimal("1")], "number_of_trades": [None], "other": ["a"]}
+        )
+        result = normalize_dtypes(df)
+        assert result["volume_x"].dtype == "float64"
+        assert result["number_of_trades"].dtype == "float64"
+        assert result["other"].dtype == object
+
+    def test_unknown_table_unchanged(self):
+        df = pd.DataFrame({"volume": [Decimal("1")]})
+        assert normalize_dtypes(df, "unknown") is df
+
+
+class TestGetDfChangeTimestamp:
+    def test_full_table(self, klines_engine):
+        df = get_df_change_timestamp("klines", "kline_open_time", "kline_close_time")
+        assert len(df) == 72
+        assert pd.api.types.is_datetime64_any_dtype(df["kline_open_time"])
+        assert df["number_of_trades"].dtype == "int32"
+
+    def test_float_dtype(self, klines_engine):
+        df = get_df_change_timestamp(
+            "klines", "kline_open_time", float_dtype="float32"
+        )
+        assert df["close_price"].dtype == "float32"
+
+    def test_columns_and_window_pushed_down(self, klines_engine):
+        """Teste que seules les colonnes et lignes demandées sont renvoyées"""
+        df = get_df_change_timestamp(
+            "klines",
+            "kline_open_time",
+            columns=["close_price"],
+            start="1970-01-02",
+            end="1970-01-03",
+        )
+        assert list(df.columns) == ["close_price", "kline_open_time"]
+        assert len(df) == 24
+        assert df["kline_open_time"].min() == pd.Timestamp("1970-01-02")
+        assert df["kline_open_time"].max() == pd.Timestamp("1970-01-02 23:00")
+
+
+class TestIterDfChangeTimestamp:
+    def test_yields_converted_chunks(self, klines_engine):
+        """Teste la lecture par lots avec conversion des timestamps par lot"""
+        chunks = list(
+            iter_df_change_timestamp(
+                "klines", "kline_open_time", "kline_close_time", chunksize=20
+            )
+        )
+        assert [len(chunk) for chunk in chunks] == [20, 20, 20, 12]
+        assert all(
+            pd.api.types.is_datetime64_any_dtype(chunk["kline_close_time"])
+            for chunk in chunks
+        )
+        merged = pd.concat(chunks)
+        assert merged["kline_open_time"].is_monotonic_increasing
+
+    def test_chunks_respect_window(self, klines_engine):
+        chunks = iter_df_change_timestamp(
+            "klines", "kline_open_time", start=0, end=DAY_MS, chunksize=10
+        )
+        assert sum(len(chunk) for chunk in chunks) == 24
+
+
+@pytest.fixture
+def daily_engine(klines_engine):
+    """Ajoute la table daily: une ligne par jour, ouverte en milieu de journée"""
+    pd.DataFrame(
+        {
+            "openTime": [d * DAY_MS + 43_200_000 for d in range(3)],
+            "closeTime": [(d + 1) * DAY_MS + 43_199_999 for d in range(3)],
+            "priceChange": [float(d) for d in range(3)],
+            "priceChangePercent": [d / 10 for d in range(3)],
+            "volume": [1000.0 * d for d in range(3)],
+        }
+    ).to_sql("daily", klines_engine, index=False)
+    yield klines_engine
+
+
+class TestJoinedKlinesDaily:
+    def test_matches_pandas_join(self, daily_engine):
+        """Teste que la jointure SQL donne le même résultat que merge_dfs"""
+        df_klines = bm.format_time_ml(
+            get_df_change_timestamp(
+                "klines",
+                "kline_open_time",
+                "kline_close_time",
+                columns=bm.KLINES_ML_COLUMNS,
+            ),
+            "kline_open_time",
+        )
+        df_daily = bm.format_time_ml(
+            get_df_change_timestamp(
+                "daily", "openTime", "closeTime", columns=bm.DAILY_ML_COLUMNS
+            ),
+            "openTime",
+        )
+        expected = bm.merge_dfs(
+            df_klines, df_daily, "kline_open_time", "openTime", "inner"
+        )
+
+        joined = get_joined_klines_daily(bm.KLINES_ML_COLUMNS, bm.DAILY_ML_COLUMNS)
+
+        # Le jour 2 n'a pas de ligne daily pour le lendemain
+        assert len(joined) == 48
+        pd.testing.assert_frame_equal(
+            joined, expected[joined.columns], check_dtype=False
+        )
+        assert set(bm.FEATURES_COLUMNS) <= set(joined.columns)
+
+    def test_window_on_klines(self, daily_engine):
+        joined = get_joined_klines_daily(
+            bm.KLINES_ML_COLUMNS, bm.DAILY_ML_COLUMNS, start=DAY_MS, end=2 * DAY_MS
+        )
+        assert len(joined) == 24
+        assert (joined["priceChange"] == 2.0).all()
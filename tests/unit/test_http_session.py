@@ -0,0 +1,111 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from btc_functions.extract_data import binance_daylies, http_session
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Répond 503 aux premiers appels puis 200"""
+
+    failures = 2
+    calls = 0
+
+    def do_GET(self):
+        type(self).calls += 1
+        if type(self).calls <= type(self).failures:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    FlakyHandler.calls = 0
+    server = HTTPServer(("127.0.0.1", 0), FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+class TestHttpSession:
+    def test_get_session_is_shared(self):
+        """Teste que la session est créée une seule fois"""
+        http_session.close_session()
+        try:
+            assert http_session.get_session() is http_session.get_session()
+        finally:
+            http_session.close_session()
+
+    def test_request_data_retries_server_errors(self, flaky_server):
+        """Teste le rejeu des 5xx jusqu'au succès"""
+        http_session.configure_session(backoff_factor=0, backoff_jitter=0)
+        try:
+            with patch.object(binance_daylies, "BINANCE_URL", flaky_server):
+                result = binance_daylies.request_data("klines")
+        finally:
+            http_session.close_session()
+
+        assert result == {"ok": True}
+        assert FlakyHandler.calls == 3
+
+    def test_request_data_gives_up_after_max_retries(self, flaky_server):
+        """Teste le retour None quand les tentatives sont épuisées"""
+        http_session.configure_session(
+            max_retries=1, backoff_factor=0, backoff_jitter=0
+        )
+        try:
+            with patch.object(binance_daylies, "BINANCE_URL", flaky_server):
+                result = binance_daylies.request_data("klines")
+        finally:
+            http_session.close_session()
+
+        assert result is None
+        assert FlakyHandler.calls == 2
+
+    def test_retries_are_charged_to_the_limiter(self, flaky_server):
+        """Teste que chaque rejeu d'un 5xx paie son poids au limiteur"""
+        http_session.configure_session(backoff_factor=0, backoff_jitter=0)
+        limiter = MagicMock()
+        try:
+            with patch.object(
+                binance_daylies, "BINANCE_URL", flaky_server
+            ), patch.object(binance_daylies, "get_rate_limiter", return_value=limiter):
+                assert binance_daylies.request_data("klines") == {"ok": True}
+        finally:
+            http_session.close_session()
+
+        # Aucun rejeu caché dans la session: trois appels, trois acquisitions
+        assert FlakyHandler.calls == limiter.acquire.call_count == 3
+
+    def test_request_data_retries_connection_errors(self):
+        ok = MagicMock(status_code=200, headers={})
+        ok.json.return_value = {"ok": True}
+        session = MagicMock()
+        session.get.side_effect = [binance_daylies.requests.ConnectionError(), ok]
+        limiter = MagicMock()
+        http_session.configure_session(backoff_factor=0, backoff_jitter=0)
+        try:
+            with patch.object(
+                binance_daylies, "get_session", return_value=session
+            ), patch.object(binance_daylies, "get_rate_limiter", return_value=limiter):
+                assert binance_daylies.request_data("klines") == {"ok": True}
+        finally:
+            http_session.close_session()
+
+        assert limiter.acquire.call_count == 2
@@ -0,0 +1,89 @@
+import logging
+import re
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from btc_functions.logging.memory_usage import log_memory, start_memory_tracking
+from btc_functions.transfert_data import best_model as bm
+from btc_functions.transfert_data.get_data_as_df import (
+    copy_for_update,
+    reverse_timestamp,
+)
+
+
+@pytest.fixture
+def merged():
+    n = 50
+    close = np.cumsum(np.random.default_rng(0).normal(size=n)) + 100
+    return pd.DataFrame(
+        {
+            "kline_open_time": np.arange(n) * 3_600_000,
+            "open_price": close - 0.1,
+            "high_price": close + 1,
+            "low_price": close - 1,
+            "close_price": close,
+            "volume_x": 1.0,
+            "priceChange": 2.0,
+            "priceChangePercent": 0.1,
+        }
+    )
+
+
+class TestInplace:
+    def test_reverse_timestamp_inplace(self, merged):
+        result = reverse_timestamp(merged, "kline_open_time", inplace=True)
+        assert result is merged
+        assert pd.api.types.is_datetime64_any_dtype(merged["kline_open_time"])
+
+    def test_reverse_timestamp_keeps_source_by_default(self, merged):
+        result = reverse_timestamp(merged, "kline_open_time")
+        assert result is not merged
+        assert merged["kline_open_time"].dtype == "int64"
+
+    def test_format_time_ml_inplace(self, merged):
+        merged["kline_open_time"] = pd.to_datetime(merged["kline_open_time"], unit="ms")
+        result = bm.format_time_ml(merged, "kline_open_time", inplace=True)
+        assert result is merged
+        assert (merged["kline_open_time"] == pd.Timestamp("1970-01-01")).sum() == 24
+
+    def test_copy_on_write_copy_is_shallow(self, merged):
+        """Teste la copie paresseuse en copy-on-write, sans effet sur la source"""
+        with pd.option_context("mode.copy_on_write", True):
+            copied = copy_for_update(merged)
+            assert np.shares_memory(copied["close_price"], merged["close_price"])
+            copied["close_price"] = 0.0
+        assert merged["close_price"].iloc[0] != 0.0
+
+    def test_prepare_data_target(self, merged):
+        X, y = bm.prepare_data(merged, feature_specs=[])
+        assert list(X.columns) == bm.FEATURES_COLUMNS
+        expected = (merged["close_price"].shift(-1) > merged["close_price"]).astype(int)
+        pd.testing.assert_series_equal(y, expected)
+        assert "price_change" not in merged.columns
+
+    def test_log_memory(self, merged, caplog):
+        with caplog.at_level(logging.INFO):
+            log_memory("test", merged)
+        assert "Mémoire [test]" in caplog.text
+        assert "50 lignes" in caplog.text
+
+    def test_log_memory_peak_per_stage(self, caplog):
+        start_memory_tracking()
+        try:
+            with caplog.at_level(logging.INFO):
+                large = np.ones(10 * 1024**2 // 8)  # 10 Mo
+                del large
+                log_memory("grosse étape")
+                log_memory("petite étape")
+        finally:
+            tracemalloc.stop()
+        big, small = [
+            float(re.search(r"\(\+([\d.]+) Mo\)", record.getMessage()).group(1))
+            for record in caplog.records[-2:]
+        ]
+        # Le pic de la première étape ne déborde pas sur la suivante
+        assert big >= 10.0
+        assert small < 1.0
@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from btc_functions.transfert_data import best_model as bm
+
+
+def klines(freq, days=3):
+    periods = days * pd.Timedelta("1D") // pd.Timedelta(freq)
+    times = pd.date_range("2025-01-01", periods=periods, freq=freq)
+    return pd.DataFrame(
+        {"kline_open_time": times, "close_price": range(len(times)), "volume": 1.0}
+    )
+
+
+def daily(days):
+    """Lignes daily ouvertes à minuit, le lendemain du jour décrit"""
+    return pd.DataFrame(
+        {
+            "openTime": [
+                pd.Timestamp("2025-01-01") + pd.Timedelta(days=d + 1) for d in days
+            ],
+            "priceChange": [float(d) for d in days],
+            "volume": 100.0,
+        }
+    )
+
+
+class TestMergeAsof:
+    @pytest.mark.parametrize("freq", ["5min", "1h", "4h"])
+    def test_matches_day_floor_join(self, freq):
+        """Teste l'équivalence avec la jointure par jour pour chaque intervalle"""
+        df_klines, df_daily = klines(freq), daily(range(3))
+        expected = bm.merge_dfs(
+            bm.format_time_ml(df_klines, "kline_open_time"),
+            bm.format_time_ml(df_daily, "openTime"),
+            "kline_open_time",
+            "openTime",
+        )
+
+        merged = bm.merge_asof_dfs(df_klines, df_daily, "kline_open_time", "openTime")
+
+        assert len(merged) == len(df_klines)
+        assert list(merged["priceChange"]) == list(expected["priceChange"])
+        assert list(merged["close_price"]) == list(expected["close_price"])
+        assert {"volume_x", "volume_y"} <= set(merged.columns)
+
+    def test_missing_day_is_reported_and_dropped(self, caplog):
+        df_klines = klines("1h")
+        merged = bm.merge_asof_dfs(
+            df_klines,
+            daily([0, 2]),
+            "kline_open_time",
+            "openTime",
+            tolerance=pd.Timedelta(hours=12),
+        )
+        # 13 klines par jour présent sont à moins de 12 h de la ligne daily
+        assert len(merged) == 2 * 13
+        assert "sans correspondance" in caplog.text
+
+        kept = bm.merge_asof_dfs(
+            df_klines,
+            daily([0, 2]),
+            "kline_open_time",
+            "openTime",
+            tolerance=pd.Timedelta(hours=12),
+            drop_unmatched=False,
+        )
+        assert len(kept) == len(df_klines)
+        assert kept["priceChange"].isna().sum() == 72 - 2 * 13
+
+    def test_unsorted_input_left_untouched(self):
+        """Teste le tri à la demande sans modifier les DataFrames d'entrée"""
+        df_klines = klines("1h").sample(frac=1, random_state=0)
+        before = df_klines.copy()
+        merged = bm.merge_asof_dfs(
+            df_klines, daily([2, 0, 1]), "kline_open_time", "openTime"
+        )
+        assert merged["kline_open_time"].is_monotonic_increasing
+        assert len(merged) == 72
+        pd.testing.assert_frame_equal(df_klines, before)
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from btc_functions.transfert_data import get_data_as_df, model_registry
+from btc_functions.transfert_data.model_registry import (
+    compression_setting,
+    current_version,
+    list_versions,
+    load_manifest,
+    load_model_version,
+    promote_model,
+    prune_registry,
+    register_model,
+    rollback_model,
+)
+
+
+@pytest.fixture
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = X[:, 0] + rng.normal(scale=0.1, size=300)
+    scaler = StandardScaler().fit(X)
+    return LinearRegression().fit(scaler.transform(X), y), scaler, X
+
+
+class TestRegistry:
+    def test_register_and_load(self, fitted, tmp_path):
+        model, scaler, X = fitted
+        version = register_model(
+            model,
+            scaler,
+            "LinearRegression",
+            metrics={"test_accuracy": 0.55},
+            feature_names=["a", "b", "c", "d"],
+            feature_specs=[("rsi", 14)],
+            watermark="2025-01-01",
+            registry_dir=str(tmp_path),
+        )
+        assert version == "v0001"
+        assert current_version(str(tmp_path)) is None
+
+        promote_model(version, str(tmp_path))
+        loaded_model, loaded_scaler = load_model_version(registry_dir=str(tmp_path))
+        np.testing.assert_allclose(
+            loaded_model.predict(loaded_scaler.transform(X)),
+            model.predict(scaler.transform(X)),
+        )
+
+        manifest = load_manifest(version, str(tmp_path))
+        assert manifest["metrics"] == {"test_accuracy": 0.55}
+        assert manifest["feature_specs"] == [["rsi", 14]]
+        assert manifest["watermark"] == 1_735_689_600_000
+
+    def test_promote_and_rollback(self, fitted, tmp_path):
+        model, scaler, _ = fitted
+        for _ in range(3):
+            version = register_model(
+                model, scaler, "LinearRegression", registry_dir=str(tmp_path)
+            )
+            promote_model(version, str(tmp_path))
+
+        assert list_versions(str(tmp_path)) == ["v0001", "v0002", "v0003"]
+        assert rollback_model(str(tmp_path)) == "v0002"
+        assert rollback_model(str(tmp_path)) == "v0001"
+        assert current_version(str(tmp_path)) == "v0001"
+        with pytest.raises(ValueError):
+            rollback_model(str(tmp_path))
+
+    def test_prune_keeps_current_and_history(self, fitted, tmp_path):
+        model, scaler, _ = fitted
+        for _ in range(4):
+            register_model(model, scaler, "LR", registry_dir=str(tmp_path))
+        promote_model("v0001", str(tmp_path))
+        promote_model("v0002", str(tmp_path))
+
+        # v0004: plus récente, v0002: en production, v0001: historique
+        assert prune_registry(1, str(tmp_path)) == ["v0003"]
+        assert list_versions(str(tmp_path)) == ["v0001", "v0002", "v0004"]
+        assert rollback_model(str(tmp_path)) == "v0001"
+
+    def test_register_prunes_nightly_versions(self, fitted, tmp_path):
+        model, scaler, _ = fitted
+        for _ in range(6):
+            version = register_model(
+                model, scaler, "LR", registry_dir=str(tmp_path), keep_last=2
+            )
+            promote_model(version, str(tmp_path))
+
+        # À l'enregistrement de v0006: v0005, v0006 et l'historique ramené à
+        # v0003, v0004; la promotion de v0006 y ajoute v0005
+        assert list_versions(str(tmp_path)) == ["v0003", "v0004", "v0005", "v0006"]
+        for expected in ("v0005", "v0004", "v0003"):
+            assert rollback_model(str(tmp_path)) == expected
+        with pytest.raises(ValueError):
+            rollback_model(str(tmp_path))
+
+    def test_promote_unknown_version(self, tmp_path):
+        with pytest.raises(ValueError):
+            promote_model("v0042", str(tmp_path))
+
+    def test_compressed_bundle(self, fitted, tmp_path):
+        _, scaler, X = fitted
+        forest = RandomForestRegressor(n_estimators=20, random_state=42)
+        forest.fit(X, X[:, 0])
+        raw = register_model(
+            forest, scaler, "RF", registry_dir=str(tmp_path), compress="0"
+        )
+        packed = register_model(
+            forest, scaler, "RF", registry_dir=str(tmp_path), compress="zlib:3"
+        )
+        raw_size = load_manifest(raw, str(tmp_path))["size_bytes"]
+        assert load_manifest(packed, str(tmp_path))["size_bytes"] < raw_size / 2
+
+    def test_compression_setting(self, monkeypatch):
+        assert compression_setting("0") == 0
+        assert compression_setting("zlib:6") == ("zlib", 6)
+        monkeypatch.setattr(model_registry, "LZ4_AVAILABLE", False)
+        assert compression_setting("lz4:3") == ("zlib", 3)
+
+
+class TestLoadBestModel:
+    def test_registry_first(self, fitted, tmp_path, monkeypatch):
+        model, scaler, _ = fitted
+        monkeypatch.setenv("HOME", str(tmp_path))
+        registry_dir = tmp_path / "BTC_app" / "models_ml" / "registry"
+        version = register_model(
+            model, scaler, "LinearRegression", registry_dir=str(registry_dir)
+        )
+        promote_model(version, str(registry_dir))
+
+        loaded_model, loaded_scaler = get_data_as_df.load_best_model()
+        assert isinstance(loaded_model, LinearRegression)
+        assert isinstance(loaded_scaler, StandardScaler)
+
+    def test_no_model(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        assert get_data_as_df.load_best_model() == (None, None)
@@ -0,0 +1,212 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import TimeSeriesSplit, cross_val_score
+from sklearn.tree import DecisionTreeRegressor
+
+from btc_functions.transfert_data import best_model as bm
+from btc_functions.transfert_data.model_registry import current_version, load_manifest
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=300) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture
+def merged():
+    rng = np.random.default_rng(1)
+    n = 400
+    close = 40_000 + np.cumsum(rng.normal(scale=20, size=n))
+    return pd.DataFrame(
+        {
+            "open_price": close - 1,
+            "high_price": close + 5,
+            "low_price": close - 5,
+            "close_price": close,
+            "volume_x": rng.uniform(1, 10, n),
+            "priceChange": 1.0,
+            "priceChangePercent": 0.1,
+        }
+    )
+
+
+class TestEvaluateModels:
+    def test_scores_match_cross_val_score(self, dataset):
+        """Teste que l'ordonnanceur donne les scores de cross_val_score"""
+        X, y = dataset
+        models = {
+            "LinearRegression": LinearRegression(),
+            "DecisionTreeRegressor": DecisionTreeRegressor(random_state=42),
+        }
+        scores, fitted = bm.evaluate_models(models, X, y, n_jobs=2)
+
+        for name, model in models.items():
+            expected = cross_val_score(
+                model, X, y, cv=3, scoring="neg_mean_squared_error"
+            ).mean()
+            assert scores[name] == pytest.approx(expected)
+            assert fitted[name] is not model
+            assert fitted[name].predict(X[:5]).shape == (5,)
+
+    def test_timings_logged(self, dataset, caplog):
+        X, y = dataset
+        with caplog.at_level("INFO"):
+            bm.evaluate_models({"LinearRegression": LinearRegression()}, X, y, n_jobs=1)
+        assert "LinearRegression" in caplog.text
+        assert "4 tâches" in caplog.text
+        assert "s écoulées" in caplog.text
+        assert "de calcul cumulé" in caplog.text
+
+    def test_wall_time_spans_parallel_tasks(self, dataset, caplog):
+        """Tâches simultanées: temps écoulé < temps de calcul cumulé"""
+        X, y = dataset
+        with patch.object(
+            bm, "_fit_and_score", return_value=(-1.0, 100.0, 102.0)
+        ), patch.object(bm, "_fit", return_value=(LinearRegression(), 101.0, 104.0)):
+            with caplog.at_level("INFO"):
+                bm.evaluate_models(
+                    {"LinearRegression": LinearRegression()}, X, y, n_jobs=1
+                )
+        # 3 plis de 2 s et un entraînement de 3 s, entre 100 et 104
+        assert "4.00 s écoulées, 9.00 s de calcul cumulé" in caplog.text
+
+
+class TestTrainAndSelect:
+    def test_models_saved(self, merged, tmp_path):
+        with patch.object(bm, "MODEL_FOLDER", str(tmp_path)):
+            best = bm.train_and_select_best_models(
+                merged, [("return", 1)], n_jobs=2, embargo=5
+            )
+
+        assert best in bm.build_models()
+        for name in bm.build_models():
+            assert (tmp_path / f"{name}_model.pickle").exists()
+        assert (tmp_path / "best_model.pickle").exists()
+        assert (tmp_path / "scaler.pickle").exists()
+
+        registry_dir = str(tmp_path / "registry")
+        version = current_version(registry_dir)
+        manifest = load_manifest(version, registry_dir)
+        assert manifest["model_name"] == best
+        assert "test_accuracy" in manifest["metrics"]
+        assert manifest["feature_names"][-1] == "return_1"
+
+    def test_watermark_is_last_training_row(self, merged, tmp_path):
+        merged["kline_close_time"] = np.arange(len(merged)) * 300_000
+        with patch.object(bm, "MODEL_FOLDER", str(tmp_path)):
+            bm.train_and_select_best_models(
+                merged, [("return", 1)], n_jobs=2, embargo=5
+            )
+
+        X, y = bm.prepare_data(merged, [("return", 1)])
+        X_train, _, _, _ = bm.chronological_split(X, y, embargo=5)
+        registry_dir = str(tmp_path / "registry")
+        manifest = load_manifest(current_version(registry_dir), registry_dir)
+        # Lignes de test et d'embargo non apprises: après le watermark
+        assert manifest["watermark"] == X_train.index[-1] * 300_000
+        assert manifest["watermark"] < merged["kline_close_time"].iloc[-1]
+
+    def test_each_candidate_fitted_once(self, merged, tmp_path):
+        """Teste la réutilisation des modèles entraînés pour best_model.pickle"""
+        fits = []
+        original_fit = bm._fit
+
+        def counting_fit(model, X, y):
+            fits.append(type(model).__name__)
+            return original_fit(model, X, y)
+
+        with patch.object(bm, "MODEL_FOLDER", str(tmp_path)), patch.object(
+            bm, "_fit", side_effect=counting_fit
+        ):
+            best = bm.train_and_select_best_models(
+                merged, [("return", 1)], n_jobs=1, embargo=5
+            )
+
+        assert sorted(fits) == sorted(bm.build_models())
+        best_path = tmp_path / "best_model.pickle"
+        model_path = tmp_path / f"{best}_model.pickle"
+        assert best_path.stat().st_ino == model_path.stat().st_ino
+
+    def test_link_survives_next_save(self, tmp_path):
+        source, target = tmp_path / "a_model.pickle", tmp_path / "best_model.pickle"
+        bm.save_artifact({"version": 1}, source)
+        bm.link_artifact(source, target)
+        bm.save_artifact({"version": 2}, source)
+        assert bm.load(target) == {"version": 1}
+
+
+class TestWalkForward:
+    def test_folds_only_look_back(self):
+        """Teste que chaque pli s'entraîne sur le passé, embargo compris"""
+        folds = bm.walk_forward_splits(1000, n_splits=4, embargo=50)
+        assert len(folds) == 4
+        previous_test_end = None
+        for train_idx, test_idx in folds:
+            assert train_idx.max() + 50 < test_idx.min()
+            assert train_idx.min() == 0
+            if previous_test_end is not None:
+                assert test_idx.min() == previous_test_end + 1
+            previous_test_end = test_idx.max()
+        assert previous_test_end == 999
+
+    def test_rolling_window(self):
+        folds = bm.walk_forward_splits(1000, n_splits=4, embargo=0, max_train_size=100)
+        assert all(len(train_idx) == 100 for train_idx, _ in folds)
+
+    def test_chronological_holdout(self, dataset):
+        X, y = dataset
+        X, y = pd.DataFrame(X), pd.Series(y)
+        X_train, X_test, y_train, y_test = bm.chronological_split(X, y, embargo=10)
+        assert X_test.index.min() == 240
+        assert X_train.index.max() == 229
+        assert list(y_test.index) == list(X_test.index)
+
+    def test_scores_on_walk_forward_folds(self, dataset):
+        X, y = dataset
+        folds = bm.walk_forward_splits(len(X), n_splits=3, embargo=5)
+        scores, _ = bm.evaluate_models(
+            {"LinearRegression": LinearRegression()}, X, y, cv=folds, n_jobs=2
+        )
+        expected = cross_val_score(
+            LinearRegression(), X, y, cv=folds, scoring="neg_mean_squared_error"
+        ).mean()
+        assert scores["LinearRegression"] == pytest.approx(expected)
+
+
+class TestHalvingSearch:
+    def test_search_models(self, dataset, caplog):
+        """Teste la recherche par successive halving avec plis walk-forward"""
+        X, y = dataset
+        models = {
+            "DecisionTreeRegressor": DecisionTreeRegressor(random_state=42),
+            "RandomForestRegressor": bm.build_models()["RandomForestRegressor"],
+        }
+        splitter = TimeSeriesSplit(n_splits=3, gap=5)
+        with caplog.at_level("INFO"):
+            scores, fitted = bm.search_models(models, X, y, cv=splitter, n_jobs=2)
+
+        assert set(scores) == set(models)
+        tree = fitted["DecisionTreeRegressor"]
+        grid = bm.PARAM_GRIDS["DecisionTreeRegressor"]
+        assert tree.max_depth in grid["max_depth"]
+        assert tree.min_samples_leaf in grid["min_samples_leaf"]
+        # Le nombre d'arbres est la ressource du halving, pas un paramètre
+        assert 25 <= fitted["RandomForestRegressor"].n_estimators <= 200
+        assert "configurations" in caplog.text
+
+    def test_search_plugs_into_selection(self, merged, tmp_path):
+        with patch.object(bm, "MODEL_FOLDER", str(tmp_path)), patch.object(
+            bm, "SEARCH_RESOURCES", {"RandomForestRegressor": ("n_estimators", 5, 15)}
+        ):
+            best = bm.train_and_select_best_models(
+                merged, [("return", 1)], n_jobs=2, embargo=5, search=True
+            )
+        assert (tmp_path / "best_model.pickle").exists()
+        assert (tmp_path / f"{best}_model.pickle").exists()
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+import pytest
+from joblib import dump, load
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, SGDRegressor
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.preprocessing import StandardScaler
+
+from btc_functions.transfert_data import best_model as bm
+from btc_functions.transfert_data import online_model
+from btc_functions.transfert_data.feature_store import (
+    TIME_COLUMN,
+    load_feature_store,
+    update_feature_store,
+)
+from btc_functions.transfert_data.model_registry import (
+    current_version,
+    list_versions,
+    load_model_version,
+    promote_model,
+    register_model,
+    rollback_model,
+)
+from btc_functions.transfert_data.online_model import (
+    initialize_online_state,
+    labelled_rows,
+    load_online_state,
+    partial_update,
+    update_online_model,
+)
+
+FIVE_MIN = 300_000
+
+
+def merged_frame(n, seed=0):
+    """Klines 5m fusionnées avec daily, telles que lues par le feature store"""
+    rng = np.random.default_rng(seed)
+    close = 40_000 + np.cumsum(rng.normal(scale=20, size=n))
+    volume = rng.uniform(1, 10, n)
+    return pd.DataFrame(
+        {
+            "kline_open_time": pd.to_datetime(np.arange(n) * FIVE_MIN, unit="ms"),
+            TIME_COLUMN: pd.to_datetime(np.arange(1, n + 1) * FIVE_MIN - 1, unit="ms"),
+            "open_price": close - 1,
+            "high_price": close + rng.uniform(0, 30, n),
+            "low_price": close - rng.uniform(0, 30, n),
+            "close_price": close,
+            "volume_x": volume,
+            "taker_buy_base_asset_volume": volume / 2,
+            "priceChange": 1.0,
+            "priceChangePercent": 0.1,
+        }
+    )
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] > 0).astype(int)
+    return X, y
+
+
+class TestPartialUpdate:
+    def test_forest_grows_on_new_rows(self, dataset):
+        X, y = dataset
+        model = RandomForestRegressor(n_estimators=5, random_state=42).fit(X, y)
+        model = partial_update(model, X[:20], y[:20])
+        assert len(model.estimators_) == 5 + online_model.ONLINE_EXTRA_TREES
+
+    def test_forest_drops_oldest_trees(self, dataset, monkeypatch):
+        X, y = dataset
+        monkeypatch.setattr(online_model, "MAX_FOREST_TREES", 12)
+        model = RandomForestRegressor(n_estimators=5, random_state=42).fit(X, y)
+        newest = None
+        for _ in range(2):
+            model = partial_update(model, X[:20], y[:20])
+            newest = model.estimators_[-1]
+        assert len(model.estimators_) == model.n_estimators == 12
+        assert model.estimators_[-1] is newest
+        assert model.predict(X).shape == (200,)
+
+    def test_sgd_uses_partial_fit(self, dataset):
+        X, y = dataset
+        model = SGDRegressor(random_state=42).fit(X, y)
+        assert partial_update(model, X[:20], y[:20]) is model
+
+    @pytest.mark.parametrize(
+        "model", [LinearRegression(), DecisionTreeRegressor(random_state=42)]
+    )
+    def test_refit_keeps_model_type(self, dataset, model):
+        X, y = dataset
+        model.fit(X[:20], 1 - y[:20])
+        refitted = partial_update(model, X, y)
+        assert type(refitted) is type(model)
+        # Réentraîné sur la fenêtre fournie, l'original reste intact
+        np.testing.assert_allclose(
+            refitted.predict(X), type(model)(**model.get_params()).fit(X, y).predict(X)
+        )
+        assert refitted is not model
+
+
+def trained_folder(tmp_path, merged, model=None, target=None):
+    """Entraînement complet sur les 600 premières bougies, promu en v0001"""
+    store_dir = str(tmp_path / "store")
+    model_folder = tmp_path / "models"
+    model_folder.mkdir()
+    update_feature_store(merged.iloc[:600], store_dir=store_dir)
+    X, y = bm.prepare_data(load_feature_store(store_dir))
+    scaler = StandardScaler().fit(X)
+    dump(scaler, model_folder / "scaler.pickle")
+    if target is not None:
+        y = pd.Series(target, index=y.index)
+    model = (model or LinearRegression()).fit(scaler.transform(X), y)
+    dump(model, model_folder / "best_model.pickle")
+    registry_dir = str(model_folder / "registry")
+    watermark = merged[TIME_COLUMN].iloc[598]
+    version = register_model(
+        model, scaler, "initial", watermark=watermark, registry_dir=registry_dir
+    )
+    promote_model(version, registry_dir)
+    initialize_online_state(watermark, model_folder=str(model_folder), version=version)
+    update_feature_store(merged, store_dir=store_dir)
+    return str(model_folder), store_dir, scaler
+
+
+def milliseconds(timestamp):
+    return int(timestamp.value // 1_000_000)
+
+
+class TestUpdateOnlineModel:
+    def test_learns_only_new_rows(self, tmp_path, monkeypatch):
+        merged = merged_frame(800)
+        # Modèle en production appris sur une cible constante: le
+        # réentraînement sur la fenêtre récente fait mieux et est promu
+        model_folder, store_dir, _ = trained_folder(tmp_path, merged, target=1)
+        monkeypatch.setattr(online_model, "MIN_ONLINE_ROWS", 50)
+
+        # 200 nouvelles lignes étiquetées (la 799 attend la bougie suivante):
+        # 160 apprises, les 40 plus récentes servent à la comparaison
+        assert update_online_model(model_folder, store_dir) == 160
+        # Restent les 40 lignes de comparaison, trop peu pour une mise à jour
+        assert update_online_model(model_folder, store_dir) == 0
+
+        state = load_online_state(model_folder)
+        assert state["rows_seen"] == 160
+        assert state["updates"] == 1
+        assert state["version"] == "v0002"
+        assert state["watermark"] == milliseconds(merged[TIME_COLUMN].iloc[758])
+        assert isinstance(load(f"{model_folder}/best_model.pickle"), LinearRegression)
+        assert current_version(f"{model_folder}/registry") == "v0002"
+        # Réentraînement complet: scaler réappris sur la même fenêtre
+        _, _, times = labelled_rows(load_feature_store(store_dir))
+        window = (times <= merged[TIME_COLUMN].iloc[758]).sum()
+        assert load(f"{model_folder}/scaler.pickle").n_samples_seen_ == window
+
+    def test_incremental_model_keeps_scaler(self, tmp_path, monkeypatch):
+        merged = merged_frame(800)
+        model_folder, store_dir, scaler = trained_folder(
+            tmp_path, merged, model=SGDRegressor(random_state=42)
+        )
+        seen = []
+
+        def spy(model, X, y):
+            seen.append(X)
+            return partial_update(model, X, y)
+
+        monkeypatch.setattr(online_model, "partial_update", spy)
+        update_online_model(model_folder, store_dir)
+
+        # Nouvelles lignes mises à l'échelle de l'entraînement initial
+        X, _, _ = labelled_rows(
+            load_feature_store(store_dir, since=merged[TIME_COLUMN].iloc[598])
+        )
+        np.testing.assert_allclose(seen[0], scaler.transform(X.iloc[:160]))
+        _, current_scaler = load_model_version(
+            registry_dir=f"{model_folder}/registry"
+        )
+        np.testing.assert_array_equal(current_scaler.mean_, scaler.mean_)
+
+    def test_rejects_worse_candidate(self, tmp_path, monkeypatch):
+        merged = merged_frame(800)
+        model_folder, store_dir, scaler = trained_folder(tmp_path, merged)
+        monkeypatch.setattr(online_model, "MIN_ONLINE_ROWS", 50)
+        monkeypatch.setattr(
+            online_model,
+            "partial_update",
+            lambda model, X, y: LinearRegression().fit(X, np.full(len(y), 5.0)),
+        )
+
+        assert update_online_model(model_folder, store_dir) == 0
+        state = load_online_state(model_folder)
+        assert (state["rows_seen"], state["updates"]) == (0, 0)
+        assert list_versions(f"{model_folder}/registry") == ["v0001"]
+        saved_scaler = load(f"{model_folder}/scaler.pickle")
+        np.testing.assert_array_equal(saved_scaler.mean_, scaler.mean_)
+
+        # Le watermark avance malgré le rejet: la mise à jour suivante ne
+        # relit que les 40 lignes de comparaison, pas tout le lot rejeté
+        assert state["watermark"] == milliseconds(merged[TIME_COLUMN].iloc[758])
+        assert update_online_model(model_folder, store_dir) == 0
+
+    def test_resyncs_after_rollback(self, tmp_path):
+        merged = merged_frame(800)
+        model_folder, store_dir, _ = trained_folder(tmp_path, merged, target=1)
+        registry_dir = f"{model_folder}/registry"
+        assert update_online_model(model_folder, store_dir) == 160
+
+        # Retour à v0001: les lignes apprises par v0002 sont réapprises
+        assert rollback_model(registry_dir) == "v0001"
+        assert update_online_model(model_folder, store_dir) == 160
+        state = load_online_state(model_folder)
+        assert state["version"] == current_version(registry_dir) == "v0003"
+        assert state["watermark"] == milliseconds(merged[TIME_COLUMN].iloc[758])
+
+    def test_requires_full_training(self, tmp_path):
+        with pytest.raises(ValueError):
+            update_online_model(str(tmp_path), str(tmp_path / "store"))
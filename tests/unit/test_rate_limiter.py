@@ -0,0 +1,119 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from btc_functions.extract_data import binance_daylies, rate_limiter
+from btc_functions.extract_data.rate_limiter import WeightRateLimiter, endpoint_weight
+
+
+class FakeClock:
+    """Horloge contrôlée par le test: sleep() fait avancer le temps"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def rate_limited_response(status_code=429):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {
+        rate_limiter.USED_WEIGHT_HEADER: "5990",
+        "Retry-After": "12",
+    }
+    response.raise_for_status.side_effect = binance_daylies.requests.HTTPError()
+    return response
+
+
+def make_limiter(clock, limit=100):
+    return WeightRateLimiter(
+        limit=limit, interval=60.0, safety_ratio=1.0, clock=clock, sleep=clock.sleep
+    )
+
+
+class TestWeightRateLimiter:
+    def test_endpoint_weights(self):
+        assert endpoint_weight("klines") == 2
+        assert endpoint_weight("aggTrades") == 4
+        assert endpoint_weight("unknown") == rate_limiter.DEFAULT_WEIGHT
+
+    def test_acquire_waits_when_bucket_is_empty(self, clock):
+        """Teste l'attente quand le poids disponible est épuisé"""
+        limiter = make_limiter(clock)
+        for _ in range(25):
+            assert limiter.acquire(4) == 0.0
+        waited = limiter.acquire(4)
+        # 100 de poids / 60s => 4 de poids toutes les 2.4s
+        assert waited == pytest.approx(2.4)
+
+    def test_headers_resynchronise_bucket(self, clock):
+        """Teste que le poids utilisé côté serveur vide le bucket local"""
+        limiter = make_limiter(clock)
+        limiter.update_from_headers({rate_limiter.USED_WEIGHT_HEADER: "98"})
+        assert limiter.tokens == pytest.approx(2)
+        assert limiter.acquire(2) == 0.0
+        assert limiter.acquire(2) > 0
+
+    def test_block_for_pauses_callers(self, clock):
+        limiter = make_limiter(clock)
+        limiter.block_for(30)
+        assert limiter.acquire(1) >= 30
+
+    def test_request_data_reports_headers_and_bans(self, clock):
+        """Teste le branchement du limiteur dans request_data"""
+        limiter = make_limiter(clock, limit=6000)
+        session = MagicMock()
+        session.get.return_value = rate_limited_response()
+
+        with patch.object(
+            binance_daylies, "get_rate_limiter", return_value=limiter
+        ), patch.object(
+            binance_daylies, "get_session", return_value=session
+        ), patch.object(binance_daylies, "RATE_LIMIT_RETRIES", 0):
+            assert binance_daylies.request_data("klines") is None
+
+        assert limiter.blocked_until == pytest.approx(12)
+        assert limiter.tokens == 0
+
+    def test_request_data_retries_after_pause(self, clock):
+        """Teste le rejeu d'un 429 après la pause Retry-After du limiteur"""
+        limiter = make_limiter(clock, limit=6000)
+        ok = MagicMock()
+        ok.status_code = 200
+        ok.headers = {}
+        ok.json.return_value = {"ok": True}
+        session = MagicMock()
+        session.get.side_effect = [rate_limited_response(), ok]
+
+        with patch.object(
+            binance_daylies, "get_rate_limiter", return_value=limiter
+        ), patch.object(binance_daylies, "get_session", return_value=session):
+            assert binance_daylies.request_data("klines") == {"ok": True}
+
+        assert session.get.call_count == 2
+        # Le second appel n'est parti qu'après la pause
+        assert clock.now >= 12
+
+    def test_request_data_gives_up_on_repeated_bans(self, clock):
+        limiter = make_limiter(clock, limit=6000)
+        session = MagicMock()
+        session.get.return_value = rate_limited_response(418)
+
+        with patch.object(
+            binance_daylies, "get_rate_limiter", return_value=limiter
+        ), patch.object(binance_daylies, "get_session", return_value=session):
+            assert binance_daylies.request_data("klines") is None
+
+        assert session.get.call_count == binance_daylies.RATE_LIMIT_RETRIES + 1
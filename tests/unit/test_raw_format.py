@@ -0,0 +1,98 @@
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from btc_functions.extract_data import binance_daylies
+from btc_functions.load_database.mysql import insert_data_from_file, read_raw_file
+from btc_functions.load_database.schema import raw_to_dataframe
+
+KLINE = [
+    1737241200000,
+    "104291.30000000",
+    "104475.00000000",
+    "104291.30000000",
+    "104443.56000000",
+    "83.55140000",
+    1737241499999,
+    "8722250.89667130",
+    12863,
+    "43.81979000",
+    "4574770.78810830",
+    "0",
+]
+TICKER = {
+    "symbol": "BTCUSDT",
+    "priceChange": "-120.5",
+    "priceChangePercent": "-0.12",
+    "openTime": 1737158400000,
+    "closeTime": 1737244799999,
+    "count": 1234,
+}
+
+
+class TestRawFormat:
+    def test_klines_are_typed(self):
+        """Teste la conversion des klines en colonnes numériques"""
+        df = raw_to_dataframe([KLINE])
+        assert "ignore" not in df.columns
+        assert df["open_price"].dtype == "float64"
+        assert df["kline_open_time"].dtype == "int64"
+        assert df["number_of_trades"].dtype == "int64"
+
+    def test_ticker_is_typed(self):
+        df = raw_to_dataframe(TICKER, "daily")
+        assert df["priceChange"].dtype == "float64"
+        assert df["openTime"].iloc[0] == 1737158400000
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError):
+            raw_to_dataframe([])
+
+    def test_parquet_round_trip(self, tmp_path):
+        """Teste l'écriture Parquet puis la relecture côté chargement"""
+        pytest.importorskip("pyarrow")
+        with patch.object(binance_daylies, "BASE_DIR", str(tmp_path)):
+            binance_daylies.save_raw_data(
+                [KLINE] * 288, "prices_BTC_KLINES", datetime(2025, 1, 19), "parquet"
+            )
+
+        path = tmp_path / "prices_BTC_KLINES_20250119.parquet"
+        assert path.exists()
+        df = read_raw_file(str(path))
+        assert len(df) == 288
+        assert df["close_price"].iloc[0] == pytest.approx(104443.56)
+        assert df["kline_close_time"].dtype == "int64"
+
+    def test_json_is_read_directly(self, tmp_path):
+        with patch.object(binance_daylies, "BASE_DIR", str(tmp_path)):
+            binance_daylies.save_raw_data(
+                TICKER, "prices_BTC_daily", datetime(2025, 1, 19), "json"
+            )
+        df = read_raw_file(str(tmp_path / "prices_BTC_daily_20250119.json"))
+        assert df["priceChangePercent"].iloc[0] == pytest.approx(-0.12)
+
+
+class TestDirectLoad:
+    def test_json_loaded_without_csv(self, tmp_path):
+        """Teste le chargement direct JSON -> base, typé par le schéma"""
+        json_file = tmp_path / "prices_BTC_KLINES_20250119.json"
+        json_file.write_text(json.dumps([KLINE, KLINE]))
+        engine = create_engine("sqlite://")
+
+        assert insert_data_from_file(engine, str(json_file), "klines")
+        assert not list(tmp_path.glob("*.csv"))
+
+        columns = {
+            c["name"]: c["type"] for c in inspect(engine).get_columns("klines")
+        }
+        assert "ignore" not in columns
+        assert str(columns["open_price"]) == "NUMERIC(18, 8)"
+        assert str(columns["kline_open_time"]) == "BIGINT"
+
+        df = pd.read_sql_query("SELECT * FROM klines", engine)
+        assert len(df) == 2
+        assert df["close_price"].iloc[0] == pytest.approx(104443.56)
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from btc_functions.transfert_data import get_data_as_df, table_cache
+from btc_functions.transfert_data.table_cache import (
+    get_cached_table,
+    invalidate_cache,
+    load_cache_meta,
+)
+
+HOUR_MS = 3_600_000
+
+
+def klines_rows(first, last):
+    return pd.DataFrame(
+        {
+            "kline_open_time": [i * HOUR_MS for i in range(first, last)],
+            "kline_close_time": [(i + 1) * HOUR_MS - 1 for i in range(first, last)],
+            "close_price": [float(i) for i in range(first, last)],
+        }
+    )
+
+
+@pytest.fixture
+def klines_engine(tmp_path):
+    """Base SQLite contenant 48 klines horaires"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'btc.db'}")
+    klines_rows(0, 48).to_sql("klines", engine, index=False)
+    with patch.object(
+        get_data_as_df.db_functions, "create_connection", return_value=engine
+    ):
+        yield engine
+
+
+class TestTableCache:
+    def test_first_call_caches_table(self, klines_engine, tmp_path):
+        cache_dir = tmp_path / "cache"
+        df = get_cached_table(
+            "klines", "kline_open_time", "kline_close_time", cache_dir=str(cache_dir)
+        )
+        assert len(df) == 48
+
+        meta = load_cache_meta("klines", str(cache_dir))
+        assert meta["rows"] == 48
+        assert meta["watermark"] == 47 * HOUR_MS
+        assert (cache_dir / meta["file"]).exists()
+
+    def test_refresh_reads_only_new_rows(self, klines_engine, tmp_path):
+        """Teste que seules les lignes après le watermark sont relues"""
+        cache_dir = str(tmp_path / "cache")
+        get_cached_table("klines", "kline_open_time", cache_dir=cache_dir)
+        klines_rows(48, 72).to_sql(
+            "klines", klines_engine, index=False, if_exists="append"
+        )
+
+        with patch.object(
+            table_cache,
+            "get_df_change_timestamp",
+            wraps=table_cache.get_df_change_timestamp,
+        ) as reader:
+            df = get_cached_table("klines", "kline_open_time", cache_dir=cache_dir)
+
+        assert reader.call_args.kwargs["start"] == 47 * HOUR_MS + 1
+        assert len(df) == 72
+        assert df["kline_open_time"].is_monotonic_increasing
+        assert load_cache_meta("klines", cache_dir)["watermark"] == 71 * HOUR_MS
+
+    def test_window_is_filtered_from_cache(self, klines_engine, tmp_path):
+        df = get_cached_table(
+            "klines",
+            "kline_open_time",
+            start="1970-01-02",
+            end=47 * HOUR_MS,
+            cache_dir=str(tmp_path / "cache"),
+        )
+        assert len(df) == 23
+        assert df["kline_open_time"].min() == pd.Timestamp("1970-01-02")
+
+    def test_projection_change_rebuilds_cache(self, klines_engine, tmp_path):
+        """Teste la reconstruction du cache quand les colonnes changent"""
+        cache_dir = str(tmp_path / "cache")
+        get_cached_table(
+            "klines", "kline_open_time", columns=["close_price"], cache_dir=cache_dir
+        )
+        df = get_cached_table("klines", "kline_open_time", cache_dir=cache_dir)
+        assert "kline_close_time" in df.columns
+        assert load_cache_meta("klines", cache_dir)["columns"] is None
+
+    def test_invalidate_cache(self, klines_engine, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        get_cached_table("klines", "kline_open_time", cache_dir=cache_dir)
+        invalidate_cache("klines", cache_dir)
+        assert load_cache_meta("klines", cache_dir) is None
+
+    def test_backfill_behind_watermark_rebuilds_cache(self, tmp_path):
+        """Teste la prise en compte d'un historique chargé après coup"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'late.db'}")
+        klines_rows(48, 72).to_sql("klines", engine, index=False)
+        cache_dir = str(tmp_path / "cache")
+        with patch.object(
+            get_data_as_df.db_functions, "create_connection", return_value=engine
+        ):
+            df = get_cached_table("klines", "kline_open_time", cache_dir=cache_dir)
+            assert len(df) == 24
+            klines_rows(0, 48).to_sql(
+                "klines", engine, index=False, if_exists="append"
+            )
+            df = get_cached_table("klines", "kline_open_time", cache_dir=cache_dir)
+
+        assert len(df) == 72
+        assert df["kline_open_time"].is_monotonic_increasing
+        assert load_cache_meta("klines", cache_dir)["rows"] == 72
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from btc_functions.load_database.mysql import insert_dataframe
+
+
+@pytest.fixture
+def engine():
+    """Base SQLite avec la table daily et sa clé primaire"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE daily (symbol VARCHAR(10), priceChange NUMERIC, "
+                "openTime BIGINT PRIMARY KEY, count INT)"
+            )
+        )
+    return engine
+
+
+def daily_rows(price_change):
+    return pd.DataFrame(
+        {
+            "symbol": ["BTCUSDT", "BTCUSDT"],
+            "priceChange": [price_change, price_change],
+            "openTime": [1737158400000, 1737244800000],
+            "count": [10, 20],
+        }
+    )
+
+
+class TestUpsert:
+    def test_append_fails_on_duplicate_key(self, engine):
+        insert_dataframe(engine, daily_rows(1.0), "daily", "append")
+        with pytest.raises(Exception):
+            insert_dataframe(engine, daily_rows(1.0), "daily", "append")
+
+    def test_upsert_is_idempotent(self, engine):
+        """Teste qu'un rechargement met à jour au lieu d'échouer"""
+        insert_dataframe(engine, daily_rows(1.0), "daily", "upsert")
+        insert_dataframe(engine, daily_rows(2.5), "daily", "upsert")
+
+        df = pd.read_sql_query("SELECT * FROM daily ORDER BY openTime", engine)
+        assert len(df) == 2
+        assert df["priceChange"].tolist() == [2.5, 2.5]
+
+    def test_upsert_requires_known_primary_key(self, engine):
+        with pytest.raises(ValueError):
+            insert_dataframe(engine, daily_rows(1.0), "unknown_table", "upsert")
+
+    def test_unknown_mode(self, engine):
+        with pytest.raises(ValueError):
+            insert_dataframe(engine, daily_rows(1.0), "daily", "replace")